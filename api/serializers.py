@@ -0,0 +1,94 @@
+# api/serializers.py
+from rest_framework import serializers
+
+from blog.models import Post
+from core.models import Service, ServiceFeature, Testimonial
+from projects.models import Project, ProjectCategory, ProjectImage
+
+
+class SparseFieldsMixin:
+    """Drop every field not named in ?fields=a,b,c (all fields when the parameter is absent)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = get_requested_fields(self.context.get('request'))
+        if requested:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+
+def get_requested_fields(request):
+    if request is None:
+        return set()
+    fields = request.query_params.get('fields', '')
+    return {name.strip() for name in fields.split(',') if name.strip()}
+
+
+class ServiceFeatureSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ServiceFeature
+        fields = ['title', 'description', 'icon']
+
+
+class ServiceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(view_name='api:service-detail', lookup_field='slug')
+    features = ServiceFeatureSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Service
+        fields = [
+            'id', 'url', 'title', 'slug', 'category', 'short_description', 'full_description', 'image',
+            'icon', 'is_featured', 'starting_price', 'price_unit', 'price_display_type',
+            'is_price_negotiable', 'estimated_duration', 'features', 'updated_at',
+        ]
+
+
+class ProjectCategorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProjectCategory
+        fields = ['name', 'slug']
+
+
+class ProjectImageSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProjectImage
+        fields = ['image', 'caption', 'is_primary', 'is_landscape']
+
+
+class ProjectSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(view_name='api:project-detail', lookup_field='slug')
+    categories = ProjectCategorySerializer(many=True, read_only=True)
+    images = ProjectImageSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Project
+        fields = [
+            'id', 'url', 'title', 'slug', 'description', 'client', 'location', 'completion_date',
+            'status', 'size', 'featured_image', 'is_featured', 'categories', 'images', 'updated_at',
+        ]
+
+
+class PostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(view_name='api:post-detail', lookup_field='slug')
+    category = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+    author = serializers.CharField(source='author.get_full_name', read_only=True)
+    tags = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Post
+        fields = [
+            'id', 'url', 'title', 'slug', 'excerpt', 'content', 'featured_image', 'category',
+            'author', 'tags', 'is_featured', 'published_date', 'updated_date',
+        ]
+
+    def get_tags(self, obj):
+        return [tag.name for tag in obj.tags.all()]
+
+
+class TestimonialSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Testimonial
+        fields = [
+            'id', 'client_name', 'company', 'position', 'testimonial', 'image', 'rating',
+            'is_featured', 'updated_at',
+        ]
@@ -0,0 +1,104 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Service, ServiceFeature
+from projects.models import Project, ProjectCategory
+
+
+class ServiceApiTests(TestCase):
+    """Tests for the read-only service endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.service = Service.objects.create(title='Pipe fitting', image='services/plumbing.jpg')
+        ServiceFeature.objects.create(service=self.service, title='Leak testing')
+        Service.objects.create(title='Hidden', image='services/hidden.jpg', is_active=False)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_list_returns_active_services_with_features(self):
+        response = self.client.get(reverse('api:service-list'))
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([service['title'] for service in results], ['Pipe fitting'])
+        self.assertEqual(results[0]['features'], [{'title': 'Leak testing', 'description': '', 'icon': ''}])
+
+    def test_sparse_fieldsets_skip_unrequested_relations(self):
+        url = reverse('api:service-list')
+        # Validator aggregate, page query; no features prefetch
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'fields': 'title,slug'})
+        self.assertEqual(response.json()['results'], [{'title': 'Pipe fitting', 'slug': 'pipe-fitting'}])
+
+    def test_conditional_get_returns_304_until_content_changes(self):
+        url = reverse('api:service-detail', kwargs={'slug': self.service.slug})
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # A feature edit has no timestamp of its own but still changes the ETag
+        ServiceFeature.objects.create(service=self.service, title='Pressure test')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_if_modified_since(self):
+        url = reverse('api:service-list')
+        last_modified = self.client.get(url)['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+    def test_if_modified_since_sees_child_writes_and_deletes(self):
+        url = reverse('api:service-list')
+        later = timezone.now() + timedelta(minutes=1)
+        for change in (
+            lambda: ServiceFeature.objects.create(service=self.service, title='Pressure testing'),
+            lambda: ServiceFeature.objects.filter(title='Leak testing').delete(),
+        ):
+            last_modified = self.client.get(url)['Last-Modified']
+            # Neither write touches Service.updated_at; Last-Modified has to move anyway
+            with mock.patch('core.caching.timezone.now', return_value=later):
+                change()
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+            later += timedelta(minutes=1)
+
+
+class ProjectApiTests(TestCase):
+    """Tests for the read-only project endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        category = ProjectCategory.objects.create(name='Residential')
+        for i in range(3):
+            project = Project.objects.create(
+                title=f'House {i}', description='Build', client='Client', location='Lusaka',
+                completion_date='2024-01-01', featured_image='projects/house.jpg',
+            )
+            project.categories.add(category)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_cursor_pagination(self):
+        url = reverse('api:project-list')
+        first = self.client.get(url, {'page_size': 2}).json()
+        self.assertEqual([project['title'] for project in first['results']], ['House 2', 'House 1'])
+        self.assertEqual(first['results'][0]['categories'], [{'name': 'Residential', 'slug': 'residential'}])
+        second = self.client.get(first['next']).json()
+        self.assertEqual([project['title'] for project in second['results']], ['House 0'])
+        self.assertIsNone(second['next'])
+
+    def test_list_query_count_is_constant(self):
+        # Validator aggregate, page, categories and images prefetches
+        with self.assertNumQueries(4):
+            self.client.get(reverse('api:project-list'))
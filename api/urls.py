@@ -0,0 +1,17 @@
+# api/urls.py
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from .views import PostViewSet, ProjectViewSet, ServiceViewSet, TestimonialViewSet
+
+app_name = 'api'
+
+router = DefaultRouter()
+router.register('services', ServiceViewSet, basename='service')
+router.register('projects', ProjectViewSet, basename='project')
+router.register('posts', PostViewSet, basename='post')
+router.register('testimonials', TestimonialViewSet, basename='testimonial')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,139 @@
+# api/views.py
+import hashlib
+
+from django.db.models import Count, Max, Prefetch
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import viewsets
+from rest_framework.pagination import CursorPagination
+
+from blog.models import Post
+from core.caching import get_page_cache_changed_at, get_page_cache_prefix
+from core.models import Service, ServiceFeature, Testimonial
+from projects.models import Project, ProjectImage
+from .serializers import (
+    PostSerializer, ProjectSerializer, ServiceSerializer, TestimonialSerializer, get_requested_fields,
+)
+
+
+class ApiCursorPagination(CursorPagination):
+    """Cursor pagination using the ordering declared on each viewset"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(view.ordering)
+
+
+class ConditionalReadOnlyViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only endpoints that answer If-None-Match / If-Modified-Since with a 304
+    before anything is loaded or serialized.
+
+    The validators come from one aggregate over the updated timestamp. The ETag also
+    mixes in the content group's page cache version, which changes when child rows
+    without their own timestamp (features, images, categories) are edited or rows
+    are deleted; Last-Modified likewise moves to the time of that change. Without a
+    content group nothing records deletes, so only the ETag is sent.
+    """
+    pagination_class = ApiCursorPagination
+    ordering = ('-id',)
+    updated_field = 'updated_at'
+    content_group = None
+    # Serializer field -> relation to load, skipped when ?fields= leaves the field out
+    select_related_fields = {}
+    prefetch_related_fields = {}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        requested = get_requested_fields(self.request)
+        for field, relation in self.select_related_fields.items():
+            if not requested or field in requested:
+                queryset = queryset.select_related(relation)
+        for field, relation in self.prefetch_related_fields.items():
+            if not requested or field in requested:
+                queryset = queryset.prefetch_related(relation)
+        return queryset
+
+    def get_validators(self, queryset):
+        """Return (etag, last_modified) for the rows behind this response, or (None, None) if there are none"""
+        state = queryset.order_by().aggregate(last_modified=Max(self.updated_field), count=Count('pk'))
+        if not state['count']:
+            return None, None
+        version, last_modified = '', None
+        if self.content_group:
+            version = get_page_cache_prefix(self.content_group)
+            last_modified = max(state['last_modified'], get_page_cache_changed_at(self.content_group))
+        signature = ':'.join([
+            version, str(state['count']), state['last_modified'].isoformat(),
+            self.request.get_full_path(), self.request.accepted_media_type,
+        ])
+        return f'"{hashlib.md5(signature.encode()).hexdigest()}"', last_modified
+
+    def conditional(self, queryset, render, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(queryset)
+        if etag is None:
+            return render(request, *args, **kwargs)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = render(request, *args, **kwargs)
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        # Relations are not loaded by the aggregate, so the full queryset will do
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional(queryset, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_queryset().filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return self.conditional(queryset, super().retrieve, request, *args, **kwargs)
+
+
+class ServiceViewSet(ConditionalReadOnlyViewSet):
+    """Active services with their features"""
+    queryset = Service.objects.filter(is_active=True)
+    serializer_class = ServiceSerializer
+    lookup_field = 'slug'
+    ordering = ('display_order', 'id')
+    content_group = 'services'
+    prefetch_related_fields = {
+        'features': Prefetch('features', queryset=ServiceFeature.objects.order_by('id')),
+    }
+
+
+class ProjectViewSet(ConditionalReadOnlyViewSet):
+    """Portfolio projects with their categories and gallery images"""
+    queryset = Project.objects.all()
+    serializer_class = ProjectSerializer
+    lookup_field = 'slug'
+    ordering = ('-created_at', '-id')
+    content_group = 'projects'
+    prefetch_related_fields = {
+        'categories': 'categories',
+        'images': Prefetch('images', queryset=ProjectImage.objects.order_by('order', 'id')),
+    }
+
+
+class PostViewSet(ConditionalReadOnlyViewSet):
+    """Published blog posts"""
+    queryset = Post.objects.filter(status='published')
+    serializer_class = PostSerializer
+    lookup_field = 'slug'
+    ordering = ('-published_date', '-id')
+    updated_field = 'updated_date'
+    content_group = 'blog'
+    select_related_fields = {'category': 'category', 'author': 'author'}
+    prefetch_related_fields = {'tags': 'tags'}
+
+
+class TestimonialViewSet(ConditionalReadOnlyViewSet):
+    """Published client testimonials"""
+    queryset = Testimonial.objects.filter(status='published')
+    serializer_class = TestimonialSerializer
+    ordering = ('order', 'id')
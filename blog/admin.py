@@ -1,8 +1,9 @@
 # blog/admin.py
 from django.contrib import admin
-from .models import Category, Post, Comment, NewsletterSubscriber
+from .models import Category, Post, Comment, NewsletterSubscriber, Tag
 
 admin.site.register(Category)
 admin.site.register(Post)
+admin.site.register(Tag)
 admin.site.register(Comment)
 admin.site.register(NewsletterSubscriber)
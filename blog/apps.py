@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
+
+    def ready(self):
+        from .signals import connect_category_count_signals, connect_count_signals, connect_search_index_signals
+        connect_search_index_signals()
+        connect_count_signals()
+        connect_category_count_signals()
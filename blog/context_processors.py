@@ -1,9 +1,10 @@
 # blog/context_processors.py
+from core.caching import lazy_count
 from .models import Comment
 
 def blog_context(request):
     if request.user.is_authenticated:
-        pending_comments = Comment.objects.filter(is_approved=False).count()
+        pending_comments = lazy_count('pending_comments', Comment.objects.filter(is_approved=False))
     else:
         pending_comments = 0
     
@@ -19,11 +19,17 @@ class CategoryForm(forms.ModelForm):
 
 class PostForm(forms.ModelForm):
     """Form for blog posts"""
+    # Edited as comma-separated names; saved as Tag rows
+    tags = forms.CharField(
+        required=False, max_length=500,
+        widget=forms.TextInput(attrs={'placeholder': 'tag1, tag2, tag3'}),
+    )
+    
     class Meta:
         model = Post
         fields = [
             'title', 'content', 'featured_image', 'excerpt', 'category', 
-            'tags', 'status', 'published_date', 'meta_title', 'meta_description',
+            'status', 'published_date', 'meta_title', 'meta_description',
             'is_featured', 'is_pinned'
         ]
         widgets = {
@@ -31,14 +37,22 @@ class PostForm(forms.ModelForm):
             'excerpt': forms.Textarea(attrs={'rows': 3}),
             'published_date': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
             'meta_description': forms.Textarea(attrs={'rows': 3}),
-            'tags': forms.TextInput(attrs={'placeholder': 'tag1, tag2, tag3'}),
         }
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial.setdefault('tags', ', '.join(self.instance.get_tags_list()))
         for field_name, field in self.fields.items():
             if field_name not in ['is_featured', 'is_pinned']:
                 field.widget.attrs.update({'class': 'form-control'})
+    
+    def clean_tags(self):
+        return [name.strip() for name in self.cleaned_data['tags'].split(',') if name.strip()]
+    
+    def _save_m2m(self):
+        super()._save_m2m()
+        self.instance.set_tags(self.cleaned_data['tags'])
 
 class CommentForm(forms.ModelForm):
     """Form for blog comments (admin)"""
@@ -0,0 +1,110 @@
+import itertools
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+from accounts.models import User
+from blog.models import Post, PostTag, Tag
+from blog.search import SearchResults, create_index, fts_available
+
+WORDS = (
+    'concrete roofing plumbing wiring foundation brick steel timber drainage solar '
+    'inverter borehole tiles paint renovation survey permit budget contractor design '
+    'architect cement gravel insulation window door kitchen bathroom electrical water'
+).split()
+SYLLABLES = 'ka ri mo ne lu ba si to ze fa po gu di we hy ro na me ti so'.split()
+
+
+def build_vocabulary(rng, size=20000):
+    """Domain words first, then a long tail of pseudo-words, drawn with Zipf-like weights"""
+    vocabulary = list(WORDS)
+    while len(vocabulary) < size:
+        vocabulary.append(''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    return vocabulary, cum_weights
+
+
+class Command(BaseCommand):
+    help = "Compare FTS5 blog search against the icontains scan on synthetic posts (rolled back afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100000, help="Number of synthetic posts")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per query")
+        parser.add_argument('--query', action='append', dest='queries',
+                            help="Search query to time (may be given more than once)")
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError("The database does not support SQLite FTS5.")
+        with transaction.atomic():
+            vocabulary = self.seed(options['posts'])
+            # Common, combined, prefix and progressively rarer long-tail terms
+            queries = options['queries'] or [
+                'roofing', 'solar inverter', 'archit', vocabulary[500], vocabulary[5000],
+            ]
+            for query in queries:
+                icontains = self.time_it(lambda: self.icontains_page(query), options['repeat'])
+                fts = self.time_it(lambda: self.fts_page(query), options['repeat'])
+                self.stdout.write(
+                    f"{query!r}: icontains {icontains * 1000:.1f} ms, fts5 {fts * 1000:.1f} ms "
+                    f"({icontains / fts:.1f}x)"
+                )
+            transaction.set_rollback(True)
+
+    def seed(self, count):
+        rng = random.Random(42)
+        vocabulary, cum_weights = build_vocabulary(rng)
+
+        def words(k):
+            return rng.choices(vocabulary, cum_weights=cum_weights, k=k)
+
+        author = User.objects.create(username='search-benchmark', email='search-benchmark@example.com')
+        start = time.perf_counter()
+        tags = Tag.from_names(dict.fromkeys(words(1000)))
+        for offset in range(0, count, 5000):
+            posts = Post.objects.bulk_create(
+                Post(
+                    title=' '.join(words(5)).capitalize(),
+                    slug=f'search-benchmark-{i}',
+                    author=author,
+                    content=' '.join(words(300)),
+                    excerpt=' '.join(words(30)),
+                    featured_image='blog/benchmark.jpg',
+                    status='published',
+                )
+                for i in range(offset, min(offset + 5000, count))
+            )
+            PostTag.objects.bulk_create(
+                PostTag(post=post, tag=tag) for post in posts for tag in rng.sample(tags, min(3, len(tags)))
+            )
+        create_index()
+        self.stdout.write(f"Seeded and indexed {count} posts in {time.perf_counter() - start:.1f} s")
+        return vocabulary
+
+    def icontains_page(self, query):
+        queryset = Post.objects.filter(status='published').filter(
+            Q(title__icontains=query) |
+            Q(content__icontains=query) |
+            Q(excerpt__icontains=query) |
+            Q(pk__in=PostTag.objects.filter(tag__slug=slugify(query)).values('post'))
+        )
+        # What BlogSearchView paid for one page: a COUNT plus the first 9 rows
+        queryset.count()
+        return list(queryset[:9])
+
+    def fts_page(self, query):
+        results = SearchResults(query, Post.objects.select_related('category', 'author'))
+        len(results)
+        return results[:9]
+
+    def time_it(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.search import create_index, fts_available
+
+
+class Command(BaseCommand):
+    help = "Rebuild the SQLite FTS5 search index for blog posts"
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError("The database does not support SQLite FTS5; blog search uses icontains instead.")
+        create_index()
+        self.stdout.write(self.style.SUCCESS("Blog search index rebuilt"))
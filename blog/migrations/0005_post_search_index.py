@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-17 09:12
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+# Frozen copy of the blog.search index helpers as of this migration, so later changes
+# to the live module (e.g. where tags are stored) cannot break a fresh migrate
+FTS_TABLE = 'blog_post_fts'
+
+
+def fts_available(conn):
+    if conn.vendor != 'sqlite':
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_search_index(apps, schema_editor):
+    # The FTS5 index only exists on SQLite builds with FTS5; other backends keep icontains search
+    conn = schema_editor.connection
+    if not fts_available(conn):
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            f"USING fts5(title, excerpt, content, tags, tokenize='porter unicode61')"
+        )
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute("SELECT id, title, excerpt, content, tags FROM blog_post")
+        rows = cursor.fetchmany(1000)
+        while rows:
+            with conn.cursor() as insert_cursor:
+                insert_cursor.executemany(
+                    f"INSERT INTO {FTS_TABLE}(rowid, title, excerpt, content, tags) VALUES (%s, %s, %s, %s, %s)",
+                    [
+                        (post_id, title, strip_tags(excerpt), strip_tags(content), tags.replace(',', ' '))
+                        for post_id, title, excerpt, content, tags in rows
+                    ],
+                )
+            rows = cursor.fetchmany(1000)
+
+
+def drop_search_index(apps, schema_editor):
+    if fts_available(schema_editor.connection):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0004_remove_post_is_published_post_status"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
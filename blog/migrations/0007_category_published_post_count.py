@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:12
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_published_posts(apps, schema_editor):
+    Category = apps.get_model('blog', 'Category')
+    Post = apps.get_model('blog', 'Post')
+    published = Post.objects.filter(category=OuterRef('pk'), status='published').order_by().values(
+        'category'
+    ).annotate(count=Count('pk')).values('count')
+    Category.objects.update(published_post_count=Coalesce(Subquery(published), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='published_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['is_active', 'order', 'name'], name='category_active_order_idx'),
+        ),
+        migrations.RunPython(count_published_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,120 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import slugify
+
+# Frozen copy of the blog.search index helpers, reading tags from blog_posttag
+FTS_TABLE = 'blog_post_fts'
+
+
+def split_tags(apps, schema_editor):
+    """Turn each post's comma-separated tags string into Tag rows and links"""
+    Post = apps.get_model('blog', 'Post')
+    Tag = apps.get_model('blog', 'Tag')
+    PostTag = apps.get_model('blog', 'PostTag')
+    names = {}
+    post_slugs = []
+    for post_id, text in Post.objects.exclude(tags_text='').values_list('id', 'tags_text').iterator():
+        slugs = []
+        for name in text.split(','):
+            name = name.strip()[:50]
+            slug = slugify(name)
+            if slug and slug not in slugs:
+                names.setdefault(slug, name)
+                slugs.append(slug)
+        post_slugs.append((post_id, slugs))
+    Tag.objects.bulk_create([Tag(name=name, slug=slug) for slug, name in names.items()], batch_size=1000)
+    tag_ids = dict(Tag.objects.values_list('slug', 'id'))
+    PostTag.objects.bulk_create(
+        (PostTag(post_id=post_id, tag_id=tag_ids[slug]) for post_id, slugs in post_slugs for slug in slugs),
+        batch_size=1000,
+    )
+
+
+def join_tags(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    PostTag = apps.get_model('blog', 'PostTag')
+    names = {}
+    for post_id, name in PostTag.objects.order_by('id').values_list('post_id', 'tag__name').iterator():
+        names.setdefault(post_id, []).append(name)
+    for post_id, post_names in names.items():
+        Post.objects.filter(pk=post_id).update(tags_text=', '.join(post_names)[:200])
+
+
+def rebuild_search_index(apps, schema_editor):
+    """Re-index every post with its tags from the new table"""
+    conn = schema_editor.connection
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        # The index only exists where 0005 could create it
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        if cursor.fetchone() is None:
+            return
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            "SELECT p.id, p.title, p.excerpt, p.content, "
+            "(SELECT group_concat(t.name, ' ') FROM blog_posttag pt JOIN blog_tag t ON t.id = pt.tag_id "
+            "WHERE pt.post_id = p.id) FROM blog_post p"
+        )
+        rows = cursor.fetchmany(1000)
+        while rows:
+            with conn.cursor() as insert_cursor:
+                insert_cursor.executemany(
+                    f"INSERT INTO {FTS_TABLE}(rowid, title, excerpt, content, tags) VALUES (%s, %s, %s, %s, %s)",
+                    [
+                        (post_id, title, strip_tags(excerpt), strip_tags(content), tags or '')
+                        for post_id, title, excerpt, content, tags in rows
+                    ],
+                )
+            rows = cursor.fetchmany(1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_relatedpost'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('slug', models.SlugField(unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PostTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_links', to='blog.post')),
+                ('tag', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='post_links', to='blog.tag')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('tag', 'post'), name='posttag_tag_post_uniq')],
+            },
+        ),
+        migrations.RenameField(
+            model_name='post',
+            old_name='tags',
+            new_name='tags_text',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='posts', through='blog.PostTag', to='blog.tag'),
+        ),
+        migrations.RunPython(split_tags, join_tags),
+        migrations.RemoveField(
+            model_name='post',
+            name='tags_text',
+        ),
+        migrations.RunPython(rebuild_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,194 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:02
+
+import math
+import re
+from html import unescape
+from html.parser import HTMLParser
+
+import bleach
+from django.db import migrations, models
+from django.utils.html import escape
+from django.utils.text import Truncator, slugify
+
+# Frozen copy of core.rendering as of this migration, so later changes to the live
+# renderer cannot change what this backfill writes or break a fresh migrate
+
+# What the Summernote toolbar can produce; everything else is stripped
+ALLOWED_TAGS = frozenset({
+    'a', 'abbr', 'b', 'blockquote', 'br', 'caption', 'code', 'div', 'em', 'figcaption', 'figure',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'iframe', 'img', 'li', 'ol', 'p', 'pre', 's',
+    'span', 'strike', 'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr',
+    'u', 'ul',
+})
+ALLOWED_PROTOCOLS = frozenset({'http', 'https', 'mailto', 'tel', 'data'})
+# Video embeds are the only frames kept
+EMBED_PREFIXES = ('https://www.youtube.com/embed/', 'https://www.youtube-nocookie.com/embed/',
+                  'https://player.vimeo.com/video/')
+
+# Headings that make up the table of contents
+TOC_TAGS = ('h2', 'h3')
+# Closing these separates words in the plain text
+BLOCK_TAGS = frozenset({
+    'blockquote', 'br', 'caption', 'div', 'figcaption', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'li',
+    'p', 'pre', 'td', 'th', 'tr',
+})
+
+
+def _allow_link(tag, name, value):
+    # data: is allowed for inline images only
+    return name in ('title', 'target') or (name == 'href' and not value.strip().lower().startswith('data:'))
+
+
+def _allow_image(tag, name, value):
+    if name == 'src':
+        value = value.strip().lower()
+        return not value.startswith('data:') or value.startswith('data:image/')
+    return name in ('alt', 'title', 'width', 'height')
+
+
+def _allow_embed(tag, name, value):
+    if name == 'src':
+        return value.startswith(EMBED_PREFIXES)
+    return name in ('width', 'height', 'allowfullscreen', 'title')
+
+
+ALLOWED_ATTRIBUTES = {
+    '*': ['class'],
+    'a': _allow_link,
+    'img': _allow_image,
+    'iframe': _allow_embed,
+    'td': ['colspan', 'rowspan'],
+    'th': ['colspan', 'rowspan', 'scope'],
+}
+
+
+# strip=True keeps the text of removed tags, which for these is code
+SCRIPT_BLOCKS = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+
+
+def sanitize_html(html):
+    return bleach.clean(
+        SCRIPT_BLOCKS.sub('', html), tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES,
+        protocols=ALLOWED_PROTOCOLS, strip=True,
+    )
+
+
+class _Rewriter(HTMLParser):
+    # Collects the plain text, gives TOC headings ids and marks images and frames lazy
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.out = []
+        self.text = []
+        self.toc = []
+        self.ids = set()
+        # (tag, attrs, position of its start tag in out, text) of the open TOC heading
+        self.heading = None
+
+    def _start_tag(self, tag, attrs):
+        rendered = ''.join(f' {name}' if value is None else f' {name}="{escape(value)}"' for name, value in attrs)
+        return f'<{tag}{rendered}>'
+
+    def _add_text(self, text):
+        self.text.append(text)
+        if self.heading:
+            self.heading[3].append(text)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('img', 'iframe'):
+            names = {name for name, _value in attrs}
+            attrs = list(attrs)
+            if 'loading' not in names:
+                attrs.append(('loading', 'lazy'))
+            if tag == 'img' and 'decoding' not in names:
+                attrs.append(('decoding', 'async'))
+        if tag in TOC_TAGS and self.heading is None:
+            self.heading = (tag, attrs, len(self.out), [])
+        if tag in BLOCK_TAGS:
+            self.text.append(' ')
+        self.out.append(self._start_tag(tag, attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self.out.append(f'</{tag}>')
+        if tag in BLOCK_TAGS:
+            self.text.append(' ')
+        if self.heading and tag == self.heading[0]:
+            _tag, attrs, position, text = self.heading
+            self.heading = None
+            title = ' '.join(''.join(text).split())
+            if not title:
+                return
+            anchor = base = slugify(title) or 'section'
+            n = 1
+            while anchor in self.ids:
+                n += 1
+                anchor = f'{base}-{n}'
+            self.ids.add(anchor)
+            self.out[position] = self._start_tag(tag, [*attrs, ('id', anchor)])
+            self.toc.append({'id': anchor, 'title': title, 'level': int(tag[1])})
+
+    def handle_data(self, data):
+        self.out.append(data)
+        self._add_text(data)
+
+    def handle_entityref(self, name):
+        self.out.append(f'&{name};')
+        self._add_text(unescape(f'&{name};'))
+
+    def handle_charref(self, name):
+        self.out.append(f'&#{name};')
+        self._add_text(unescape(f'&#{name};'))
+
+
+def render_rich_text(html):
+    """Return (html, text, read_time, toc) for editor HTML"""
+    rewriter = _Rewriter()
+    rewriter.feed(sanitize_html(html or ''))
+    rewriter.close()
+    text = re.sub(r'\s+', ' ', ''.join(rewriter.text)).strip()
+    words = len(text.split())
+    return ''.join(rewriter.out), text, math.ceil(words / 200) if words else 0, rewriter.toc
+
+
+def render_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    batch = []
+    for post in Post.objects.only('content', 'excerpt').iterator(chunk_size=500):
+        post.content_html, text, post.read_time, post.toc = render_rich_text(post.content)
+        # Excerpts save() cut from the raw HTML become plain text; written ones are kept
+        content = post.content or ''
+        if post.excerpt in ('', content, content[:300] + '...'):
+            post.excerpt = Truncator(text).chars(300)
+        batch.append(post)
+        if len(batch) >= 500:
+            Post.objects.bulk_update(batch, ['content_html', 'read_time', 'toc', 'excerpt'])
+            batch = []
+    Post.objects.bulk_update(batch, ['content_html', 'read_time', 'toc', 'excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='read_time',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='Minutes to read'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='toc',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Table of contents'),
+        ),
+        migrations.RunPython(render_posts, migrations.RunPython.noop),
+    ]
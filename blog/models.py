@@ -1,9 +1,13 @@
 # blog/models.py
 from django.db import models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.text import slugify
 from django.urls import reverse
 from accounts.models import User
+from core.rendering import excerpt_from_text, render_rich_text
+from core.view_counters import record_view
 
 class Category(models.Model):
     """Model for blog post categories"""
@@ -13,10 +17,16 @@ class Category(models.Model):
     image = models.ImageField(upload_to='blog/categories/', blank=True, null=True)
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    # Kept up to date by the Post signals in blog/signals.py
+    published_post_count = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         verbose_name_plural = 'Categories'
         ordering = ['order', 'name']
+        indexes = [
+            # The sidebar: active categories in display order
+            models.Index(fields=['is_active', 'order', 'name'], name='category_active_order_idx'),
+        ]
     
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -28,6 +38,53 @@ class Category(models.Model):
     
     def get_absolute_url(self):
         return reverse('blog:category', kwargs={'slug': self.slug})
+    
+    @classmethod
+    def refresh_post_counts(cls, pks=None):
+        """Recount published posts of the given categories (all when pks is None) in one UPDATE"""
+        published = Post.objects.filter(category=OuterRef('pk'), status='published').order_by().values(
+            'category'
+        ).annotate(count=Count('pk')).values('count')
+        categories = cls.objects.all() if pks is None else cls.objects.filter(pk__in=pks)
+        return categories.update(published_post_count=Coalesce(Subquery(published), 0))
+
+class Tag(models.Model):
+    """Model for blog post tags"""
+    name = models.CharField(max_length=50)
+    slug = models.SlugField(max_length=50, unique=True)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+    
+    def get_absolute_url(self):
+        return reverse('blog:tag', kwargs={'tag': self.slug})
+    
+    @classmethod
+    def from_names(cls, names):
+        """Return the tags for the given names in order, creating the missing ones; names match by slug"""
+        wanted = {}
+        for name in names:
+            name = name.strip()[:50]
+            slug = slugify(name)
+            if slug:
+                wanted.setdefault(slug, name)
+        tags = {tag.slug: tag for tag in cls.objects.filter(slug__in=wanted)}
+        missing = [cls(name=name, slug=slug) for slug, name in wanted.items() if slug not in tags]
+        if missing:
+            # Another request may create the same tag meanwhile
+            cls.objects.bulk_create(missing, ignore_conflicts=True)
+            tags = {tag.slug: tag for tag in cls.objects.filter(slug__in=wanted)}
+        return [tags[slug] for slug in wanted]
+    
+    @classmethod
+    def with_post_counts(cls):
+        """Tags used by published posts, annotated with post_count, most used first"""
+        return cls.objects.annotate(
+            post_count=Count('posts', filter=Q(posts__status='published'))
+        ).filter(post_count__gt=0).order_by('-post_count', 'name')
 
 class Post(models.Model):
     """Model for blog posts"""
@@ -44,8 +101,12 @@ class Post(models.Model):
     content = models.TextField()
     featured_image = models.ImageField(upload_to='blog/')
     excerpt = models.TextField(max_length=300, blank=True)
+    # Rendered from content on save, so detail pages do no text processing
+    content_html = models.TextField(blank=True, editable=False)
+    read_time = models.PositiveSmallIntegerField(default=0, editable=False, help_text="Minutes to read")
+    toc = models.JSONField(default=list, blank=True, editable=False, help_text="Table of contents")
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, related_name='posts')
-    tags = models.CharField(max_length=200, blank=True, help_text="Comma-separated tags")
+    tags = models.ManyToManyField(Tag, through='PostTag', related_name='posts', blank=True)
     
     # Status field instead of is_published
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
@@ -67,14 +128,34 @@ class Post(models.Model):
     
     class Meta:
         ordering = ['-published_date']
+        indexes = [
+            # Published lists (blog, home, per category) in cursor order
+            models.Index(fields=['status', '-published_date', '-id'], name='post_status_published_idx'),
+            models.Index(fields=['category', 'status', '-published_date', '-id'], name='post_category_status_idx'),
+        ]
+    
+    # Fields save() derives from content
+    RENDERED_FIELDS = ('content_html', 'read_time', 'toc', 'excerpt')
     
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
-        if not self.excerpt and self.content:
-            self.excerpt = self.content[:300] + '...' if len(self.content) > 300 else self.content
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            self.render_content()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *self.RENDERED_FIELDS}
         super().save(*args, **kwargs)
     
+    def render_content(self):
+        """Fill the rendered fields (and a missing excerpt) from content"""
+        rendered = render_rich_text(self.content)
+        self.content_html = rendered.html
+        self.read_time = rendered.read_time
+        self.toc = rendered.toc
+        if not self.excerpt:
+            self.excerpt = excerpt_from_text(rendered.text)
+    
     def __str__(self):
         return self.title
     
@@ -82,14 +163,54 @@ class Post(models.Model):
         return reverse('blog:post_detail', kwargs={'slug': self.slug})
     
     def increment_views(self):
+        """Count a page view; hits are buffered and saved in batches"""
+        record_view(self)
         self.views += 1
-        self.save(update_fields=['views'])
+    
+    def get_related_posts(self, count=3):
+        """Precomputed neighbours (see core/related.py), else the latest posts in the same category"""
+        related = list(
+            Post.objects.filter(related_to__post=self, status='published').order_by('related_to__rank')[:count]
+        )
+        if related or not self.category_id:
+            return related
+        return list(Post.objects.filter(category_id=self.category_id, status='published').exclude(pk=self.pk)[:count])
     
     def get_tags_list(self):
-        """Convert tags string to list"""
-        if self.tags:
-            return [tag.strip() for tag in self.tags.split(',')]
-        return []
+        """Tag names; iterating .all() reuses prefetched tags"""
+        return [tag.name for tag in self.tags.all()]
+    
+    def set_tags(self, names):
+        """Replace the post's tags with the named ones, creating tags that don't exist yet"""
+        self.tags.set(Tag.from_names(names))
+
+class PostTag(models.Model):
+    """A tag on a post"""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='tag_links')
+    # The unique (tag, post) index below already serves lookups by tag
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='post_links', db_index=False)
+    
+    class Meta:
+        constraints = [
+            # Also the index behind tag pages and tag counts (tag -> posts)
+            models.UniqueConstraint(fields=['tag', 'post'], name='posttag_tag_post_uniq'),
+        ]
+
+class RelatedPost(models.Model):
+    """A precomputed neighbour of a post, written by the build_related_content command"""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    related = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='related_to')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    
+    class Meta:
+        ordering = ['post', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'rank'], name='relatedpost_post_rank_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.post_id} -> {self.related_id} ({self.score:.2f})"
 
 class Comment(models.Model):
     """Model for blog comments"""
@@ -102,6 +223,12 @@ class Comment(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='comment_created_idx'),
+            # Pending comments are the small subset behind the moderation badge
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(is_approved=False),
+                         name='comment_pending_idx'),
+        ]
     
     def __str__(self):
         return f"Comment by {self.user.username} on {self.post.title}"
@@ -114,5 +241,10 @@ class NewsletterSubscriber(models.Model):
     is_active = models.BooleanField(default=True)
     source = models.CharField(max_length=50, default='blog')
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['-subscribed_at', '-id'], name='newsletter_subscribed_idx'),
+        ]
+    
     def __str__(self):
         return self.email
\ No newline at end of file
@@ -0,0 +1,215 @@
+# blog/search.py
+import re
+
+from django.db import connection
+from django.utils.functional import cached_property
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import mark_safe
+
+FTS_TABLE = 'blog_post_fts'
+
+# bm25() column weights for title, excerpt, content and tags
+BM25_WEIGHTS = (10.0, 5.0, 1.0, 3.0)
+
+# Control characters used as snippet highlight markers, swapped for <mark> after escaping
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+_fts5_available = None
+
+
+def fts_available(conn=None):
+    """Return True if the database supports the SQLite FTS5 search index"""
+    global _fts5_available
+    conn = conn or connection
+    if conn.vendor != 'sqlite':
+        return False
+    if _fts5_available is None:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            _fts5_available = bool(cursor.fetchone()[0])
+    return _fts5_available
+
+
+def create_index(conn=None):
+    """Create the FTS5 table (if needed) and fill it from the existing posts"""
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            f"USING fts5(title, excerpt, content, tags, tokenize='porter unicode61')"
+        )
+    rebuild_index(conn)
+
+
+def drop_index(conn=None):
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def _index_row(post_id, title, excerpt, content, tags):
+    return (post_id, title, strip_tags(excerpt), strip_tags(content), tags or '')
+
+
+def _tag_names(conn, post_ids):
+    """Return {post_id: space-separated tag names} for the given posts"""
+    placeholders = ', '.join(['%s'] * len(post_ids))
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"SELECT pt.post_id, t.name FROM blog_posttag pt JOIN blog_tag t ON t.id = pt.tag_id "
+            f"WHERE pt.post_id IN ({placeholders})",
+            list(post_ids),
+        )
+        names = {}
+        for post_id, name in cursor.fetchall():
+            names[post_id] = f"{names[post_id]} {name}" if post_id in names else name
+    return names
+
+
+def rebuild_index(conn=None, batch_size=1000):
+    """Re-index every post; used by the migration and the rebuild_search_index command"""
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            "SELECT p.id, p.title, p.excerpt, p.content, "
+            "(SELECT group_concat(t.name, ' ') FROM blog_posttag pt JOIN blog_tag t ON t.id = pt.tag_id "
+            "WHERE pt.post_id = p.id) FROM blog_post p"
+        )
+        rows = cursor.fetchmany(batch_size)
+        while rows:
+            with conn.cursor() as insert_cursor:
+                insert_cursor.executemany(
+                    f"INSERT INTO {FTS_TABLE}(rowid, title, excerpt, content, tags) VALUES (%s, %s, %s, %s, %s)",
+                    [_index_row(*row) for row in rows],
+                )
+            rows = cursor.fetchmany(batch_size)
+
+
+def index_post(post):
+    """Add or refresh a single post in the search index"""
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, excerpt, content, tags) VALUES (%s, %s, %s, %s, %s)",
+            _index_row(post.pk, post.title, post.excerpt, post.content, ' '.join(post.get_tags_list())),
+        )
+
+
+def index_posts(posts):
+    """Add or refresh many posts at once, e.g. after a bulk_create that sent no signals"""
+    if not fts_available() or not posts:
+        return
+    placeholders = ', '.join(['%s'] * len(posts))
+    tags = _tag_names(connection, [post.pk for post in posts])
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", [post.pk for post in posts])
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, excerpt, content, tags) VALUES (%s, %s, %s, %s, %s)",
+            [_index_row(post.pk, post.title, post.excerpt, post.content, tags.get(post.pk)) for post in posts],
+        )
+
+
+def unindex_post(post):
+    """Remove a single post from the search index"""
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post.pk])
+
+
+def build_match_query(query):
+    """Turn free text into an FTS5 query: every word must match, as a prefix"""
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _highlight(snippet):
+    return mark_safe(
+        escape(snippet).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+    )
+
+
+def _match_published(query, select, suffix='', params=()):
+    match = build_match_query(query)
+    if not match:
+        return []
+    with connection.cursor() as cursor:
+        # CROSS JOIN keeps the index as the outer loop; for a bare COUNT SQLite would
+        # otherwise scan every published post and probe the index once per row
+        cursor.execute(
+            f"SELECT {select} FROM {FTS_TABLE} f CROSS JOIN blog_post p ON p.id = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND p.status = 'published' {suffix}",
+            [match, *params],
+        )
+        return cursor.fetchall()
+
+
+def search_post_ids(query, limit=-1, offset=0):
+    """
+    Return the ids of published posts matching query, best BM25 match first.
+    limit and offset select a slice of the ranking; a limit of -1 returns every match.
+    """
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    rows = _match_published(
+        query, 'f.rowid', f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s OFFSET %s", [limit, offset],
+    )
+    return [row[0] for row in rows]
+
+
+def count_matching_posts(query):
+    """Return the number of published posts matching query"""
+    rows = _match_published(query, 'COUNT(*)')
+    return rows[0][0] if rows else 0
+
+
+def get_snippets(query, post_ids):
+    """Return {post_id: highlighted content snippet} for the given search hits"""
+    match = build_match_query(query)
+    if not match or not post_ids:
+        return {}
+    placeholders = ', '.join(['%s'] * len(post_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, snippet({FTS_TABLE}, 2, %s, %s, '…', 24) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rowid IN ({placeholders})",
+            [_MARK_START, _MARK_END, match, *post_ids],
+        )
+        return {post_id: _highlight(snippet) for post_id, snippet in cursor.fetchall()}
+
+
+class SearchResults:
+    """
+    Ranked search hits for a paginator: the count and each page are separate FTS
+    queries, and posts and snippets are only loaded for the requested slice
+    """
+
+    def __init__(self, query, queryset):
+        self.query = query
+        self.queryset = queryset
+
+    @cached_property
+    def count(self):
+        return count_matching_posts(self.query)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        limit = -1 if key.stop is None else max(key.stop - start, 0)
+        post_ids = search_post_ids(self.query, limit, start)
+        posts = self.queryset.in_bulk(post_ids)
+        snippets = get_snippets(self.query, post_ids)
+        results = []
+        for post_id in post_ids:
+            post = posts.get(post_id)
+            if post is not None:
+                post.search_snippet = snippets.get(post_id, '')
+                results.append(post)
+        return results
@@ -0,0 +1,88 @@
+# blog/signals.py
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+
+from core.caching import invalidate_counts
+from .models import Category, Comment, Post, Tag
+from .search import index_post, index_posts, unindex_post
+
+
+def update_search_index(sender, instance, **kwargs):
+    index_post(instance)
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_post(instance)
+
+
+def reindex_post_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    # reverse is True for tag.posts.add(...), where instance is the tag
+    if action == 'pre_clear' and reverse:
+        instance._cleared_post_ids = list(instance.posts.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            index_post(instance)
+            return
+        pks = getattr(instance, '_cleared_post_ids', []) if action == 'post_clear' else pk_set
+        if pks:
+            index_posts(list(Post.objects.filter(pk__in=pks)))
+
+
+def reindex_tagged_posts(sender, instance, created=False, **kwargs):
+    # Renamed or deleted tags change the indexed tag names of their posts
+    pks = getattr(instance, '_tagged_post_ids', None)
+    if pks is None:
+        pks = [] if created else list(instance.posts.values_list('pk', flat=True))
+    if pks:
+        index_posts(list(Post.objects.filter(pk__in=pks)))
+
+
+def remember_tagged_posts(sender, instance, **kwargs):
+    # The through rows are gone by post_delete
+    instance._tagged_post_ids = list(instance.posts.values_list('pk', flat=True))
+
+
+def connect_search_index_signals():
+    post_save.connect(update_search_index, sender=Post, dispatch_uid='blog_search_index_save')
+    post_delete.connect(remove_from_search_index, sender=Post, dispatch_uid='blog_search_index_delete')
+    m2m_changed.connect(reindex_post_tags, sender=Post.tags.through, dispatch_uid='blog_search_index_tags')
+    post_save.connect(reindex_tagged_posts, sender=Tag, dispatch_uid='blog_search_index_tag')
+    pre_delete.connect(remember_tagged_posts, sender=Tag, dispatch_uid='blog_search_index_tag')
+    post_delete.connect(reindex_tagged_posts, sender=Tag, dispatch_uid='blog_search_index_tag')
+
+
+def invalidate_comment_count(sender, **kwargs):
+    invalidate_counts('pending_comments')
+
+
+def connect_count_signals():
+    post_save.connect(invalidate_comment_count, sender=Comment, dispatch_uid='count_comment')
+    post_delete.connect(invalidate_comment_count, sender=Comment, dispatch_uid='count_comment')
+
+
+def remember_counted_state(sender, instance, raw=False, **kwargs):
+    # The category and status the stored row is counted under, if it exists yet
+    instance._counted_state = None
+    if instance.pk and not raw:
+        instance._counted_state = sender.objects.filter(pk=instance.pk).values_list('category_id', 'status').first()
+
+
+def update_category_counts(sender, instance, raw=False, **kwargs):
+    previous = getattr(instance, '_counted_state', None)
+    current = (instance.category_id, instance.status)
+    was_published = previous is not None and previous[1] == 'published'
+    if raw or previous == current or not (was_published or instance.status == 'published'):
+        return
+    pks = {instance.category_id, previous[0] if previous else None} - {None}
+    if pks:
+        Category.refresh_post_counts(pks)
+
+
+def update_category_count_on_delete(sender, instance, **kwargs):
+    if instance.category_id and instance.status == 'published':
+        Category.refresh_post_counts([instance.category_id])
+
+
+def connect_category_count_signals():
+    pre_save.connect(remember_counted_state, sender=Post, dispatch_uid='category_count_post')
+    post_save.connect(update_category_counts, sender=Post, dispatch_uid='category_count_post')
+    post_delete.connect(update_category_count_on_delete, sender=Post, dispatch_uid='category_count_post')
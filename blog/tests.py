@@ -1,3 +1,302 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from accounts.models import User
+from core.view_counters import flush_views
+from .context_processors import blog_context
+from .forms import PostForm
+from .models import Category, Comment, Post, Tag
+from .search import SearchResults, build_match_query, get_snippets, search_post_ids
+
+
+def create_post(author, title, **kwargs):
+    kwargs.setdefault('content', 'Body')
+    kwargs.setdefault('featured_image', 'blog/post.jpg')
+    kwargs.setdefault('status', 'published')
+    tags = kwargs.pop('tags', '')
+    post = Post.objects.create(author=author, title=title, **kwargs)
+    if tags:
+        post.set_tags(tags.split(','))
+    return post
+
+
+class BlogSearchTests(TestCase):
+    """Tests for the FTS5 blog search index"""
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='writer', email='writer@example.com', password='x')
+        self.roofing = create_post(
+            self.author, 'Roofing in the rainy season',
+            content='<p>Choosing <b>roofing</b> sheets that survive the rains.</p>', tags='roofing, rain',
+        )
+        self.wiring = create_post(
+            self.author, 'Safe wiring', content='Why roofing contractors need an electrician.',
+        )
+        self.draft = create_post(self.author, 'Roofing draft', status='draft')
+
+    def test_title_matches_rank_above_body_matches(self):
+        self.assertEqual(search_post_ids('roofing'), [self.roofing.pk, self.wiring.pk])
+
+    def test_results_are_counted_and_sliced_in_the_index(self):
+        extra = [create_post(self.author, f'Roofing tips {i}') for i in range(3)]
+        ranking = search_post_ids('roofing')
+        self.assertEqual(set(ranking), {self.roofing.pk, self.wiring.pk, *(post.pk for post in extra)})
+        self.assertEqual(search_post_ids('roofing', limit=2, offset=1), ranking[1:3])
+        results = SearchResults('roofing', Post.objects.all())
+        # One COUNT, then one ranked page, its posts and their snippets
+        with self.assertNumQueries(4):
+            self.assertEqual(len(results), 5)
+            self.assertEqual([post.pk for post in results[3:9]], ranking[3:])
+
+    def test_prefix_matching(self):
+        self.assertEqual(search_post_ids('electric'), [self.wiring.pk])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.wiring.title = 'Solar panels'
+        self.wiring.content = 'Inverters and batteries'
+        self.wiring.excerpt = ''
+        self.wiring.save()
+        self.assertEqual(search_post_ids('electrician'), [])
+        self.assertEqual(search_post_ids('inverters'), [self.wiring.pk])
+        self.wiring.delete()
+        self.assertEqual(search_post_ids('inverters'), [])
+
+    def test_snippets_are_escaped_and_highlighted(self):
+        post = create_post(self.author, 'Markup', content='Use <script>x</script> &amp; concrete mixes')
+        snippet = get_snippets('concrete', [post.pk])[post.pk]
+        self.assertIn('<mark>concrete</mark>', snippet)
+        self.assertNotIn('<script>', snippet)
+
+    def test_query_syntax_is_neutralised(self):
+        self.assertEqual(build_match_query('roof* OR "wire" -x'), '"roof"* "OR"* "wire"* "x"*')
+        self.assertEqual(build_match_query('!!!'), '')
+
+    def test_search_view_renders_ranked_results(self):
+        response = self.client.get(reverse('blog:search'), {'q': 'roofing'})
+        self.assertEqual(
+            [post.pk for post in response.context['posts']], [self.roofing.pk, self.wiring.pk]
+        )
+        self.assertContains(response, '<mark>roofing</mark>')
+
+
+
+class CommentCountTests(TestCase):
+    """Tests for the cached pending comment counter"""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='writer', email='writer@example.com', password='x')
+        self.request = RequestFactory().get('/')
+        self.request.user = self.author
+        self.comment = Comment.objects.create(post=create_post(self.author, 'Post'), user=self.author, content='Hi')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_counter_is_cached_until_a_comment_changes(self):
+        self.assertEqual(int(blog_context(self.request)['comment_count']), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(int(blog_context(self.request)['comment_count']), 1)
+        self.comment.is_approved = True
+        self.comment.save()
+        self.assertEqual(int(blog_context(self.request)['comment_count']), 0)
+
+
+
+class BlogListPaginationTests(TestCase):
+    """Tests for cursor pagination on the public blog list"""
+
+    def setUp(self):
+        cache.clear()
+        author = User.objects.create_user(username='writer', email='writer@example.com', password='x')
+        self.posts = [create_post(author, f'Post {i}', slug=f'post-{i}') for i in range(12)]
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_next_page_continues_after_the_cursor(self):
+        url = reverse('blog:blog_list')
+        first = self.client.get(url)
+        page = first.context['page_obj']
+        self.assertEqual(len(page), 9)
+        self.assertContains(first, f'?cursor={page.next_cursor}')
+        second = self.client.get(url, {'cursor': page.next_cursor})
+        shown = [post.pk for post in page] + [post.pk for post in second.context['posts']]
+        self.assertEqual(sorted(shown), sorted(post.pk for post in self.posts))
+        self.assertFalse(second.context['page_obj'].has_next())
+
+
+class CategoryPostCountTests(TestCase):
+    """Tests for the denormalized published post count on categories"""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='writer', email='writer@example.com', password='x')
+        self.news = Category.objects.create(name='News')
+        self.guides = Category.objects.create(name='Guides')
+
+    def tearDown(self):
+        cache.clear()
+
+    def assertCounts(self, news, guides):
+        self.news.refresh_from_db()
+        self.guides.refresh_from_db()
+        self.assertEqual((self.news.published_post_count, self.guides.published_post_count), (news, guides))
+
+    def test_counts_follow_post_changes(self):
+        post = create_post(self.author, 'Opening', category=self.news)
+        create_post(self.author, 'Draft', category=self.news, status='draft')
+        self.assertCounts(1, 0)
+
+        post.category = self.guides
+        post.save()
+        self.assertCounts(0, 1)
+
+        post.status = 'archived'
+        post.save()
+        self.assertCounts(0, 0)
+
+        post.status = 'published'
+        post.save()
+        post.delete()
+        self.assertCounts(0, 0)
+
+    def test_unchanged_saves_skip_the_recount(self):
+        post = create_post(self.author, 'Opening', category=self.news)
+        post.title = 'Grand opening'
+        with CaptureQueriesContext(connection) as queries:
+            post.save()
+        self.assertFalse([query for query in queries if 'blog_category' in query['sql']])
+
+    def test_refresh_post_counts_repairs_bulk_writes(self):
+        Post.objects.bulk_create([
+            Post(author=self.author, title=f'Bulk {i}', slug=f'bulk-{i}', content='Body', category=self.guides,
+                 featured_image='blog/post.jpg', status='published')
+            for i in range(3)
+        ])
+        self.assertCounts(0, 0)
+        Category.refresh_post_counts()
+        self.assertCounts(0, 3)
+
+    def test_sidebar_reads_the_counter(self):
+        create_post(self.author, 'Opening', category=self.news, slug='opening')
+        create_post(self.author, 'Draft', category=self.news, slug='draft', status='draft')
+        response = self.client.get(reverse('blog:blog_list'))
+        self.assertContains(response, 'News <span>(1)</span>', html=False)
+
+
+class TagTests(TestCase):
+    """Tests for tags, the tag pages and the tag cloud"""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='writer', email='writer@example.com', password='x')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_from_names_reuses_tags_by_slug(self):
+        existing = Tag.objects.create(name='Roofing', slug='roofing')
+        tags = Tag.from_names(['roofing ', 'Solar Power', 'ROOFING', '', '!!'])
+        self.assertEqual(tags[0], existing)
+        self.assertEqual([tag.slug for tag in tags], ['roofing', 'solar-power'])
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def test_form_saves_comma_separated_tags(self):
+        category = Category.objects.create(name='Guides')
+        post = create_post(self.author, 'Roofs', category=category, tags='roofing, rain')
+        form = PostForm(instance=post)
+        self.assertEqual(form['tags'].value(), 'rain, roofing')
+
+        data = {
+            'title': post.title, 'content': post.content, 'excerpt': 'Roofs', 'category': category.pk,
+            'status': 'published',
+            'published_date': '2026-01-01T10:00', 'tags': 'Rain, solar,, ',
+        }
+        form = PostForm(data, instance=post)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertEqual(post.get_tags_list(), ['rain', 'solar'])
+        self.assertEqual(search_post_ids('solar'), [post.pk])
+
+    def test_tag_page_lists_published_posts_with_the_tag(self):
+        tagged = create_post(self.author, 'Roofs', slug='roofs', tags='roofing')
+        create_post(self.author, 'Walls', slug='walls', tags='masonry')
+        create_post(self.author, 'Draft roofs', slug='draft-roofs', tags='roofing', status='draft')
+        response = self.client.get(reverse('blog:tag', args=['roofing']))
+        self.assertEqual(list(response.context['posts']), [tagged])
+        self.assertEqual(response.context['current_tag'].slug, 'roofing')
+        self.assertEqual(self.client.get(reverse('blog:tag', args=['missing'])).status_code, 404)
+
+    def test_tag_cloud_counts_published_posts(self):
+        create_post(self.author, 'One', slug='one', tags='roofing, rain')
+        create_post(self.author, 'Two', slug='two', tags='roofing')
+        create_post(self.author, 'Draft', slug='draft', tags='drafts', status='draft')
+        with self.assertNumQueries(1):
+            counts = [(tag.name, tag.post_count) for tag in Tag.with_post_counts()]
+        self.assertEqual(counts, [('roofing', 2), ('rain', 1)])
+        response = self.client.get(reverse('blog:tag_list'))
+        self.assertContains(response, 'roofing <span>(2)</span>', html=False)
+        self.assertNotContains(response, 'drafts')
+
+    def test_search_index_follows_tag_changes(self):
+        post = create_post(self.author, 'Roofs', tags='roofing')
+        post.set_tags(['gutters'])
+        self.assertEqual(search_post_ids('gutters'), [post.pk])
+        self.assertEqual(search_post_ids('roofing'), [post.pk])  # still in the title
+        tag = Tag.objects.get(slug='gutters')
+        tag.name = 'Downpipes'
+        tag.save()
+        self.assertEqual(search_post_ids('downpipes'), [post.pk])
+        tag.delete()
+        self.assertEqual(search_post_ids('downpipes'), [])
+
+
+class BlogDetailTests(TestCase):
+    """Tests for the public post detail page"""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='writer', email='writer@example.com', password='x',
+                                               is_active=True)
+        category = Category.objects.create(name='Roofing')
+        self.post = create_post(
+            self.author, 'Choosing sheets', category=category,
+            content='<h2>Gauges</h2><p>Thicker lasts</p><h2>Colours</h2><p>Light reflects heat</p>',
+        )
+        for i in range(3):
+            create_post(self.author, f'Related {i}', category=category)
+        Comment.objects.create(post=self.post, user=self.author, content='Helpful', is_approved=True)
+        Comment.objects.create(post=self.post, user=self.author, content='Spam', is_approved=False)
+
+    def tearDown(self):
+        cache.clear()
+        # Write buffered hits to the test database rather than at interpreter exit
+        flush_views()
+
+    def test_serves_stored_html_and_toc(self):
+        # Rendering must not depend on the raw content
+        Post.objects.filter(pk=self.post.pk).update(content='')
+        url = reverse('blog:post_detail', kwargs={'slug': self.post.slug})
+        # Post with author and category, related posts (no stored neighbours here, so the
+        # category fallback), tags, approved comments with users and the sidebar categories
+        with self.assertNumQueries(6):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<h2 id="gauges">Gauges</h2>', html=False)
+        self.assertContains(response, '<a href="#colours">Colours</a>', html=True)
+        self.assertContains(response, 'Helpful')
+        self.assertNotContains(response, 'Spam')
+
+    def test_signed_in_users_can_comment(self):
+        url = reverse('blog:add_comment', kwargs={'slug': self.post.slug})
+        self.assertEqual(self.client.post(url, {'text': 'Nice'}).status_code, 302)
+        self.assertFalse(Comment.objects.filter(content='Nice').exists())
+
+        self.client.force_login(self.author)
+        response = self.client.post(url, {'text': 'Nice'})
+        self.assertRedirects(response, self.post.get_absolute_url() + '#comment-form', fetch_redirect_response=False)
+        self.assertFalse(Comment.objects.get(content='Nice').is_approved)
@@ -2,7 +2,7 @@
 from django.urls import path
 from .views import (
     # Public URLs
-    BlogListView, BlogDetailView, BlogSearchView,
+    BlogListView, BlogDetailView, BlogSearchView, TagListView, add_comment,
     
     # Dashboard URLs
     BlogDashboardView, PostCreateView, PostUpdateView, PostDeleteView,
@@ -35,7 +35,10 @@ urlpatterns = [
     # Public URLs - THESE COME AFTER DASHBOARD URLS
     path('', BlogListView.as_view(), name='blog_list'),
     path('category/<slug:slug>/', BlogListView.as_view(), name='category'),
+    path('tags/', TagListView.as_view(), name='tag_list'),
+    path('tag/<slug:tag>/', BlogListView.as_view(), name='tag'),
     path('search/', BlogSearchView.as_view(), name='search'),
+    path('<slug:slug>/comment/', add_comment, name='add_comment'),
     
     # This MUST BE LAST - it catches any slug, so it should be the last pattern
     path('<slug:slug>/', BlogDetailView.as_view(), name='post_detail'),
@@ -1,39 +1,53 @@
 # blog/views.py
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.shortcuts import get_object_or_404, redirect
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.contrib import messages
-from django.db.models import Count, Q
+from django.db.models import Q
 from django.http import JsonResponse
+from django.utils.text import slugify
 from django.views.decorators.http import require_POST
 
-from .models import Post, Category, Comment, NewsletterSubscriber
+from core.caching import AnonymousCachePageMixin
+from core.pagination import CursorPaginationMixin
+from core.stats import get_stats
+from .models import Post, PostTag, Category, Comment, NewsletterSubscriber, Tag
 from .forms import CategoryForm, PostForm, CommentForm, NewsletterForm
+from .search import SearchResults, fts_available
 
 # Public Views
-class BlogListView(ListView):
+class BlogListView(AnonymousCachePageMixin, CursorPaginationMixin, ListView):
     """Public blog post list"""
+    page_cache_group = 'blog'
     model = Post
     template_name = 'blog/blog_list.html'
     context_object_name = 'posts'
     paginate_by = 9
+    cursor_ordering = ('-published_date', '-id')
     
     def get_queryset(self):
         queryset = Post.objects.filter(status='published')
         category_slug = self.kwargs.get('slug')
+        tag_slug = self.kwargs.get('tag')
         
         if category_slug:
             category = get_object_or_404(Category, slug=category_slug)
             queryset = queryset.filter(category=category)
         
+        self.tag = None
+        if tag_slug:
+            # Walks the (tag, post) index of the link table
+            self.tag = get_object_or_404(Tag, slug=tag_slug)
+            queryset = queryset.filter(tags=self.tag)
+        
         return queryset.select_related('category', 'author')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.filter(is_active=True).annotate(
-            post_count=Count('posts')
-        )
+        context['categories'] = Category.objects.filter(is_active=True)
+        context['popular_tags'] = Tag.with_post_counts()[:15]
         context['featured_posts'] = Post.objects.filter(
             status='published', is_featured=True
         )[:3]
@@ -41,9 +55,25 @@ class BlogListView(ListView):
         category_slug = self.kwargs.get('slug')
         if category_slug:
             context['current_category'] = get_object_or_404(Category, slug=category_slug)
+        context['current_tag'] = self.tag
         
         return context
 
+class TagListView(AnonymousCachePageMixin, ListView):
+    """Public tag cloud: every tag on a published post, with its post count"""
+    page_cache_group = 'blog'
+    template_name = 'blog/tag_list.html'
+    context_object_name = 'tags'
+    
+    def get_queryset(self):
+        return Tag.with_post_counts()
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Sizes in the cloud are relative to the most used tag
+        context['max_post_count'] = max((tag.post_count for tag in context['tags']), default=0)
+        return context
+
 class BlogDetailView(DetailView):
     """Public blog post detail"""
     model = Post
@@ -51,32 +81,38 @@ class BlogDetailView(DetailView):
     context_object_name = 'post'
     
     def get_queryset(self):
-        return Post.objects.filter(status='published')
+        return Post.objects.filter(status='published').select_related('author', 'category')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        post = self.get_object()
+        post = self.object
         
         # Increment views
         post.increment_views()
         
         # Get related posts
-        context['related_posts'] = Post.objects.filter(
-            category=post.category,
-            status='published'
-        ).exclude(id=post.id)[:3]
+        context['related_posts'] = post.get_related_posts(3)
         
         # Get categories
-        context['categories'] = Category.objects.filter(is_active=True).annotate(
-            post_count=Count('posts')
-        )
+        context['categories'] = Category.objects.filter(is_active=True)
         
         # Add comment form
         context['comment_form'] = CommentForm()
-        context['comments'] = post.comments.filter(is_approved=True)
+        context['comments'] = post.comments.filter(is_approved=True).select_related('user')
         
         return context
 
+@login_required
+@require_POST
+def add_comment(request, slug):
+    """Add the signed-in user's comment to a published post; it is shown once approved"""
+    post = get_object_or_404(Post, slug=slug, status='published')
+    content = request.POST.get('text', '').strip()
+    if content:
+        Comment.objects.create(post=post, user=request.user, content=content)
+        messages.success(request, 'Thank you! Your comment will appear once it has been approved.')
+    return redirect(post.get_absolute_url() + '#comment-form')
+
 class BlogSearchView(ListView):
     """Public blog search"""
     model = Post
@@ -87,21 +123,22 @@ class BlogSearchView(ListView):
     def get_queryset(self):
         queryset = Post.objects.filter(status='published')
         query = self.request.GET.get('q')
+        if query and fts_available():
+            # Ranked FTS5 search; posts are only loaded for the page being shown
+            return SearchResults(query, queryset.select_related('category', 'author'))
         if query:
             queryset = queryset.filter(
                 Q(title__icontains=query) | 
                 Q(content__icontains=query) |
                 Q(excerpt__icontains=query) |
-                Q(tags__icontains=query)
+                Q(pk__in=PostTag.objects.filter(tag__slug=slugify(query)).values('post'))
             )
         return queryset
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['search_query'] = self.request.GET.get('q', '')
-        context['categories'] = Category.objects.filter(is_active=True).annotate(
-            post_count=Count('posts')
-        )
+        context['categories'] = Category.objects.filter(is_active=True)
         return context
 
 # Dashboard Views
@@ -117,13 +154,15 @@ class BlogDashboardView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['categories'] = Category.objects.all()
-        context['total_posts'] = Post.objects.count()
-        context['published_posts'] = Post.objects.filter(status='published').count()
-        context['draft_posts'] = Post.objects.filter(status='draft').count()
-        context['featured_posts'] = Post.objects.filter(is_featured=True).count()
-        context['total_comments'] = Comment.objects.count()
-        context['pending_comments'] = Comment.objects.filter(is_approved=False).count()
-        context['subscribers_count'] = NewsletterSubscriber.objects.count()
+        context.update(get_stats(
+            Post,
+            total_posts=None,
+            published_posts=Q(status='published'),
+            draft_posts=Q(status='draft'),
+            featured_posts=Q(is_featured=True),
+        ))
+        context.update(get_stats(Comment, total_comments=None, pending_comments=Q(is_approved=False)))
+        context.update(get_stats(NewsletterSubscriber, subscribers_count=None))
         return context
 
 class PostCreateView(LoginRequiredMixin, CreateView):
@@ -191,7 +230,7 @@ class CategoryDeleteView(LoginRequiredMixin, DeleteView):
         messages.success(request, 'Category deleted successfully!')
         return super().delete(request, *args, **kwargs)
 
-class CommentListView(LoginRequiredMixin, ListView):
+class CommentListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     """Manage blog comments"""
     model = Comment
     template_name = 'blog/comment_list.html'
@@ -211,9 +250,12 @@ class CommentListView(LoginRequiredMixin, ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['total_comments'] = Comment.objects.count()
-        context['approved_comments'] = Comment.objects.filter(is_approved=True).count()
-        context['pending_comments'] = Comment.objects.filter(is_approved=False).count()
+        context.update(get_stats(
+            Comment,
+            total_comments=None,
+            approved_comments=Q(is_approved=True),
+            pending_comments=Q(is_approved=False),
+        ))
         return context
 
 class CommentUpdateView(LoginRequiredMixin, UpdateView):
@@ -252,12 +294,13 @@ def unapprove_comment(request, pk):
     comment.save()
     return JsonResponse({'success': True})
 
-class NewsletterListView(LoginRequiredMixin, ListView):
+class NewsletterListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     """Manage newsletter subscribers"""
     model = NewsletterSubscriber
     template_name = 'blog/newsletter_list.html'
     context_object_name = 'subscribers'
     paginate_by = 20
+    cursor_ordering = ('-subscribed_at', '-id')
     
     def get_queryset(self):
         return NewsletterSubscriber.objects.all().order_by('-subscribed_at')
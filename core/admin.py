@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import About, TeamMember,ServiceFeature,ServiceRequest, Service, SliderImage, Testimonial,ContactMessage,Subscriber
+from .models import About, TeamMember,ServiceFeature,ServiceRequest, Service, SliderImage, Testimonial,ContactMessage,Subscriber,QueuedEmail
 
 admin.site.register(TeamMember)
 admin.site.register(Service)
@@ -9,4 +9,5 @@ admin.site.register(Testimonial)
 admin.site.register(ContactMessage)
 admin.site.register(Subscriber)
 admin.site.register(About)
-admin.site.register(ServiceRequest)
\ No newline at end of file
+admin.site.register(ServiceRequest)
+admin.site.register(QueuedEmail)
\ No newline at end of file
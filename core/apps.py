@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from .signals import (
+            connect_count_signals, connect_home_cache_signals, connect_image_signals,
+            connect_page_cache_signals,
+        )
+        connect_home_cache_signals()
+        connect_page_cache_signals()
+        connect_count_signals()
+        connect_image_signals()
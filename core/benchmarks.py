@@ -0,0 +1,415 @@
+# core/benchmarks.py
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from accounts.models import User
+from blog.models import Category, Comment, NewsletterSubscriber, Post, PostTag, Tag
+from blog.search import index_posts
+from projects.models import (
+    Project, ProjectCategory, ProjectFeature, ProjectImage, ProjectInquiry, ProjectTestimonial, ProjectVideo,
+)
+from .models import (
+    About, ContactMessage, Service, ServiceFeature, ServiceRequest, SliderImage, Subscriber, TeamMember,
+    Testimonial,
+)
+from .related import RELATED_SPECS
+from .rendering import render_rich_text
+from .view_counters import flush_views
+
+ROUTE_NAMESPACES = ('core', 'blog', 'projects', 'accounts')
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'route_baseline.json')
+
+# Row counts at scale 1.0. Every table gets at least MIN_ROWS so that each list and
+# category page is full and query counts do not depend on the scale
+DATASET = {
+    'posts': 2000,
+    'comments': 5000,
+    'projects': 500,
+    'service_requests': 5000,
+    'contact_messages': 1000,
+    'subscribers': 1000,
+    'inquiries': 1000,
+}
+MIN_ROWS = 100
+
+# Routes whose URL kwargs refer to a different model than the view's own
+ROUTE_MODELS = {
+    'blog:category': Category,
+    'blog:add_comment': Post,
+    'projects:category': ProjectCategory,
+    'projects:project_inquiry': Project,
+    'projects:increment_views': Project,
+    'core:book_service_directly': Service,
+    'core:mark_message_replied': ContactMessage,
+    'core:mark_message_archived': ContactMessage,
+    'core:toggle_subscriber_status': Subscriber,
+    'blog:approve_comment': Comment,
+    'blog:unapprove_comment': Comment,
+    'blog:toggle_subscriber': NewsletterSubscriber,
+}
+# URL kwargs that always name the same model
+PARAM_MODELS = {
+    'service_pk': Service,
+    'service_id': Service,
+    'project_pk': Project,
+    'tag': Tag,
+}
+
+# Routes that fail for reasons unrelated to performance. They are still requested and
+# reported on every run, but never enter the baseline; a route that starts passing is
+# reported until its entry is removed and the baseline updated
+KNOWN_FAILURES = {
+    'accounts:password_reset_complete': "template reverses 'login' without the accounts namespace",
+    'blog:category_create': "missing template blog/category_form.html",
+    'blog:category_delete': "missing template blog/category_confirm_delete.html",
+    'blog:category_update': "missing template blog/category_form.html",
+    'blog:comment_delete': "missing template blog/comment_confirm_delete.html",
+    'blog:comment_update': "missing template blog/comment_form.html",
+    'blog:newsletter_create': "missing template blog/newsletter_form.html",
+    'blog:newsletter_list': "missing template blog/newsletter_list.html",
+    'blog:post_delete': "missing template blog/post_confirm_delete.html",
+    'core:contact_message_delete': "missing template dashboard/contact_message_confirm_delete.html",
+    'core:contact_message_detail': "view reads ContactMessage.status, which does not exist",
+    'core:contact_message_update': "missing template dashboard/contact_message_detail.html",
+    'core:service_request_mark_new': "missing template core/servicerequest_form.html",
+    'core:service_request_mark_processed': "missing template core/servicerequest_form.html",
+    'core:service_request_update': "form lists ServiceRequest.notes, which does not exist",
+    'core:slider_delete': "missing template dashboard/slider_confirm_delete.html",
+    'core:subscribe': "redirect reverses 'home' without the core namespace",
+    'core:subscriber_delete': "missing template dashboard/subscriber_confirm_delete.html",
+    'core:subscriber_update': "missing template dashboard/subscriber_form.html",
+    'projects:project_category_create': "missing template projects/project_category_form.html",
+    'projects:project_category_delete': "missing template projects/project_category_confirm_delete.html",
+    'projects:project_category_update': "missing template projects/project_category_form.html",
+    'projects:project_delete': "missing template projects/project_confirm_delete.html",
+    'projects:project_feature_create': "missing template projects/project_feature_form.html",
+    'projects:project_feature_delete': "missing template projects/project_feature_confirm_delete.html",
+    'projects:project_image_create': "missing template projects/project_image_form.html",
+    'projects:project_image_delete': "missing template projects/project_image_confirm_delete.html",
+    'projects:project_inquiry': "missing template projects/project_inquiry.html",
+    'projects:project_testimonial_create': "missing template projects/project_testimonial_form.html",
+    'projects:project_testimonial_delete': "missing template projects/project_testimonial_confirm_delete.html",
+    'projects:project_video_create': "missing template projects/project_video_form.html",
+    'projects:project_video_delete': "missing template projects/project_video_confirm_delete.html",
+}
+
+
+def _rows(name, scale):
+    return max(MIN_ROWS, int(DATASET[name] * scale))
+
+
+def seed_dataset(scale=1.0):
+    """
+    Fill the database with a realistic spread of content in bulk and return
+    {model: object} samples used to build URLs. Image fields point at names that
+    need not exist on disk.
+    """
+    staff = User.objects.create_user(
+        username='benchmark', email='benchmark@example.com', password='benchmark',
+        is_active=True, is_staff=True, is_superuser=True,
+    )
+    About.objects.create(title='About', main_content='Main', secondary_content='Team',
+                         additional_content='Approach', image='about/about.jpg')
+    SliderImage.objects.bulk_create(
+        SliderImage(title=f'Slide {i}', subtitle='Build with us', image=f'slider/{i}.jpg', order=i) for i in range(5)
+    )
+    TeamMember.objects.bulk_create(
+        TeamMember(name=f'Member {i}', position='Engineer', bio='Bio', image=f'team/{i}.jpg',
+                   is_leadership=i < 4, order=i)
+        for i in range(12)
+    )
+    Testimonial.objects.bulk_create(
+        Testimonial(client_name=f'Client {i}', testimonial='Great work', status='published', is_featured=i < 3)
+        for i in range(20)
+    )
+
+    services = [
+        Service(title=f'Service {i}', slug=f'service-{i}', image=f'services/{i}.jpg', created_by=staff,
+                short_description='Short', full_description='Full', pricing_breakdown='Labour\nMaterials',
+                includes_services='Survey\nDesign', optional_addons='Landscaping - K5,000')
+        for i in range(20)
+    ]
+    # bulk_create skips save(), which fills these
+    for service in services:
+        service.render_text_fields()
+    services = Service.objects.bulk_create(services)
+    ServiceFeature.objects.bulk_create(
+        ServiceFeature(service=service, title=f'Feature {i}') for service in services for i in range(5)
+    )
+    ServiceRequest.objects.bulk_create(
+        ServiceRequest(service=services[i % len(services)], name=f'Client {i}', email=f'client{i}@example.com',
+                       phone='0970000000', message='Please quote', is_processed=i % 3 == 0)
+        for i in range(_rows('service_requests', scale))
+    )
+    ContactMessage.objects.bulk_create(
+        ContactMessage(name=f'Visitor {i}', email=f'visitor{i}@example.com', subject='Hello', message='Hi',
+                       is_read=i % 2 == 0)
+        for i in range(_rows('contact_messages', scale))
+    )
+    Subscriber.objects.bulk_create(
+        Subscriber(email=f'subscriber{i}@example.com', is_active=i % 5 != 0) for i in range(_rows('subscribers', scale))
+    )
+    NewsletterSubscriber.objects.bulk_create(
+        NewsletterSubscriber(email=f'reader{i}@example.com') for i in range(_rows('subscribers', scale))
+    )
+
+    categories = Category.objects.bulk_create(
+        Category(name=f'Category {i}', slug=f'category-{i}', order=i) for i in range(8)
+    )
+    now = timezone.now()
+    # bulk_create skips save(), which renders the content; every post has the same
+    content = '<h2>Plans</h2><p>Building notes</p>' * 5 + '<h2>Costs</h2><p>Building notes</p>' * 15
+    rendered = render_rich_text(content)
+    posts = Post.objects.bulk_create(
+        Post(title=f'Post {i}', slug=f'post-{i}', author=staff, category=categories[i % len(categories)],
+             content=content, content_html=rendered.html, read_time=rendered.read_time, toc=rendered.toc,
+             excerpt='Building notes', featured_image=f'blog/{i}.jpg',
+             status='draft' if i % 10 == 0 else 'published',
+             published_date=now - timezone.timedelta(hours=i), is_featured=i % 7 == 0)
+        for i in range(_rows('posts', scale))
+    )
+    tags = Tag.from_names(f'Topic {i}' for i in range(20))
+    PostTag.objects.bulk_create(
+        PostTag(post=post, tag=tags[(i + offset) % len(tags)]) for i, post in enumerate(posts) for offset in (0, 7)
+    )
+    index_posts(posts)
+    Category.refresh_post_counts()
+    Comment.objects.bulk_create(
+        Comment(post=posts[i % len(posts)], user=staff, content='Nice post', is_approved=i % 4 != 0)
+        for i in range(_rows('comments', scale))
+    )
+
+    project_categories = ProjectCategory.objects.bulk_create(
+        ProjectCategory(name=f'Sector {i}', slug=f'sector-{i}', order=i) for i in range(6)
+    )
+    projects = Project.objects.bulk_create(
+        Project(title=f'Project {i}', slug=f'project-{i}', description='Build', client='Client', location='Lusaka',
+                completion_date=now.date(), featured_image=f'projects/{i}.jpg', is_featured=i % 5 == 0,
+                created_by=staff)
+        for i in range(_rows('projects', scale))
+    )
+    Project.categories.through.objects.bulk_create(
+        Project.categories.through(project=project, projectcategory=project_categories[i % len(project_categories)])
+        for i, project in enumerate(projects)
+    )
+    ProjectCategory.refresh_project_counts()
+    ProjectImage.objects.bulk_create(
+        ProjectImage(project=project, image=f'projects/gallery/{project.pk}-{i}.jpg', order=i)
+        for project in projects for i in range(6)
+    )
+    ProjectFeature.objects.bulk_create(
+        ProjectFeature(project=project, title=f'Feature {i}', order=i) for project in projects for i in range(3)
+    )
+    ProjectVideo.objects.bulk_create(
+        ProjectVideo(project=project, video_url='https://youtu.be/abcdefghijk') for project in projects[:50]
+    )
+    ProjectTestimonial.objects.bulk_create(
+        ProjectTestimonial(project=project, client_name='Owner', testimonial='Great', rating=5)
+        for project in projects[:50]
+    )
+    ProjectInquiry.objects.bulk_create(
+        ProjectInquiry(project=projects[i % len(projects)], name=f'Lead {i}', email=f'lead{i}@example.com',
+                       phone='0970000000', service_type='residential', budget_range='under-50k',
+                       project_description='A house')
+        for i in range(_rows('inquiries', scale))
+    )
+
+    # Detail pages read the neighbours the nightly build_related_content run stores
+    for spec in RELATED_SPECS.values():
+        spec().build()
+
+    return {
+        User: staff,
+        Post: posts[1],  # posts[0] is a draft
+        Project: projects[0],
+        Service: services[0],
+        Category: categories[0],
+        ProjectCategory: project_categories[0],
+        Tag: tags[0],
+    }
+
+
+def discover_routes(namespaces=ROUTE_NAMESPACES):
+    """Yield (URL name, view) for every named URL pattern in the given namespaces"""
+
+    def walk(resolver, namespace=None):
+        for pattern in resolver.url_patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern, pattern.namespace or namespace)
+            elif pattern.name and namespace in namespaces:
+                yield f'{namespace}:{pattern.name}', pattern
+
+    seen = set()
+    for name, pattern in walk(get_resolver()):
+        if name not in seen:
+            seen.add(name)
+            yield name, pattern
+
+
+def route_url(name, pattern, samples):
+    """Reverse a route with kwargs taken from the sampled objects"""
+    params = list(pattern.pattern.converters)
+    if not params:
+        return reverse(name)
+    if name == 'accounts:password_reset_confirm':
+        user = samples[User]
+        return reverse(name, kwargs={
+            'uidb64': urlsafe_base64_encode(force_bytes(user.pk)),
+            'token': default_token_generator.make_token(user),
+        })
+    kwargs = {}
+    for param in params:
+        model = PARAM_MODELS.get(param) or ROUTE_MODELS.get(name) or pattern.callback.view_class.model
+        obj = samples.get(model)
+        if obj is None:
+            obj = samples[model] = model.objects.order_by('pk').first()
+        kwargs[param] = obj.slug if param in ('slug', 'tag') else obj.pk
+    return reverse(name, kwargs=kwargs)
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+@contextmanager
+def _quiet_errors():
+    # Server errors are recorded as a status, not logged once per repeat
+    logger = logging.getLogger('django.request')
+    level = logger.level
+    logger.setLevel(logging.CRITICAL)
+    try:
+        yield
+    finally:
+        logger.setLevel(level)
+
+
+def measure_routes(samples, repeat=3, names=None):
+    """
+    Request every route with cold caches and return {URL name: result} with the
+    status, query count, p50/p95 latency and response bytes. Routes that redirect
+    anonymous visitors to the login page are measured as the staff user.
+    """
+    staff = samples[User]
+    anonymous = Client(raise_request_exception=False)
+    logged_in = Client(raise_request_exception=False)
+    login_url = reverse('accounts:login')
+    results = {}
+    # View counters must not flush in the middle of a measured request, and failing
+    # routes render the production error page rather than the debug one
+    overrides = override_settings(
+        DEBUG=False, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        VIEW_COUNT_FLUSH_INTERVAL=10 ** 9, VIEW_COUNT_FLUSH_THRESHOLD=10 ** 9,
+    )
+    with overrides, _quiet_errors():
+        for name, pattern in discover_routes():
+            if names and name not in names:
+                continue
+            url = route_url(name, pattern, samples)
+            client, auth = anonymous, 'anonymous'
+            timings, queries, size, status = [], 0, 0, None
+            for _ in range(repeat):
+                flush_views()
+                cache.clear()
+                if auth == 'staff':
+                    client.force_login(staff)
+                start = time.perf_counter()
+                with CaptureQueriesContext(connection) as captured:
+                    response = client.get(url)
+                    body = b''.join(response.streaming_content) if response.streaming else response.content
+                elapsed = time.perf_counter() - start
+                if auth == 'anonymous' and response.status_code == 302 and response['Location'].startswith(login_url):
+                    # Measure login-protected routes from scratch as staff
+                    client, auth = logged_in, 'staff'
+                    client.force_login(staff)
+                    flush_views()
+                    cache.clear()
+                    start = time.perf_counter()
+                    with CaptureQueriesContext(connection) as captured:
+                        response = client.get(url)
+                        body = b''.join(response.streaming_content) if response.streaming else response.content
+                    elapsed = time.perf_counter() - start
+                timings.append(elapsed * 1000)
+                queries = max(queries, len(captured))
+                size, status = len(body), response.status_code
+            results[name] = {
+                'auth': auth,
+                'status': status,
+                'queries': queries,
+                'bytes': size,
+                'p50_ms': round(_percentile(timings, 0.5), 2),
+                'p95_ms': round(_percentile(timings, 0.95), 2),
+            }
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(results, scale, path=BASELINE_PATH):
+    """Write the results of passing routes as the baseline; known failures are left out"""
+    failing = sorted(name for name, result in results.items()
+                     if result['status'] >= 500 and name not in KNOWN_FAILURES)
+    if failing:
+        raise ValueError(f"Routes failing outside KNOWN_FAILURES: {', '.join(failing)}")
+    routes = {name: result for name, result in results.items() if name not in KNOWN_FAILURES}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'scale': scale, 'routes': routes}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def known_failures(results):
+    """Return (URL name, status, reason) for every measured route listed in KNOWN_FAILURES"""
+    return [
+        (name, results[name]['status'], reason)
+        for name, reason in sorted(KNOWN_FAILURES.items()) if name in results
+    ]
+
+
+def find_regressions(results, baseline, query_tolerance=0, latency_tolerance=None, bytes_tolerance=None):
+    """
+    Compare measured routes with the baseline and return a list of messages.
+
+    Routes may not fail unless listed in KNOWN_FAILURES, and listed routes may not
+    pass (so fixed ones leave the list). Query counts may not grow by more than
+    query_tolerance. Latency (p95) and response size are only checked when a
+    tolerance ratio is given, since they vary with the machine and the dataset.
+    """
+    problems = []
+    routes = baseline['routes']
+    for name, result in sorted(results.items()):
+        if name in KNOWN_FAILURES:
+            if result['status'] < 500:
+                problems.append(f"{name}: now returns {result['status']}; remove it from KNOWN_FAILURES "
+                                f"and update the baseline")
+            continue
+        if result['status'] >= 500:
+            problems.append(f"{name}: status {result['status']}")
+            continue
+        expected = routes.get(name)
+        if expected is None:
+            problems.append(f"{name}: no baseline (run benchmark_routes --update-baseline)")
+            continue
+        if result['queries'] > expected['queries'] + query_tolerance:
+            problems.append(f"{name}: {expected['queries']} -> {result['queries']} queries")
+        if latency_tolerance is not None and result['p95_ms'] > expected['p95_ms'] * (1 + latency_tolerance):
+            problems.append(f"{name}: p95 {expected['p95_ms']:.1f} -> {result['p95_ms']:.1f} ms")
+        if bytes_tolerance is not None and result['bytes'] > expected['bytes'] * (1 + bytes_tolerance):
+            problems.append(f"{name}: {expected['bytes']} -> {result['bytes']} bytes")
+    return problems
@@ -0,0 +1,183 @@
+# core/caching.py
+import functools
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Prefetch
+from django.utils import timezone
+from django.utils.functional import lazy
+from django.views.decorators.cache import cache_page
+from django.views.decorators.csrf import csrf_protect
+from django.views.decorators.vary import vary_on_cookie
+
+from blog.models import Category, Post, PostTag, Tag
+from projects.models import Project, ProjectCategory, ProjectImage
+from .models import About, Service, ServiceFeature, SliderImage, TeamMember, Testimonial
+
+HOME_SECTION_KEY = 'home:section:{}'
+PAGE_CACHE_VERSION_KEY = 'page:version:{}'
+PAGE_CACHE_CHANGED_KEY = 'page:changed:{}'
+COUNT_KEY = 'count:{}'
+
+_MISSING = object()
+
+
+def _slider_images():
+    return list(SliderImage.objects.filter(is_active=True))
+
+
+def _about():
+    return About.objects.first()
+
+
+def _services():
+    services = Service.objects.annotate(feature_count=Count('features')).prefetch_related(
+        Prefetch('features', queryset=ServiceFeature.objects.order_by('id'), to_attr='prefetched_features')
+    )
+    return list(services[:6])  # Limit to 6 services
+
+
+def _featured_projects():
+    return list(Project.objects.filter(is_featured=True)[:8])  # Limit to 8 projects
+
+
+def _recent_posts():
+    return list(Post.objects.filter(status='published').select_related('category')[:5])
+
+
+def _testimonials():
+    return list(Testimonial.objects.filter(is_featured=True)[:3])  # Limit to 3 testimonials
+
+
+def _leadership_team():
+    return list(TeamMember.objects.filter(is_leadership=True)[:4])  # Limit to 4 team members
+
+
+# Section name -> (loader, models whose changes invalidate the section)
+HOME_SECTIONS = {
+    'slider_images': (_slider_images, (SliderImage,)),
+    'about': (_about, (About,)),
+    'services': (_services, (Service, ServiceFeature)),
+    'featured_projects': (_featured_projects, (Project,)),
+    'recent_posts': (_recent_posts, (Post, Category)),
+    'testimonials': (_testimonials, (Testimonial,)),
+    'leadership_team': (_leadership_team, (TeamMember,)),
+}
+
+
+def get_home_section(name):
+    """Return the data for a home page section, loading it on a cache miss"""
+    key = HOME_SECTION_KEY.format(name)
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        loader, _models = HOME_SECTIONS[name]
+        value = loader()
+        cache.set(key, value, getattr(settings, 'HOME_CACHE_TIMEOUT', 60 * 15))
+    return value
+
+
+def get_home_sections():
+    """Return every home page section as a dict ready for the template context"""
+    return {name: get_home_section(name) for name in HOME_SECTIONS}
+
+
+def invalidate_home_sections(*names):
+    """Drop the cached data for the given sections"""
+    cache.delete_many([HOME_SECTION_KEY.format(name) for name in names])
+
+
+def home_sections_for_model(model):
+    """Return the names of the sections built from the given model"""
+    return [name for name, (_loader, models) in HOME_SECTIONS.items() if model in models]
+
+
+# Page group -> models whose changes purge every cached page of the group
+PAGE_CACHE_GROUPS = {
+    'blog': (Post, Category, Tag, PostTag),
+    'services': (Service, ServiceFeature),
+    'projects': (Project, ProjectCategory, ProjectImage, Project.categories.through),
+    'about': (About, TeamMember),
+    'team': (TeamMember,),
+}
+
+
+def get_page_cache_prefix(group):
+    """Key prefix for a page group; purging swaps the version so old keys are never read again"""
+    version = cache.get_or_set(PAGE_CACHE_VERSION_KEY.format(group), uuid.uuid4().hex, None)
+    return f'page:{group}:{version}'
+
+
+def get_page_cache_changed_at(group):
+    """When the group was last purged, i.e. its content last changed; a cold cache counts as now"""
+    return cache.get_or_set(PAGE_CACHE_CHANGED_KEY.format(group), timezone.now, None)
+
+
+def purge_page_cache(*groups):
+    now = timezone.now()
+    cache.set_many({
+        **{PAGE_CACHE_VERSION_KEY.format(group): uuid.uuid4().hex for group in groups},
+        **{PAGE_CACHE_CHANGED_KEY.format(group): now for group in groups},
+    }, None)
+
+
+def page_cache_groups_for_model(model):
+    """Return the page groups that render the given model"""
+    return [group for group, models in PAGE_CACHE_GROUPS.items() if model in models]
+
+
+def _keep_sent_csrf_cookie(view):
+    """
+    Skip the CSRF cookie's expiry renewal when the visitor sent a valid one, so the
+    response carries no Set-Cookie and can be cached for that visitor. A visitor
+    without one still gets a new cookie, and cache_page never stores that response.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+
+        def keep_cookie(response):
+            if request.COOKIES.get(settings.CSRF_COOKIE_NAME) == request.META.get('CSRF_COOKIE'):
+                request.META['CSRF_COOKIE_NEEDS_UPDATE'] = False
+
+        # The token is read while the template renders
+        if getattr(response, 'is_rendered', True):
+            keep_cookie(response)
+        else:
+            response.add_post_render_callback(keep_cookie)
+        return response
+    return wrapper
+
+
+class AnonymousCachePageMixin:
+    """Serve whole responses from the cache to anonymous GET/HEAD requests.
+
+    Keys vary on the full URL (path and query string) and on the Cookie header.
+    csrf_protect runs inside cache_page, so a response that hands a new CSRF
+    cookie to a visitor without one is never stored; CSRF tokens and flash
+    messages are never shared between visitors.
+    """
+    page_cache_group = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        cached_dispatch = cache_page(
+            getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 5),
+            key_prefix=get_page_cache_prefix(self.page_cache_group),
+        )(csrf_protect(_keep_sent_csrf_cookie(vary_on_cookie(super().dispatch))))
+        return cached_dispatch(request, *args, **kwargs)
+
+
+def get_cached_count(name, queryset):
+    """Return queryset.count(), kept in the cache until invalidate_counts(name) drops it"""
+    return cache.get_or_set(COUNT_KEY.format(name), queryset.count, None)
+
+
+def lazy_count(name, queryset):
+    """A cached count that is only looked up if a template actually uses it"""
+    return lazy(functools.cache(lambda: get_cached_count(name, queryset)), int)()
+
+
+def invalidate_counts(*names):
+    cache.delete_many([COUNT_KEY.format(name) for name in names])
@@ -0,0 +1,449 @@
+# core/content_io.py
+import csv
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Prefetch
+from django.db.models.fields.files import FieldFile
+from django.utils.text import slugify
+
+from blog.models import Category, Post, PostTag, Tag
+from blog.search import index_posts
+from projects.models import Project, ProjectCategory, ProjectFeature, ProjectImage, ProjectVideo
+from .caching import (
+    home_sections_for_model, invalidate_home_sections, page_cache_groups_for_model, purge_page_cache,
+)
+from .models import Service, ServiceFeature
+
+FORMATS = ('jsonl', 'csv')
+
+
+class ContentImportError(Exception):
+    pass
+
+
+def _dump(value):
+    """Plain JSON value for a model field value"""
+    if isinstance(value, FieldFile):
+        return value.name or ''
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _load(field, value):
+    """Model field value for a JSON/CSV value; CSV gives '' for missing values"""
+    if value is None or value == '':
+        if field.null:
+            return None
+        if value is None or not field.empty_strings_allowed:
+            return field.get_default()
+    return field.to_python(value)
+
+
+def _nested(value):
+    # Nested columns are real lists in JSON Lines and JSON text in CSV
+    if isinstance(value, str):
+        return json.loads(value) if value else []
+    return value or []
+
+
+class ContentSpec:
+    """
+    Maps a model and its child rows to flat records keyed by slug, for bulk import
+    and export. Child rows are nested lists of dicts, categories are referenced by
+    slug and users by email.
+
+    Imports bypass save() and signals, so slugs are filled in here and the page
+    caches are purged once at the end.
+    """
+    model = None
+    fields = ()
+    # Record key -> (child model, foreign key to the parent, child fields)
+    children = {}
+    # Foreign key or many-to-many field referencing category_model by slug
+    category_field = None
+    category_model = None
+    # Foreign keys to users, referenced by email
+    user_fields = ()
+    # Fields prepare() derives from the others, e.g. rendered HTML
+    rendered_fields = ()
+
+    def __init__(self, default_user=None):
+        self.default_user = default_user
+        self._categories = {}
+        self._users = {}
+
+    @property
+    def columns(self):
+        columns = list(self.fields)
+        if self.category_field:
+            columns.append(self.category_field)
+        return columns + list(self.user_fields) + list(self.children)
+
+    @property
+    def many_categories(self):
+        return self.model._meta.get_field(self.category_field).many_to_many
+
+    # Export
+
+    def export_queryset(self):
+        queryset = self.model.objects.order_by('id')
+        if self.category_field and self.many_categories:
+            queryset = queryset.prefetch_related(self.category_field)
+        elif self.category_field:
+            queryset = queryset.select_related(self.category_field)
+        if self.user_fields:
+            queryset = queryset.select_related(*self.user_fields)
+        for key, (child_model, _fk, _fields) in self.children.items():
+            queryset = queryset.prefetch_related(Prefetch(key, queryset=child_model.objects.order_by('id')))
+        return queryset
+
+    def to_record(self, obj):
+        opts = self.model._meta
+        record = {name: _dump(opts.get_field(name).value_from_object(obj)) for name in self.fields}
+        if self.category_field and self.many_categories:
+            record[self.category_field] = [category.slug for category in getattr(obj, self.category_field).all()]
+        elif self.category_field:
+            category = getattr(obj, self.category_field)
+            record[self.category_field] = category.slug if category else None
+        for name in self.user_fields:
+            user = getattr(obj, name)
+            record[name] = user.email if user else None
+        for key, (child_model, _fk, fields) in self.children.items():
+            child_opts = child_model._meta
+            record[key] = [
+                {name: _dump(child_opts.get_field(name).value_from_object(child)) for name in fields}
+                for child in getattr(obj, key).all()
+            ]
+        return record
+
+    def export(self, chunk_size=2000):
+        """Yield one record per row, loading chunk_size rows (and their prefetches) at a time"""
+        for obj in self.export_queryset().iterator(chunk_size=chunk_size):
+            yield self.to_record(obj)
+
+    # Import
+
+    def prepare(self, obj):
+        """Fill in what save() would have"""
+        if not obj.slug:
+            obj.slug = slugify(obj.title)
+
+    def build(self, record):
+        opts = self.model._meta
+        obj = self.model(**{name: _load(opts.get_field(name), record.get(name)) for name in self.fields})
+        self.prepare(obj)
+        return obj
+
+    def build_children(self, record):
+        """Unsaved child rows per record key; the parent is set once it has a primary key"""
+        children = {}
+        for key, (child_model, _fk, fields) in self.children.items():
+            child_opts = child_model._meta
+            children[key] = [
+                child_model(**{name: _load(child_opts.get_field(name), row.get(name)) for name in fields})
+                for row in _nested(record.get(key))
+            ]
+        return children
+
+    def resolve_categories(self, slugs):
+        missing = set(slugs) - set(self._categories)
+        if not missing:
+            return
+        existing = self.category_model.objects.filter(slug__in=missing)
+        self._categories.update({category.slug: category for category in existing})
+        new = [
+            self.category_model(slug=slug, name=slug.replace('-', ' ').title())
+            for slug in sorted(missing - set(self._categories))
+        ]
+        self._categories.update({category.slug: category for category in self.category_model.objects.bulk_create(new)})
+        if any(category.pk is None for category in new):
+            self._categories.update(
+                {category.slug: category for category in self.category_model.objects.filter(slug__in=missing)}
+            )
+
+    def resolve_users(self, emails):
+        missing = set(emails) - set(self._users)
+        if not missing:
+            return
+        self._users.update({user.email: user for user in get_user_model().objects.filter(email__in=missing)})
+        unknown = missing - set(self._users)
+        if unknown:
+            raise ContentImportError(f"Unknown user(s): {', '.join(sorted(unknown))}")
+
+    def import_batch(self, rows):
+        """Upsert a batch of (line number, record) pairs by slug; child rows are replaced"""
+        opts = self.model._meta
+        objs = {}
+        records = {}
+        for line, record in rows:
+            try:
+                obj = self.build(record)
+                children = self.build_children(record)
+                categories = record.get(self.category_field) if self.category_field else None
+                if self.category_field and self.many_categories:
+                    categories = _nested(categories)
+            except (ValidationError, ValueError) as exc:
+                messages = exc.messages if isinstance(exc, ValidationError) else [str(exc)]
+                raise ContentImportError(f"line {line}: {'; '.join(messages)}")
+            # Within a batch the last record for a slug wins, as it would across batches
+            objs[obj.slug] = obj
+            records[obj.slug] = (line, record, children, categories)
+
+        if self.user_fields:
+            emails = {record.get(name) for _line, record, _c, _cat in records.values() for name in self.user_fields}
+            self.resolve_users(emails - {None, ''})
+            for slug, obj in objs.items():
+                line, record, _children, _categories = records[slug]
+                for name in self.user_fields:
+                    email = record.get(name)
+                    user = self._users[email] if email else self.default_user
+                    if user is None and not opts.get_field(name).null:
+                        raise ContentImportError(f"line {line}: {name} is required")
+                    setattr(obj, name, user)
+
+        with transaction.atomic():
+            if self.category_field:
+                slugs = set()
+                for _line, _record, _children, categories in records.values():
+                    if self.many_categories:
+                        slugs.update(categories)
+                    elif categories:
+                        slugs.add(categories)
+                self.resolve_categories(slugs)
+                if not self.many_categories:
+                    for slug, obj in objs.items():
+                        category = records[slug][3]
+                        setattr(obj, self.category_field, self._categories[category] if category else None)
+            self.save_batch(list(objs.values()), records)
+        return len(objs)
+
+    def save_batch(self, objs, records):
+        opts = self.model._meta
+        update_fields = [name for name in self.fields if name != 'slug']
+        if self.category_field and not self.many_categories:
+            update_fields.append(self.category_field)
+        update_fields += list(self.user_fields) + list(self.rendered_fields)
+        update_fields += [field.name for field in opts.concrete_fields if getattr(field, 'auto_now', False)]
+        existing = set(self.model.objects.filter(slug__in=[obj.slug for obj in objs]).values_list('slug', flat=True))
+        self.model.objects.bulk_create(
+            objs, update_conflicts=True, unique_fields=['slug'], update_fields=update_fields,
+        )
+        if any(obj.pk is None for obj in objs):
+            # Backends without RETURNING on upserts don't set primary keys
+            ids = dict(self.model.objects.filter(slug__in=[obj.slug for obj in objs]).values_list('slug', 'id'))
+            for obj in objs:
+                obj.pk = ids[obj.slug]
+        # Only rows that were already there can have old children to replace
+        replaced = [obj.pk for obj in objs if obj.slug in existing]
+
+        for key, (child_model, fk, _fields) in self.children.items():
+            if replaced:
+                child_model.objects.filter(**{f'{fk}__in': replaced}).delete()
+            rows = []
+            for obj in objs:
+                for child in records[obj.slug][2][key]:
+                    setattr(child, fk, obj)
+                    rows.append(child)
+            child_model.objects.bulk_create(rows)
+
+        if self.category_field and self.many_categories:
+            through = getattr(self.model, self.category_field).through
+            source = f'{opts.model_name}_id'
+            target = f'{self.category_model._meta.model_name}_id'
+            if replaced:
+                through.objects.filter(**{f'{source}__in': replaced}).delete()
+            through.objects.bulk_create(
+                through(**{source: obj.pk, target: self._categories[slug].pk})
+                for obj in objs for slug in dict.fromkeys(records[obj.slug][3])
+            )
+        self.save_related(objs, records, replaced)
+        self.after_batch(objs)
+
+    def save_related(self, objs, records, replaced):
+        """Write rows that hang off the saved objects; replaced are the pks of rows that already existed"""
+        pass
+
+    def after_batch(self, objs):
+        pass
+
+    def import_records(self, rows, batch_size=1000):
+        """Import (line number, record) pairs batch by batch; returns the number of rows written"""
+        imported = 0
+        batch = []
+        try:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    imported += self.import_batch(batch)
+                    batch = []
+            if batch:
+                imported += self.import_batch(batch)
+        finally:
+            # Batches committed before a failing one are live, so counters and caches must follow
+            if imported:
+                self.refresh_counts()
+                self.invalidate_caches()
+        return imported
+
+    def refresh_counts(self):
+        """Recount denormalized counters that bulk writes bypass (their signals do not fire)"""
+        pass
+
+    def invalidate_caches(self):
+        models = [self.model] + [child_model for child_model, _fk, _fields in self.children.values()]
+        if self.category_field:
+            models.append(self.category_model)
+            if self.many_categories:
+                models.append(getattr(self.model, self.category_field).through)
+        purge_page_cache(*{group for model in models for group in page_cache_groups_for_model(model)})
+        invalidate_home_sections(*{name for model in models for name in home_sections_for_model(model)})
+
+
+class ProjectSpec(ContentSpec):
+    model = Project
+    fields = (
+        'title', 'slug', 'description', 'client', 'location', 'completion_date', 'project_duration',
+        'budget', 'size', 'featured_image', 'is_featured', 'status', 'meta_title', 'meta_description',
+    )
+    children = {
+        'images': (ProjectImage, 'project', ('image', 'caption', 'is_primary', 'is_landscape', 'order')),
+        'features': (ProjectFeature, 'project', ('title', 'description', 'icon', 'order')),
+        'videos': (ProjectVideo, 'project', ('video_url', 'caption', 'order')),
+    }
+    category_field = 'categories'
+    category_model = ProjectCategory
+
+    def refresh_counts(self):
+        ProjectCategory.refresh_project_counts()
+
+
+class ServiceSpec(ContentSpec):
+    model = Service
+    fields = (
+        'title', 'slug', 'short_description', 'full_description', 'image', 'category', 'icon',
+        'is_featured', 'display_order', 'is_active', 'starting_price', 'price_unit', 'price_description',
+        'is_price_negotiable', 'price_display_type', 'pricing_breakdown', 'estimated_duration',
+        'includes_services', 'optional_addons',
+    )
+    children = {
+        'features': (ServiceFeature, 'service', ('title', 'description', 'icon')),
+    }
+    rendered_fields = Service.RENDERED_FIELDS
+
+    def prepare(self, obj):
+        super().prepare(obj)
+        obj.render_text_fields()
+
+
+def _tag_names(value):
+    # A list of names; JSON text in CSV, or the comma-separated string older exports used
+    if isinstance(value, str):
+        if value.lstrip().startswith('['):
+            return json.loads(value)
+        return [name.strip() for name in value.split(',') if name.strip()]
+    return value or []
+
+
+class PostSpec(ContentSpec):
+    model = Post
+    fields = (
+        'title', 'slug', 'content', 'featured_image', 'excerpt', 'status', 'published_date',
+        'meta_title', 'meta_description', 'is_featured', 'is_pinned',
+    )
+    category_field = 'category'
+    category_model = Category
+    user_fields = ('author',)
+    rendered_fields = ('content_html', 'read_time', 'toc')
+
+    @property
+    def columns(self):
+        return super().columns + ['tags']
+
+    def export_queryset(self):
+        return super().export_queryset().prefetch_related('tags')
+
+    def to_record(self, obj):
+        record = super().to_record(obj)
+        record['tags'] = [tag.name for tag in obj.tags.all()]
+        return record
+
+    def save_related(self, objs, records, replaced):
+        try:
+            names = {obj.pk: _tag_names(records[obj.slug][1].get('tags')) for obj in objs}
+        except ValueError as exc:
+            raise ContentImportError(f"tags: {exc}")
+        tags = {tag.slug: tag for tag in Tag.from_names(name for post_names in names.values() for name in post_names)}
+        if replaced:
+            PostTag.objects.filter(post_id__in=replaced).delete()
+        PostTag.objects.bulk_create(
+            PostTag(post_id=pk, tag=tags[slug])
+            for pk, post_names in names.items()
+            for slug in dict.fromkeys(slugify(name.strip()[:50]) for name in post_names)
+            if slug in tags
+        )
+
+    def prepare(self, obj):
+        super().prepare(obj)
+        obj.render_content()
+
+    def after_batch(self, objs):
+        index_posts(objs)
+
+    def refresh_counts(self):
+        Category.refresh_post_counts()
+
+
+CONTENT_SPECS = {
+    'projects': ProjectSpec,
+    'services': ServiceSpec,
+    'posts': PostSpec,
+}
+
+
+def guess_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def read_records(stream, fmt):
+    """Yield (line number, record) pairs from a JSON Lines or CSV stream"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            yield line, json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise ContentImportError(f"line {line}: {exc}")
+
+
+def write_records(stream, fmt, spec, records):
+    """Write records to a stream as JSON Lines or CSV; returns the number written"""
+    written = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=spec.columns, lineterminator='\n')
+        writer.writeheader()
+        for record in records:
+            writer.writerow({
+                key: json.dumps(value) if isinstance(value, list) else ('' if value is None else value)
+                for key, value in record.items()
+            })
+            written += 1
+        return written
+    for record in records:
+        stream.write(json.dumps(record, separators=(',', ':')) + '\n')
+        written += 1
+    return written
@@ -1,8 +1,9 @@
+from .caching import lazy_count
 from .models import ContactMessage
 
 def core_context(request):
     if request.user.is_authenticated:
-        new_messages_count = ContactMessage.objects.filter(is_read='False').count()
+        new_messages_count = lazy_count('new_messages', ContactMessage.objects.filter(is_read=False))
     else:
         new_messages_count = 0
     
@@ -0,0 +1,114 @@
+# core/emails.py
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+
+def queue_email(subject, template_name, context, recipients, from_email=None):
+    """Render an email template and store it in the outbox for the worker to send"""
+    html_message = render_to_string(template_name, context)
+    return QueuedEmail.objects.create(
+        subject=subject,
+        body=strip_tags(html_message),
+        html_body=html_message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=','.join(recipients),
+    )
+
+
+def get_retry_delay(attempts):
+    """Exponential backoff: EMAIL_QUEUE_RETRY_DELAY seconds, doubled on every attempt"""
+    base_delay = getattr(settings, 'EMAIL_QUEUE_RETRY_DELAY', 60)
+    return timedelta(seconds=base_delay * 2 ** (attempts - 1))
+
+
+def claim_due_emails(batch_size):
+    """
+    Mark up to batch_size due emails as being sent by this worker and return them.
+
+    Claimed rows get a 'sending' status and a lease: their next_attempt_at moves
+    EMAIL_QUEUE_CLAIM_TIMEOUT seconds ahead, so other workers skip them, and a
+    worker that dies mid-batch only delays its emails until the lease runs out.
+    """
+    now = timezone.now()
+    due = QueuedEmail.objects.filter(status__in=('pending', 'sending'), next_attempt_at__lte=now)
+    ids = list(due.values_list('pk', flat=True)[:batch_size])
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    lease = timedelta(seconds=getattr(settings, 'EMAIL_QUEUE_CLAIM_TIMEOUT', 600))
+    # The UPDATE re-checks the filter, so a row another worker claimed in between is skipped
+    due.filter(pk__in=ids).update(status='sending', claim_token=token, next_attempt_at=now + lease)
+    return list(QueuedEmail.objects.filter(claim_token=token, status='sending'))
+
+
+def _record_failure(email, error, max_attempts):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= max_attempts:
+        email.status = 'failed'
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = timezone.now() + get_retry_delay(email.attempts)
+
+
+def send_queued_emails(batch_size=50):
+    """Send due emails from the outbox over one SMTP connection and return (sent, failed)"""
+    max_attempts = getattr(settings, 'EMAIL_QUEUE_MAX_ATTEMPTS', 5)
+    emails = claim_due_emails(batch_size)
+    if not emails:
+        return 0, 0
+    update_fields = ['status', 'attempts', 'last_error', 'next_attempt_at', 'sent_at', 'claim_token']
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        # Nothing could be sent, so the whole batch backs off together
+        logger.error(f"Could not connect to send {len(emails)} queued email(s): {str(e)}")
+        for email in emails:
+            _record_failure(email, e, max_attempts)
+            email.claim_token = ''
+        QueuedEmail.objects.bulk_update(emails, update_fields)
+        return 0, len(emails)
+
+    sent = failed = 0
+    try:
+        for email in emails:
+            message = EmailMultiAlternatives(
+                email.subject,
+                email.body,
+                email.from_email,
+                email.get_recipients_list(),
+                connection=connection,
+            )
+            if email.html_body:
+                message.attach_alternative(email.html_body, 'text/html')
+
+            try:
+                message.send()
+            except Exception as e:
+                logger.error(f"Failed to send queued email #{email.pk}: {str(e)}")
+                _record_failure(email, e, max_attempts)
+                failed += 1
+            else:
+                email.attempts += 1
+                email.status = 'sent'
+                email.sent_at = timezone.now()
+                email.last_error = ''
+                sent += 1
+            email.claim_token = ''
+            email.save(update_fields=update_fields)
+    finally:
+        connection.close()
+    return sent, failed
@@ -0,0 +1,100 @@
+# core/exports.py
+import csv
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.views import View
+
+# Spreadsheet apps run cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Echo:
+    """File-like object whose write() hands the line back to the csv writer's caller"""
+
+    def write(self, value):
+        return value
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        value = timezone.localtime(value) if timezone.is_aware(value) else value
+        return value.strftime('%Y-%m-%d %H:%M')
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def stream_csv(header, rows):
+    """Yield CSV lines for the header and each row, one at a time"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_cell(value) for value in row])
+
+
+class CsvExportView(View):
+    """
+    Stream a model's rows as a CSV download.
+
+    Rows come from values_list(...).iterator(), so nothing is held in memory beyond
+    one database chunk and the first bytes go out before the query has finished.
+    Supports ?status=<key of status_filters> and ?from= / ?to= dates (inclusive)
+    on date_field.
+    """
+    model = None
+    # (header, values_list lookup) pairs
+    columns = ()
+    ordering = ('-created_at', '-id')
+    date_field = 'created_at'
+    # ?status= value -> filter kwargs
+    status_filters = {}
+    filename = None
+    chunk_size = 2000
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def filter_queryset(self, queryset):
+        status = self.request.GET.get('status')
+        if status and status != 'all':
+            if status not in self.status_filters:
+                raise ValueError(f"Unknown status {status!r}")
+            queryset = queryset.filter(**self.status_filters[status])
+
+        # Bounds are compared as datetimes so the date field's index can be used
+        for param, lookup, days in (('from', 'gte', 0), ('to', 'lt', 1)):
+            value = self.request.GET.get(param)
+            if not value:
+                continue
+            day = parse_date(value)
+            if day is None:
+                raise ValueError(f"Invalid date {value!r}")
+            bound = datetime.combine(day + timedelta(days=days), time.min)
+            if settings.USE_TZ:
+                bound = timezone.make_aware(bound)
+            queryset = queryset.filter(**{f'{self.date_field}__{lookup}': bound})
+        return queryset
+
+    def get_filename(self):
+        name = self.filename or self.model._meta.model_name
+        return f"{name}-{timezone.localdate().isoformat()}.csv"
+
+    def get(self, request, *args, **kwargs):
+        try:
+            queryset = self.filter_queryset(self.get_queryset())
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        rows = queryset.order_by(*self.ordering).values_list(
+            *(lookup for _header, lookup in self.columns)
+        ).iterator(chunk_size=self.chunk_size)
+        response = StreamingHttpResponse(
+            stream_csv([header for header, _lookup in self.columns], rows), content_type='text/csv',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{self.get_filename()}"'
+        return response
@@ -322,7 +322,7 @@ class SubscriberForm(forms.ModelForm):
         model = Subscriber
         fields = ['email','is_active']
         widgets = {
-            'is_active': forms.BooleanField(),
+            'is_active': forms.CheckboxInput(),
         }
     
     
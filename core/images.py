@@ -0,0 +1,128 @@
+# core/images.py
+import logging
+import os
+import re
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_DIR = 'derivatives'
+SRCSET_KEY = 'srcset:{}:{}'
+
+# Pillow save options per derivative format
+FORMAT_OPTIONS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'avif': {'format': 'AVIF', 'quality': 60},
+}
+
+# Original formats that are re-saved without EXIF on upload
+STRIP_EXIF_FORMATS = {'JPEG', 'PNG', 'WEBP'}
+
+
+def get_derivative_widths():
+    return tuple(getattr(settings, 'IMAGE_DERIVATIVE_WIDTHS', (320, 640, 960, 1280, 1920)))
+
+
+def get_derivative_formats():
+    """Formats to generate, skipping those this Pillow build cannot encode"""
+    formats = getattr(settings, 'IMAGE_DERIVATIVE_FORMATS', ('avif', 'webp'))
+    return tuple(fmt for fmt in formats if features.check(fmt))
+
+
+def derivative_name(name, width, fmt):
+    """projects/a.jpg -> projects/derivatives/a-640w.webp"""
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, DERIVATIVE_DIR, f'{stem}-{width}w.{fmt}')
+
+
+def existing_derivative_widths(name, fmt, storage=default_storage):
+    """Widths already generated for an image, read from one directory listing"""
+    directory, filename = os.path.split(name)
+    derivative_dir = os.path.join(directory, DERIVATIVE_DIR)
+    if not storage.exists(derivative_dir):
+        return []
+    pattern = re.compile(rf'{re.escape(os.path.splitext(filename)[0])}-(\d+)w\.{fmt}')
+    _dirs, files = storage.listdir(derivative_dir)
+    return sorted(int(match.group(1)) for match in map(pattern.fullmatch, files) if match)
+
+
+def strip_exif(name, storage=default_storage):
+    """Re-save an uploaded original without its EXIF block (camera, GPS, ...)"""
+    with storage.open(name, 'rb') as f:
+        image = Image.open(f)
+        image.load()
+    if image.format not in STRIP_EXIF_FORMATS or not image.getexif():
+        return False
+    original_format = image.format
+    # Bake the EXIF orientation into the pixels before the tag is dropped
+    image = ImageOps.exif_transpose(image)
+    buffer = BytesIO()
+    options = {'quality': 90} if original_format == 'JPEG' else {}
+    image.save(buffer, format=original_format, **options)
+    storage.delete(name)
+    storage.save(name, ContentFile(buffer.getvalue()))
+    return True
+
+
+def generate_derivatives(name, storage=default_storage, force=False):
+    """Write resized WebP/AVIF copies of an image and return the widths generated"""
+    formats = get_derivative_formats()
+    widths = get_derivative_widths()
+    if not force and all(existing_derivative_widths(name, fmt, storage) for fmt in formats):
+        return []
+
+    with storage.open(name, 'rb') as f:
+        image = Image.open(f)
+        image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if image.mode in ('LA', 'PA') or 'transparency' in image.info else 'RGB')
+
+    # Never upscale: widths wider than the original collapse to the original width
+    generated = sorted({min(width, image.width) for width in widths})
+    for width in generated:
+        height = round(image.height * width / image.width)
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            buffer = BytesIO()
+            # A fresh save carries no EXIF unless it is passed in explicitly
+            resized.save(buffer, **FORMAT_OPTIONS[fmt])
+            target = derivative_name(name, width, fmt)
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(target, ContentFile(buffer.getvalue()))
+
+    for fmt in formats:
+        cache.set(SRCSET_KEY.format(fmt, name), build_srcset(name, generated, fmt, storage), None)
+    return generated
+
+
+def build_srcset(name, widths, fmt, storage=default_storage):
+    return ', '.join(f'{storage.url(derivative_name(name, width, fmt))} {width}w' for width in widths)
+
+
+def get_srcset(name, fmt='webp', storage=default_storage):
+    """Return the srcset string for an image, or '' if no derivatives exist yet"""
+    if not name:
+        return ''
+    key = SRCSET_KEY.format(fmt, name)
+    srcset = cache.get(key)
+    if srcset is None:
+        srcset = build_srcset(name, existing_derivative_widths(name, fmt, storage), fmt, storage)
+        cache.set(key, srcset, 60 * 60)
+    return srcset
+
+
+def process_upload(name, storage=default_storage):
+    """Upload-time pipeline: drop EXIF from the original, then build the derivatives"""
+    try:
+        stripped = strip_exif(name, storage)
+        generate_derivatives(name, storage, force=stripped)
+    except Exception as e:
+        logger.error(f"Failed to process image {name}: {str(e)}")
@@ -0,0 +1,327 @@
+# core/loadtest.py
+import asyncio
+import random
+import re
+import ssl
+import time
+from collections import defaultdict
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+from xml.etree import ElementTree
+
+from django.urls import reverse
+
+CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+SERVICE_INPUT = re.compile(r'name="service" value="(\d+)"')
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+
+class Response:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def text(self):
+        return self.body.decode('utf-8', 'replace')
+
+
+class HttpClient:
+    """
+    Minimal keep-alive HTTP/1.1 client for one virtual user, with its own cookie
+    jar. Responses may use Content-Length, chunked encoding or close the connection.
+    """
+
+    def __init__(self, base_url, stats=None, timeout=30):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == 'https' else None
+        self.stats = stats
+        self.timeout = timeout
+        self.cookies = {}
+        self.reader = self.writer = None
+        self.logged_in = False
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    async def get(self, name, path, **headers):
+        return await self.request(name, 'GET', path, headers=headers)
+
+    async def post(self, name, path, data, **headers):
+        body = urlencode(data).encode()
+        headers = {'Content-Type': 'application/x-www-form-urlencoded', 'Referer': self.url(path), **headers}
+        return await self.request(name, 'POST', path, body, headers)
+
+    def url(self, path):
+        scheme = 'https' if self.ssl else 'http'
+        return f'{scheme}://{self.host}:{self.port}{path}'
+
+    async def request(self, name, method, path, body=b'', headers=None):
+        """Send one request and record its latency and status under name"""
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(self._request(method, path, body, headers or {}), self.timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            await self.close()
+            if self.stats is not None:
+                self.stats.record(name, time.perf_counter() - start, 0)
+            return Response(0, {}, b'')
+        if self.stats is not None:
+            self.stats.record(name, time.perf_counter() - start, response.status)
+        return response
+
+    async def _request(self, method, path, body, headers):
+        reused = self.writer is not None
+        try:
+            return await self._exchange(method, path, body, headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # The server may drop idle keep-alive connections; retry once on a fresh one
+            if not reused:
+                raise
+            await self.close()
+            return await self._exchange(method, path, body, headers)
+
+    async def _exchange(self, method, path, body, headers):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}', 'User-Agent: maiyembe-loadtest']
+        if self.cookies:
+            lines.append('Cookie: ' + '; '.join(f'{key}={value}' for key, value in self.cookies.items()))
+        if 'csrftoken' in self.cookies and method == 'POST':
+            lines.append(f"X-CSRFToken: {self.cookies['csrftoken']}")
+        if body or method == 'POST':
+            lines.append(f'Content-Length: {len(body)}')
+        lines.extend(f'{key.replace("_", "-")}: {value}' for key, value in headers.items())
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await self.writer.drain()
+        return await self._read_response()
+
+    async def _read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed before the response")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = (await self.reader.readline()).decode('latin-1').rstrip('\r\n')
+            if not line:
+                break
+            key, _, value = line.partition(':')
+            key, value = key.strip().lower(), value.strip()
+            if key == 'set-cookie':
+                for morsel in SimpleCookie(value).values():
+                    if morsel['max-age'] == '0' or not morsel.value:
+                        self.cookies.pop(morsel.key, None)
+                    else:
+                        self.cookies[morsel.key] = morsel.value
+            else:
+                response_headers[key] = value
+
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    # Skip the trailer
+                    while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readexactly(2)
+            body = b''.join(chunks)
+        elif 'content-length' in response_headers:
+            body = await self.reader.readexactly(int(response_headers['content-length']))
+        else:
+            body = await self.reader.read()
+            response_headers['connection'] = 'close'
+
+        if response_headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return Response(status, response_headers, body)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0
+
+
+class LoadStats:
+    """Latencies and statuses per request name; failures are statuses of 0 or 400+"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.recording = True
+
+    def record(self, name, latency, status):
+        if not self.recording:
+            return
+        self.latencies[name].append(latency)
+        if status == 0 or status >= 400:
+            self.errors[name] += 1
+
+    def summary(self, duration):
+        """Return {request name: row} plus a '*' row for all requests together"""
+        rows = {}
+        every = []
+        for name, latencies in sorted(self.latencies.items()):
+            every.extend(latencies)
+            rows[name] = self._row(latencies, self.errors[name], duration)
+        rows['*'] = self._row(every, sum(self.errors.values()), duration)
+        return rows
+
+    def _row(self, latencies, errors, duration):
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'rps': round(len(latencies) / duration, 2) if duration else 0,
+            'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        }
+
+
+# Scenarios: one visit of a virtual user, built from named requests
+
+async def browse_home(client, urls, options):
+    await client.get('home', reverse('core:home'))
+
+
+async def read_blog(client, urls, options):
+    await client.get('blog list', reverse('blog:blog_list'))
+    if urls['posts']:
+        await client.get('blog detail', random.choice(urls['posts']))
+
+
+async def view_project(client, urls, options):
+    if urls['projects']:
+        await client.get('project detail', random.choice(urls['projects']))
+    else:
+        await client.get('project list', reverse('projects:project_list'))
+
+
+async def request_service(client, urls, options):
+    if not urls['services']:
+        return
+    response = await client.get('service detail', random.choice(urls['services']))
+    token, service = CSRF_INPUT.search(response.text), SERVICE_INPUT.search(response.text)
+    if not (token and service):
+        return
+    n = random.randrange(10 ** 6)
+    # Submitted the way the page's script does, as an AJAX form post
+    await client.post('service request', reverse('core:submit_service_request'), {
+        'csrfmiddlewaretoken': token.group(1),
+        'service': service.group(1),
+        'name': f'Load test {n}',
+        'email': f'loadtest{n}@example.com',
+        'phone': '0970000000',
+        'message': 'Load test request',
+        'contact_method': 'email',
+        'budget_range': '10k_50k',
+    }, X_Requested_With='XMLHttpRequest')
+
+
+STAFF_PAGES = (
+    ('dashboard', 'core:dashboard'),
+    ('service requests', 'core:service_request_list'),
+    ('blog dashboard', 'blog:blog_dashboard'),
+    ('project dashboard', 'projects:project_dashboard'),
+    ('contact messages', 'core:contact_message_list'),
+)
+
+
+async def staff_dashboard(client, urls, options):
+    if not client.logged_in:
+        login_url = reverse('accounts:login')
+        response = await client.get('login page', login_url)
+        token = CSRF_INPUT.search(response.text)
+        if not token:
+            return
+        await client.post('login', login_url, {
+            'csrfmiddlewaretoken': token.group(1),
+            'username': options['staff_email'],
+            'password': options['staff_password'],
+        })
+        client.logged_in = 'sessionid' in client.cookies
+        if not client.logged_in:
+            return
+    for name, url_name in random.sample(STAFF_PAGES, 2):
+        await client.get(name, reverse(url_name))
+
+
+SCENARIOS = {
+    'home': browse_home,
+    'blog': read_blog,
+    'project': view_project,
+    'service': request_service,
+    'staff': staff_dashboard,
+}
+
+# Scenario weights per traffic profile
+PROFILES = {
+    'mixed': {'home': 30, 'blog': 35, 'project': 20, 'service': 10, 'staff': 5},
+    'public': {'home': 35, 'blog': 40, 'project': 25},
+    'blog': {'blog': 1},
+    'service': {'service': 1},
+    'staff': {'staff': 1},
+}
+
+
+async def discover_urls(base_url):
+    """Collect post, project and service paths from the site's own sitemaps"""
+    client = HttpClient(base_url)
+    urls = {}
+    try:
+        for key, section in (('posts', 'posts'), ('projects', 'projects'), ('services', 'services')):
+            response = await client.get(section, reverse('sitemap-section', kwargs={'section': section}))
+            paths = []
+            if response.status == 200:
+                for loc in ElementTree.fromstring(response.body).iter(f'{SITEMAP_NS}loc'):
+                    paths.append(urlsplit(loc.text.strip()).path)
+            urls[key] = paths
+    finally:
+        await client.close()
+    return urls
+
+
+async def run_load(base_url, profile='mixed', users=10, duration=30, warmup=0, think_time=0, options=None):
+    """
+    Run users concurrent virtual users for warmup + duration seconds. Each picks a
+    scenario from the profile's weights, runs it, then waits up to think_time
+    seconds. Only requests made after the warm-up are recorded.
+    """
+    options = options or {}
+    weights = dict(PROFILES[profile])
+    if not options.get('staff_email'):
+        weights.pop('staff', None)
+    if not weights:
+        raise ValueError(f"Profile {profile!r} needs staff credentials")
+    names, scenario_weights = list(weights), list(weights.values())
+    urls = await discover_urls(base_url)
+    stats = LoadStats()
+    stats.recording = not warmup
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    measure_from = start + warmup
+    deadline = measure_from + duration
+
+    async def user():
+        client = HttpClient(base_url, stats)
+        try:
+            while loop.time() < deadline:
+                if not stats.recording and loop.time() >= measure_from:
+                    stats.recording = True
+                scenario = SCENARIOS[random.choices(names, scenario_weights)[0]]
+                await scenario(client, urls, options)
+                # Always yield, even when a scenario had nothing to request
+                await asyncio.sleep(random.uniform(0, think_time) if think_time else 0)
+        finally:
+            await client.close()
+
+    await asyncio.gather(*(user() for _ in range(users)))
+    return stats.summary(loop.time() - measure_from)
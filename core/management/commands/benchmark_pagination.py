@@ -0,0 +1,77 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import transaction
+
+from core.models import ServiceRequest
+from core.pagination import CursorPaginator, encode_cursor
+
+ORDERING = ('-created_at', '-id')
+
+
+class Command(BaseCommand):
+    help = "Compare OFFSET and cursor pagination of service requests at depth (rolled back afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000, help="Number of synthetic service requests")
+        parser.add_argument('--per-page', type=int, default=15, help="Rows per page")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per page")
+        parser.add_argument('--page', type=int, action='append', dest='pages',
+                            help="Page number to time (may be given more than once)")
+
+    def handle(self, *args, **options):
+        per_page = options['per_page']
+        with transaction.atomic():
+            self.seed(options['rows'])
+            queryset = ServiceRequest.objects.all()
+            last_page = max(1, -(-options['rows'] // per_page))
+            pages = options['pages'] or sorted({1, 10, 100, 1000, last_page // 2, last_page})
+            for number in (page for page in pages if 1 <= page <= last_page):
+                cursor = self.cursor_for_page(queryset, number, per_page)
+                offset = self.time_it(lambda: self.offset_page(queryset, number, per_page), options['repeat'])
+                keyset = self.time_it(lambda: self.cursor_page(queryset, cursor, per_page), options['repeat'])
+                self.stdout.write(
+                    f"page {number}: offset {offset * 1000:.1f} ms, cursor {keyset * 1000:.1f} ms "
+                    f"({offset / keyset:.1f}x)"
+                )
+            transaction.set_rollback(True)
+
+    def seed(self, count):
+        start = time.perf_counter()
+        # created_at is auto_now_add, so each batch shares a timestamp and the id breaks ties
+        for offset in range(0, count, 5000):
+            ServiceRequest.objects.bulk_create(
+                ServiceRequest(
+                    name=f'Client {i}',
+                    email=f'client{i}@example.com',
+                    phone='0970000000',
+                    message='Benchmark request',
+                    is_processed=i % 3 == 0,
+                )
+                for i in range(offset, min(offset + 5000, count))
+            )
+        self.stdout.write(f"Seeded {count} service requests in {time.perf_counter() - start:.1f} s")
+
+    def cursor_for_page(self, queryset, number, per_page):
+        """The cursor a visitor would have followed to reach this page (not timed)"""
+        if number == 1:
+            return None
+        row = queryset.order_by(*ORDERING).values('created_at', 'id')[(number - 1) * per_page - 1]
+        return encode_cursor([row['created_at'], row['id']])
+
+    def offset_page(self, queryset, number, per_page):
+        # What ListView paid per page: a COUNT plus an OFFSET slice
+        page = Paginator(queryset.order_by(*ORDERING), per_page).page(number)
+        return list(page.object_list)
+
+    def cursor_page(self, queryset, cursor, per_page):
+        return list(CursorPaginator(queryset, per_page, ORDERING).page(cursor))
+
+    def time_it(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
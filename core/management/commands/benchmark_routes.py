@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.benchmarks import (
+    BASELINE_PATH, find_regressions, known_failures, load_baseline, measure_routes, save_baseline, seed_dataset,
+)
+
+
+class Command(BaseCommand):
+    help = ("Request every named route in core, blog, projects and accounts against a seeded dataset "
+            "(rolled back afterwards) and compare query counts with the stored baseline")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help="Dataset size relative to the default (2000 posts, 500 projects, ...)")
+        parser.add_argument('--repeat', type=int, default=5, help="Requests per route")
+        parser.add_argument('--route', action='append', dest='routes',
+                            help="Only measure this URL name, e.g. blog:post_list (may be given more than once)")
+        parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline JSON file")
+        parser.add_argument('--update-baseline', action='store_true', help="Write the results as the new baseline")
+        parser.add_argument('--query-tolerance', type=int, default=0,
+                            help="Extra queries a route may run before it counts as a regression")
+        parser.add_argument('--latency-tolerance', type=float,
+                            help="Allowed p95 growth as a ratio, e.g. 0.5 for +50%% (not checked by default)")
+        parser.add_argument('--bytes-tolerance', type=float,
+                            help="Allowed response size growth as a ratio (not checked by default)")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            start = time.perf_counter()
+            samples = seed_dataset(options['scale'])
+            self.stdout.write(f"Seeded dataset at scale {options['scale']} in {time.perf_counter() - start:.1f} s")
+            results = measure_routes(samples, options['repeat'], options['routes'])
+            transaction.set_rollback(True)
+
+        for name, result in sorted(results.items()):
+            self.stdout.write(
+                f"{name:45} {result['auth']:9} {result['status']} {result['queries']:4} queries "
+                f"p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms  {result['bytes']:8} bytes"
+            )
+
+        failures = known_failures(results)
+        if failures:
+            self.stdout.write(self.style.WARNING(f"{len(failures)} known failing route(s), not in the baseline:"))
+            for name, status, reason in failures:
+                self.stdout.write(f"  {name:43} {status}  {reason}")
+
+        if options['update_baseline']:
+            if options['routes']:
+                # Keep the routes that were not measured this time
+                baseline = load_baseline(options['baseline'])
+                results = {**baseline['routes'], **results}
+            try:
+                save_baseline(results, options['scale'], options['baseline'])
+            except ValueError as e:
+                raise CommandError(f"{e}; fix them or list them in core.benchmarks.KNOWN_FAILURES")
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+
+        try:
+            baseline = load_baseline(options['baseline'])
+        except FileNotFoundError:
+            raise CommandError(f"No baseline at {options['baseline']}; run with --update-baseline first")
+        problems = find_regressions(
+            results, baseline, options['query_tolerance'], options['latency_tolerance'], options['bytes_tolerance'],
+        )
+        if problems:
+            raise CommandError("Route regressions:\n" + '\n'.join(problems))
+        self.stdout.write(self.style.SUCCESS(f"{len(results) - len(failures)} routes within the baseline"))
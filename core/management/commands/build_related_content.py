@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.related import NEIGHBOURS, RELATED_SPECS, WEIGHTS
+
+
+class Command(BaseCommand):
+    help = ("Recompute the related posts and projects shown on detail pages from shared categories, tags "
+            "and TF-IDF text similarity (run from cron, e.g. nightly; new items fall back to their category)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('content', nargs='?', choices=sorted(RELATED_SPECS),
+                            help="What to rebuild (default: everything)")
+        parser.add_argument('--neighbours', type=int, default=NEIGHBOURS, help="Neighbours stored per item")
+        for signal, weight in WEIGHTS.items():
+            parser.add_argument(f'--{signal}-weight', type=float, default=weight,
+                                help=f"Weight of {signal} overlap in the score (default {weight})")
+
+    def handle(self, *args, **options):
+        weights = {signal: options[f'{signal}_weight'] for signal in WEIGHTS}
+        for content in [options['content']] if options['content'] else sorted(RELATED_SPECS):
+            start = time.perf_counter()
+            neighbours = RELATED_SPECS[content]().build(options['neighbours'], weights)
+            links = sum(len(related) for related in neighbours.values())
+            self.stdout.write(self.style.SUCCESS(
+                f"Stored {links} neighbours for {len(neighbours)} {content} in {time.perf_counter() - start:.1f} s"
+            ))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.content_io import CONTENT_SPECS, FORMATS, guess_format, write_records
+
+
+class Command(BaseCommand):
+    help = "Stream projects, services or posts (with their child rows) to JSON Lines or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument('content', choices=sorted(CONTENT_SPECS), help="What to export")
+        parser.add_argument('-o', '--output', default='-', help="File to write, or - for stdout (default)")
+        parser.add_argument('--format', choices=FORMATS,
+                            help="Output format (default: csv for .csv files, otherwise jsonl)")
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help="Rows loaded from the database at a time")
+
+    def handle(self, *args, **options):
+        spec = CONTENT_SPECS[options['content']]()
+        fmt = guess_format(options['output'], options['format'])
+        records = spec.export(chunk_size=options['chunk_size'])
+        if options['output'] == '-':
+            write_records(self.stdout, fmt, spec, records)
+            return
+        start = time.perf_counter()
+        with open(options['output'], 'w', encoding='utf-8', newline='') as stream:
+            written = write_records(stream, fmt, spec, records)
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {written} {options['content']} to {options['output']} in {time.perf_counter() - start:.1f} s"
+        ))
@@ -0,0 +1,57 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.images import generate_derivatives, strip_exif
+from core.signals import IMAGE_FIELDS
+
+
+def process_image(name, force, keep_exif):
+    """Runs in a worker process; returns (name, widths generated, error)"""
+    try:
+        stripped = False if keep_exif else strip_exif(name)
+        return name, generate_derivatives(name, force=force or stripped), None
+    except Exception as e:
+        return name, [], str(e)
+
+
+class Command(BaseCommand):
+    help = "Generate WebP/AVIF derivatives (and strip EXIF) for every existing uploaded image"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help="Number of worker processes")
+        parser.add_argument('--force', action='store_true',
+                            help="Regenerate derivatives that already exist")
+        parser.add_argument('--keep-exif', action='store_true',
+                            help="Leave the original files untouched")
+
+    def handle(self, *args, **options):
+        names = set()
+        for model, field_names in IMAGE_FIELDS.items():
+            for field_name in field_names:
+                names.update(
+                    model.objects.exclude(**{field_name: ''}).values_list(field_name, flat=True).iterator()
+                )
+        self.stdout.write(f"Processing {len(names)} image(s) with {options['workers']} worker(s)")
+
+        # Forked workers must not share the parent's database connection
+        connections.close_all()
+        generated = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            futures = [
+                executor.submit(process_image, name, options['force'], options['keep_exif'])
+                for name in sorted(names)
+            ]
+            for future in as_completed(futures):
+                name, widths, error = future.result()
+                if error:
+                    failed += 1
+                    self.stderr.write(f"{name}: {error}")
+                elif widths:
+                    generated += 1
+                    self.stdout.write(f"{name}: {', '.join(f'{width}w' for width in widths)}")
+
+        self.stdout.write(self.style.SUCCESS(f"Generated derivatives for {generated} image(s), {failed} failed"))
@@ -0,0 +1,46 @@
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.content_io import CONTENT_SPECS, FORMATS, ContentImportError, guess_format, read_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Load projects, services or posts from JSON Lines or CSV in batches. "
+        "Rows are matched on slug: existing rows are updated and their child rows replaced."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('content', choices=sorted(CONTENT_SPECS), help="What to import")
+        parser.add_argument('path', help="File to read, or - for stdin")
+        parser.add_argument('--format', choices=FORMATS,
+                            help="Input format (default: csv for .csv files, otherwise jsonl)")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Rows written per transaction")
+        parser.add_argument('--author', help="Email of the user credited for rows without one")
+
+    def handle(self, *args, **options):
+        default_user = None
+        if options['author']:
+            try:
+                default_user = get_user_model().objects.get(email=options['author'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user with email {options['author']}")
+        spec = CONTENT_SPECS[options['content']](default_user=default_user)
+        fmt = guess_format(options['path'], options['format'])
+
+        start = time.perf_counter()
+        try:
+            if options['path'] == '-':
+                imported = spec.import_records(read_records(sys.stdin, fmt), options['batch_size'])
+            else:
+                with open(options['path'], encoding='utf-8', newline='') as stream:
+                    imported = spec.import_records(read_records(stream, fmt), options['batch_size'])
+        except ContentImportError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} {options['content']} in {time.perf_counter() - start:.1f} s"
+        ))
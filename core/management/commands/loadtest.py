@@ -0,0 +1,53 @@
+import asyncio
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.loadtest import PROFILES, run_load
+
+
+class Command(BaseCommand):
+    help = ("Drive a running server (runserver, gunicorn, uvicorn) with synthetic traffic and report "
+            "throughput and p50/p95/p99 latency per request. The service profiles submit real "
+            "service requests, so point it at a disposable database.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="Base URL of the server")
+        parser.add_argument('--profile', choices=sorted(PROFILES), default='mixed', help="Traffic profile")
+        parser.add_argument('--users', type=int, default=10, help="Concurrent virtual users")
+        parser.add_argument('--duration', type=float, default=30, help="Measured seconds")
+        parser.add_argument('--warmup', type=float, default=5, help="Seconds of unrecorded traffic first")
+        parser.add_argument('--think-time', type=float, default=0,
+                            help="Maximum random pause between a user's visits, in seconds")
+        parser.add_argument('--staff-email', default=os.environ.get('LOADTEST_STAFF_EMAIL'),
+                            help="Staff login for the dashboard scenario (default: $LOADTEST_STAFF_EMAIL)")
+        parser.add_argument('--staff-password', default=os.environ.get('LOADTEST_STAFF_PASSWORD'),
+                            help="Default: $LOADTEST_STAFF_PASSWORD")
+        parser.add_argument('--json', dest='json_path', help="Also write the results to this JSON file")
+
+    def handle(self, *args, **options):
+        try:
+            results = asyncio.run(run_load(
+                options['url'], options['profile'], options['users'], options['duration'], options['warmup'],
+                options['think_time'],
+                {'staff_email': options['staff_email'], 'staff_password': options['staff_password']},
+            ))
+        except (ValueError, OSError) as e:
+            raise CommandError(str(e))
+
+        for name, row in results.items():
+            self.stdout.write(
+                f"{'all requests' if name == '*' else name:20} {row['requests']:7} req {row['errors']:5} err "
+                f"{row['rps']:8.1f} req/s  p50 {row['p50_ms']:7.1f}  p95 {row['p95_ms']:7.1f}  "
+                f"p99 {row['p99_ms']:7.1f} ms"
+            )
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as f:
+                json.dump({
+                    'profile': options['profile'], 'users': options['users'], 'duration': options['duration'],
+                    'results': results,
+                }, f, indent=2)
+        total = results['*']
+        style = self.style.SUCCESS if not total['errors'] else self.style.WARNING
+        self.stdout.write(style(f"{total['requests']} requests, {total['errors']} errors, {total['rps']:.1f} req/s"))
@@ -0,0 +1,36 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.emails import send_queued_emails
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Send pending emails from the outbox, retrying failures with exponential backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help="Maximum number of emails sent per batch")
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep draining the outbox instead of exiting after one batch")
+        parser.add_argument('--interval', type=float, default=10,
+                            help="Seconds to sleep between batches when --loop is set")
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = send_queued_emails(batch_size=options['batch_size'])
+            except Exception:
+                if not options['loop']:
+                    raise
+                # A worker left running should outlive a database hiccup
+                logger.exception("Sending queued emails failed; retrying after the interval")
+            else:
+                if sent or failed:
+                    self.stdout.write(f"Sent {sent} email(s), {failed} failed")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,208 @@
+# core/metrics.py
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the cumulative latency histogram exported to Prometheus
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+UNRESOLVED = '<unresolved>'
+
+
+class ViewMetrics:
+    """Running totals, a latency histogram and a ring buffer of recent samples for one view"""
+
+    def __init__(self, samples):
+        self.requests = 0
+        self.errors = 0
+        self.duration = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.response_bytes = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        # (duration, queries, db time, template time, bytes) of the latest requests
+        self.recent = deque(maxlen=samples)
+
+    def add(self, sample, status):
+        duration, queries, db_time, template_time, size = sample
+        self.requests += 1
+        self.errors += status >= 500
+        self.duration += duration
+        self.queries += queries
+        self.db_time += db_time
+        self.template_time += template_time
+        self.response_bytes += size
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if duration <= bound:
+                self.buckets[i] += 1
+        self.recent.append(sample)
+
+    def summary(self):
+        """Averages and percentiles over the recent samples, in milliseconds"""
+        recent = list(self.recent)
+        durations = sorted(sample[0] for sample in recent)
+        count = len(recent) or 1
+
+        def percentile(p):
+            return durations[min(len(durations) - 1, int(len(durations) * p))] * 1000 if durations else 0
+
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'p50_ms': percentile(0.5),
+            'p95_ms': percentile(0.95),
+            'max_ms': durations[-1] * 1000 if durations else 0,
+            'avg_queries': sum(sample[1] for sample in recent) / count,
+            'max_queries': max((sample[1] for sample in recent), default=0),
+            'avg_db_ms': sum(sample[2] for sample in recent) / count * 1000,
+            'avg_template_ms': sum(sample[3] for sample in recent) / count * 1000,
+            'avg_bytes': sum(sample[4] for sample in recent) / count,
+            'total_s': self.duration,
+        }
+
+
+# View name -> ViewMetrics, per process
+_metrics = {}
+_lock = threading.Lock()
+
+
+def record(view, sample, status=200):
+    with _lock:
+        metrics = _metrics.get(view)
+        if metrics is None:
+            metrics = _metrics[view] = ViewMetrics(getattr(settings, 'REQUEST_METRICS_SAMPLES', 500))
+        metrics.add(sample, status)
+
+
+def snapshot():
+    """Return [(view name, summary)] for every view seen, slowest in total first"""
+    with _lock:
+        rows = [(view, metrics.summary()) for view, metrics in _metrics.items()]
+    return sorted(rows, key=lambda row: row[1]['total_s'], reverse=True)
+
+
+def reset():
+    with _lock:
+        _metrics.clear()
+
+
+def view_label(match):
+    """The URL name of a resolved view, or the dotted path of the view for unnamed routes"""
+    if match.view_name:
+        return match.view_name
+    func = getattr(match.func, 'view_class', match.func)
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text():
+    """Render the collected metrics in the Prometheus text exposition format"""
+    with _lock:
+        items = sorted(_metrics.items())
+        lines = [
+            '# HELP django_view_duration_seconds Wall time of requests, by view.',
+            '# TYPE django_view_duration_seconds histogram',
+        ]
+        for view, metrics in items:
+            label = f'view="{_label(view)}"'
+            for bound, count in zip(LATENCY_BUCKETS, metrics.buckets):
+                lines.append(f'django_view_duration_seconds_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'django_view_duration_seconds_bucket{{{label},le="+Inf"}} {metrics.requests}')
+            lines.append(f'django_view_duration_seconds_sum{{{label}}} {metrics.duration}')
+            lines.append(f'django_view_duration_seconds_count{{{label}}} {metrics.requests}')
+
+        counters = (
+            ('django_view_errors_total', 'Requests that returned a 5xx status, by view.', 'errors'),
+            ('django_view_db_queries_total', 'Database queries, by view.', 'queries'),
+            ('django_view_db_duration_seconds_total', 'Time spent in database queries, by view.', 'db_time'),
+            ('django_view_template_duration_seconds_total', 'Time spent rendering templates, by view.',
+             'template_time'),
+            ('django_view_response_bytes_total', 'Response body bytes (streaming responses excluded), by view.',
+             'response_bytes'),
+        )
+        for name, help_text, attr in counters:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for view, metrics in items:
+                lines.append(f'{name}{{view="{_label(view)}"}} {getattr(metrics, attr)}')
+    return '\n'.join(lines) + '\n'
+
+
+class QueryTimer:
+    """execute_wrapper that counts queries and the time spent running them"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class RequestMetricsMiddleware:
+    """
+    Record wall time, query count, DB time, template render time and response size
+    for every request, keyed by the resolved URL name.
+
+    Template time covers TemplateResponse rendering (class-based views); views that
+    call render() themselves count it as view time. Metrics live in process memory,
+    so each worker reports its own. Requests over REQUEST_METRICS_QUERY_BUDGET
+    queries or REQUEST_METRICS_TIME_BUDGET_MS milliseconds are logged as warnings.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', True):
+            return self.get_response(request)
+
+        timer = QueryTimer()
+        request._template_time = 0.0
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = view_label(match) if match else UNRESOLVED
+        size = 0 if response.streaming else len(response.content)
+        record(view, (duration, timer.count, timer.duration, request._template_time, size), response.status_code)
+        self.check_budgets(request, view, duration, timer.count)
+        return response
+
+    def process_template_response(self, request, response):
+        # Called just before the response is rendered; the callback runs right after
+        start = time.perf_counter()
+
+        def rendered(response):
+            request._template_time += time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def check_budgets(self, request, view, duration, queries):
+        query_budget = getattr(settings, 'REQUEST_METRICS_QUERY_BUDGET', None)
+        time_budget = getattr(settings, 'REQUEST_METRICS_TIME_BUDGET_MS', None)
+        if (query_budget is not None and queries > query_budget) or (
+                time_budget is not None and duration * 1000 > time_budget):
+            logger.warning(f"{request.method} {request.path} ({view}) took {duration * 1000:.0f} ms "
+                           f"and {queries} queries")
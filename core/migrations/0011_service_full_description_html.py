@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:02
+
+from django.db import migrations, models
+from django.utils.html import linebreaks
+
+
+def render_descriptions(apps, schema_editor):
+    Service = apps.get_model('core', 'Service')
+    services = list(Service.objects.only('full_description'))
+    for service in services:
+        service.full_description_html = linebreaks(service.full_description or '', autoescape=True)
+    Service.objects.bulk_update(services, ['full_description_html'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='full_description_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(render_descriptions, migrations.RunPython.noop),
+    ]
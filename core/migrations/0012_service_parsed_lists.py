@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:40
+
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+
+# Frozen copy of the core.rendering list parsers as of this migration
+PRICE = re.compile(r'(?:\bK|\bZMW|\bZK|\bUSD|\$)\s?(\d[\d,]*(?:\.\d{1,2})?)', re.IGNORECASE)
+
+
+def split_lines(text):
+    return [line.strip() for line in (text or '').splitlines() if line.strip()]
+
+
+def parse_price(line):
+    match = PRICE.search(line)
+    if not match:
+        return None
+    try:
+        price = Decimal(match.group(1).replace(',', ''))
+    except InvalidOperation:
+        return None
+    return int(price) if price == price.to_integral_value() else float(price)
+
+
+def parse_priced_lines(text):
+    return [{'text': line, 'price': parse_price(line)} for line in split_lines(text)]
+
+
+def parse_lists(apps, schema_editor):
+    Service = apps.get_model('core', 'Service')
+    services = list(Service.objects.only('pricing_breakdown', 'includes_services', 'optional_addons'))
+    for service in services:
+        service.pricing_breakdown_items = parse_priced_lines(service.pricing_breakdown)
+        service.includes_items = split_lines(service.includes_services)
+        service.optional_addon_items = parse_priced_lines(service.optional_addons)
+    Service.objects.bulk_update(
+        services, ['pricing_breakdown_items', 'includes_items', 'optional_addon_items'], batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_service_full_description_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='includes_items',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='optional_addon_items',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='pricing_breakdown_items',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(parse_lists, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,12 @@
 from django.db import models
 from django.forms import ValidationError
 from django.utils import timezone
+from django.utils.html import linebreaks
 from django.utils.text import slugify
 from django.urls import reverse
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
+from .rendering import parse_priced_lines, split_lines
 
 class TeamMember(models.Model):
     """Model for team members"""
@@ -29,6 +31,11 @@ class TeamMember(models.Model):
     
     class Meta:
         ordering = ['order', 'name']
+        indexes = [
+            models.Index(fields=['order', 'name'], name='team_order_idx'),
+            # Boolean filters compile to a bare column test, which only a partial index can serve
+            models.Index(fields=['order', 'name'], condition=models.Q(is_leadership=True), name='team_leadership_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -40,6 +47,8 @@ class Service(models.Model):
     slug = models.SlugField(unique=True, blank=True)
     short_description = models.TextField(help_text="Brief description for cards and listings", null=True, blank=True)
     full_description = models.TextField(help_text="Detailed description for service page", null=True, blank=True)
+    # full_description as paragraphs, rendered on save
+    full_description_html = models.TextField(blank=True, editable=False)
     image = models.ImageField(upload_to='services/')
     
     # Service Categories
@@ -135,20 +144,45 @@ class Service(models.Model):
         blank=True,
         help_text="Optional additional services with prices (one per line)"
     )
+    
+    # The lists above, parsed on save: [{'text': ..., 'price': number or None}] and [text]
+    pricing_breakdown_items = models.JSONField(default=list, blank=True, editable=False)
+    includes_items = models.JSONField(default=list, blank=True, editable=False)
+    optional_addon_items = models.JSONField(default=list, blank=True, editable=False)
 
     class Meta:
         ordering = ['display_order']
+        indexes = [
+            models.Index(fields=['display_order'], condition=models.Q(is_active=True), name='service_active_idx'),
+        ]
+    
+    # Text fields and the fields save() derives from them
+    RENDERED_FROM = ('full_description', 'pricing_breakdown', 'includes_services', 'optional_addons')
+    RENDERED_FIELDS = ('full_description_html', 'pricing_breakdown_items', 'includes_items', 'optional_addon_items')
     
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(self.RENDERED_FROM):
+            self.render_text_fields()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *self.RENDERED_FIELDS}
         super().save(*args, **kwargs)
     
+    def render_text_fields(self):
+        """Fill the rendered and parsed fields from the text fields they come from"""
+        # The description is plain text; this is what the |linebreaks filter did per request
+        self.full_description_html = linebreaks(self.full_description or '', autoescape=True)
+        self.pricing_breakdown_items = parse_priced_lines(self.pricing_breakdown)
+        self.includes_items = split_lines(self.includes_services)
+        self.optional_addon_items = parse_priced_lines(self.optional_addons)
+    
     def __str__(self):
         return self.title
     
     def get_absolute_url(self):
-        return reverse('service_detail', kwargs={'slug': self.slug})
+        return reverse('core:service_detail', kwargs={'slug': self.slug})
     
     def get_price_display(self):
         """Get formatted price display"""
@@ -166,22 +200,16 @@ class Service(models.Model):
         return f"ZMW {self.starting_price:,.2f}"
     
     def get_pricing_breakdown_list(self):
-        """Convert pricing breakdown to list"""
-        if self.pricing_breakdown:
-            return [line.strip() for line in self.pricing_breakdown.split('\n') if line.strip()]
-        return []
+        """Pricing breakdown lines, as parsed on save"""
+        return [item['text'] for item in self.pricing_breakdown_items]
     
     def get_includes_list(self):
-        """Convert included services to list"""
-        if self.includes_services:
-            return [line.strip() for line in self.includes_services.split('\n') if line.strip()]
-        return []
+        """Included services, as parsed on save"""
+        return self.includes_items
     
     def get_optional_addons_list(self):
-        """Convert optional addons to list"""
-        if self.optional_addons:
-            return [line.strip() for line in self.optional_addons.split('\n') if line.strip()]
-        return []
+        """Optional add-on lines, as parsed on save"""
+        return [item['text'] for item in self.optional_addon_items]
 
 class ServiceFeature(models.Model):
     """Model for features/benefits of each service"""
@@ -286,6 +314,12 @@ class ServiceRequest(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Cursor pagination on (created_at, id), with and without the status filter
+            models.Index(fields=['-created_at', '-id'], name='servicerequest_created_idx'),
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(is_processed=False),
+                         name='servicerequest_new_idx'),
+        ]
     
     def __str__(self):
         return f"Service Request #{self.id} - {self.name}"
@@ -352,6 +386,12 @@ class ContactMessage(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='contactmessage_created_idx'),
+            # Unread messages are the small subset behind the dashboard badge
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(is_read=False),
+                         name='contactmessage_unread_idx'),
+        ]
     
     def __str__(self):
         return f"Message from {self.name} - {self.subject}"
@@ -362,6 +402,11 @@ class Subscriber(models.Model):
     subscribed_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['-subscribed_at', '-id'], name='subscriber_subscribed_idx'),
+        ]
+    
     def __str__(self):
         return self.email
 
@@ -388,4 +433,37 @@ class About(models.Model):
         # Ensure only one instance exists
         if About.objects.exists() and not self.pk:
             raise ValidationError('Only one About instance is allowed')
-        return super().save(*args, **kwargs)
\ No newline at end of file
+        return super().save(*args, **kwargs)
+
+class QueuedEmail(models.Model):
+    """Outbound email waiting to be delivered by the send_queued_emails command"""
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    recipients = models.TextField(help_text="Comma-separated email addresses")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # Set while a send_queued_emails worker holds the row (see core.emails.claim_due_emails)
+    claim_token = models.CharField(max_length=32, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+
+    def __str__(self):
+        return f"{self.subject} ({self.get_status_display()})"
+
+    def get_recipients_list(self):
+        """Convert recipients string to list"""
+        return [email.strip() for email in self.recipients.split(',') if email.strip()]
@@ -0,0 +1,189 @@
+# core/pagination.py
+import base64
+import binascii
+import hashlib
+import json
+from collections.abc import Sequence
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+APPROXIMATE_COUNT_KEY = 'count:approx:{}'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _json_default(value):
+    # DjangoJSONEncoder truncates microseconds, which would skip rows sharing a millisecond
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_cursor(values, reverse=False):
+    """Opaque, URL-safe cursor for a row's ordering values"""
+    payload = json.dumps([list(values), reverse], default=_json_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values, reverse = json.loads(payload)
+    except (ValueError, TypeError, binascii.Error):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list):
+        raise InvalidCursor(cursor)
+    return values, bool(reverse)
+
+
+def approximate_count(queryset, timeout=None):
+    """
+    Cheap row count for paginators: PostgreSQL's planner estimate for an unfiltered
+    table, otherwise an exact COUNT cached for APPROXIMATE_COUNT_TIMEOUT seconds.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 (or 0) until the table has been analyzed
+        if row and row[0] > 0:
+            return row[0]
+
+    if timeout is None:
+        timeout = getattr(settings, 'APPROXIMATE_COUNT_TIMEOUT', 60)
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    key = APPROXIMATE_COUNT_KEY.format(hashlib.md5(f'{sql}{params}'.encode()).hexdigest())
+    return cache.get_or_set(key, queryset.count, timeout)
+
+
+class CursorPaginator:
+    """
+    Keyset paginator: each page is fetched with WHERE (ordering) < (last row seen)
+    instead of OFFSET, so deep pages cost the same as the first one. The ordering
+    must be unique, hence the trailing id. No COUNT runs unless count is read.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id'), count_mode=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.count_mode = count_mode  # None, 'exact' or 'approximate'
+        self.fields = [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    @cached_property
+    def count(self):
+        if self.count_mode == 'exact':
+            return self.queryset.count()
+        if self.count_mode == 'approximate':
+            return approximate_count(self.queryset)
+        return None
+
+    def row_values(self, obj):
+        return [getattr(obj, name) for name, _descending in self.fields]
+
+    def _parse_values(self, values):
+        if len(values) != len(self.fields):
+            raise InvalidCursor(values)
+        opts = self.queryset.model._meta
+        try:
+            return [opts.get_field(name).to_python(value) for (name, _descending), value in zip(self.fields, values)]
+        except ValidationError:
+            raise InvalidCursor(values)
+
+    def _after(self, values, reverse):
+        """Filter for the rows that follow values in the ordering (or precede them if reverse)"""
+        condition = Q()
+        for i, (name, descending) in enumerate(self.fields):
+            lookup = 'gt' if descending == reverse else 'lt'
+            ties = {prev_name: values[j] for j, (prev_name, _descending) in enumerate(self.fields[:i])}
+            condition |= Q(**ties, **{f'{name}__{lookup}': values[i]})
+        # Redundant bound on the leading column so the database can seek the index instead
+        # of evaluating the OR chain from the start of the table
+        name, descending = self.fields[0]
+        return Q(**{f'{name}__{"gte" if descending == reverse else "lte"}': values[0]}) & condition
+
+    def page(self, cursor=None):
+        queryset = self.queryset.order_by(*self.ordering)
+        reverse = False
+        if cursor:
+            values, reverse = decode_cursor(cursor)
+            queryset = queryset.filter(self._after(self._parse_values(values), reverse))
+            if reverse:
+                queryset = queryset.reverse()
+
+        # One extra row tells us whether there is another page in this direction
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+            return CursorPage(rows, self, has_next=True, has_previous=has_more)
+        return CursorPage(rows, self, has_next=has_more, has_previous=bool(cursor))
+
+
+class CursorPage(Sequence):
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self.object_list)} rows>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous and bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if self.has_next():
+            return encode_cursor(self.paginator.row_values(self.object_list[-1]))
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous():
+            return encode_cursor(self.paginator.row_values(self.object_list[0]), reverse=True)
+        return None
+
+
+class CursorPaginationMixin:
+    """ListView mixin that pages with CursorPaginator (?cursor=...) instead of ?page=N"""
+    cursor_ordering = ('-created_at', '-id')
+    cursor_count_mode = None
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size, self.cursor_ordering, self.cursor_count_mode)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_query_param))
+        except InvalidCursor:
+            raise Http404("Invalid cursor")
+        return paginator, page, page.object_list, page.has_other_pages()
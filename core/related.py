@@ -0,0 +1,187 @@
+# core/related.py
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.utils.html import strip_tags
+
+from blog.models import Post, RelatedPost
+from projects.models import Project, RelatedProject
+
+WORD = re.compile(r'[a-z0-9]{3,}')
+STOP_WORDS = frozenset("""
+    about above after again against all also and any are because been before being below between both but can
+    could did does doing down during each few for from further had has have having her here hers him his how
+    into its just more most much must not now off once only other our ours out over own same she should some
+    such than that the their theirs them then there these they this those through too under until very was
+    were what when where which while who whom why will with would you your yours
+""".split())
+
+# Share of each signal in a neighbour's score
+WEIGHTS = {'text': 0.5, 'categories': 0.3, 'tags': 0.2}
+NEIGHBOURS = 6
+# Only the strongest terms of each document are kept; the rest barely move the cosine
+TERMS_PER_DOCUMENT = 64
+# Terms in more than this share of the documents (in corpora of 10 or more) are ignored:
+# they say little about similarity and would make the candidate scan quadratic
+MAX_DOCUMENT_FREQUENCY = 0.5
+
+
+def tokenize(text):
+    return [word for word in WORD.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def tfidf_vectors(texts, terms_per_document=TERMS_PER_DOCUMENT):
+    """Return one sparse {term: weight} vector per text: sublinear TF-IDF, L2-normalised"""
+    counts = [Counter(tokenize(text)) for text in texts]
+    document_frequency = Counter(term for count in counts for term in count)
+    total = len(texts)
+    too_common = MAX_DOCUMENT_FREQUENCY * total if total >= 10 else total
+    vectors = []
+    for count in counts:
+        weights = {
+            term: (1 + math.log(tf)) * (math.log((1 + total) / (1 + document_frequency[term])) + 1)
+            for term, tf in count.items() if document_frequency[term] <= too_common
+        }
+        if len(weights) > terms_per_document:
+            weights = dict(heapq.nlargest(terms_per_document, weights.items(), key=lambda item: item[1]))
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        vectors.append({term: weight / norm for term, weight in weights.items()})
+    return vectors
+
+
+def _invert(sets):
+    index = defaultdict(list)
+    for i, values in enumerate(sets):
+        for value in values:
+            index[value].append(i)
+    return index
+
+
+def _jaccard(shared, size, other_size):
+    return shared / (size + other_size - shared) if shared else 0.0
+
+
+def nearest_neighbours(documents, limit=NEIGHBOURS, weights=WEIGHTS):
+    """
+    Score every pair of documents that share a term, category or tag and return
+    {pk: [(neighbour pk, score), ...]} with the best `limit` neighbours first.
+
+    documents are (pk, text, categories, tags) tuples. The score is a weighted sum of
+    the TF-IDF cosine of the texts and the Jaccard overlap of categories and of tags.
+    Candidates come from inverted indexes, so unrelated pairs are never visited.
+    Ties go to the document listed first.
+    """
+    vectors = tfidf_vectors([text for _pk, text, _categories, _tags in documents])
+    postings = defaultdict(list)
+    for i, vector in enumerate(vectors):
+        for term, weight in vector.items():
+            postings[term].append((i, weight))
+    category_index = _invert(categories for _pk, _text, categories, _tags in documents)
+    tag_index = _invert(tags for _pk, _text, _categories, tags in documents)
+
+    neighbours = {}
+    for i, (pk, _text, categories, tags) in enumerate(documents):
+        cosine = defaultdict(float)
+        for term, weight in vectors[i].items():
+            for j, other_weight in postings[term]:
+                cosine[j] += weight * other_weight
+        shared_categories = Counter(j for category in categories for j in category_index[category])
+        shared_tags = Counter(j for tag in tags for j in tag_index[tag])
+
+        scored = []
+        for j in cosine.keys() | shared_categories.keys() | shared_tags.keys():
+            if j == i:
+                continue
+            _other_pk, _other_text, other_categories, other_tags = documents[j]
+            score = (
+                weights['text'] * cosine.get(j, 0.0)
+                + weights['categories'] * _jaccard(shared_categories[j], len(categories), len(other_categories))
+                + weights['tags'] * _jaccard(shared_tags[j], len(tags), len(other_tags))
+            )
+            if score > 0:
+                scored.append((score, -j))
+        neighbours[pk] = [
+            (documents[-negative_index][0], round(score, 4))
+            for score, negative_index in heapq.nlargest(limit, scored)
+        ]
+    return neighbours
+
+
+class RelatedSpec:
+    """
+    Builds the neighbour table of one model from its text, categories and tags.
+
+    Subclasses set model, link_model and source_field and define document(obj),
+    which returns (text, categories, tags) for one object of queryset().
+    """
+    model = None
+    link_model = None
+    # Foreign key of link_model pointing at the source object
+    source_field = None
+
+    def queryset(self):
+        return self.model.objects.all()
+
+    def documents(self):
+        return [(obj.pk, *self.document(obj)) for obj in self.queryset()]
+
+    @transaction.atomic
+    def save(self, neighbours):
+        self.link_model.objects.all().delete()
+        self.link_model.objects.bulk_create(
+            (
+                self.link_model(**{f'{self.source_field}_id': pk}, related_id=related_pk, rank=rank, score=score)
+                for pk, related in neighbours.items()
+                for rank, (related_pk, score) in enumerate(related)
+            ),
+            batch_size=1000,
+        )
+
+    def build(self, limit=NEIGHBOURS, weights=WEIGHTS):
+        """Recompute and store every object's neighbours; returns {pk: [(pk, score), ...]}"""
+        neighbours = nearest_neighbours(self.documents(), limit, weights)
+        self.save(neighbours)
+        return neighbours
+
+
+class PostRelated(RelatedSpec):
+    model = Post
+    link_model = RelatedPost
+    source_field = 'post'
+
+    def queryset(self):
+        # Newest first, so ties favour recent posts
+        return Post.objects.filter(status='published').order_by('-published_date', '-id').only(
+            'title', 'excerpt', 'content', 'category_id',
+        ).prefetch_related('tags')
+
+    def document(self, obj):
+        text = ' '.join((obj.title, obj.title, obj.excerpt, strip_tags(obj.content)))
+        categories = {obj.category_id} if obj.category_id else set()
+        return text, categories, {tag.pk for tag in obj.tags.all()}
+
+
+class ProjectRelated(RelatedSpec):
+    model = Project
+    link_model = RelatedProject
+    source_field = 'project'
+
+    def queryset(self):
+        return Project.objects.order_by('-completion_date', '-id').only(
+            'title', 'description', 'location',
+        ).prefetch_related('categories', 'features')
+
+    def document(self, obj):
+        features = ' '.join(feature.title for feature in obj.features.all())
+        text = ' '.join((obj.title, obj.title, obj.description, obj.location, features))
+        # Projects have no tags; feature titles are folded into the text instead
+        return text, {category.pk for category in obj.categories.all()}, set()
+
+
+RELATED_SPECS = {
+    'posts': PostRelated,
+    'projects': ProjectRelated,
+}
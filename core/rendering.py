@@ -0,0 +1,203 @@
+# core/rendering.py
+import math
+import re
+from decimal import Decimal, InvalidOperation
+from html import unescape
+from html.parser import HTMLParser
+from typing import NamedTuple
+
+import bleach
+from django.utils.html import escape
+from django.utils.text import Truncator, slugify
+
+# What the Summernote toolbar can produce; everything else is stripped
+ALLOWED_TAGS = frozenset({
+    'a', 'abbr', 'b', 'blockquote', 'br', 'caption', 'code', 'div', 'em', 'figcaption', 'figure',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'iframe', 'img', 'li', 'ol', 'p', 'pre', 's',
+    'span', 'strike', 'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr',
+    'u', 'ul',
+})
+ALLOWED_PROTOCOLS = frozenset({'http', 'https', 'mailto', 'tel', 'data'})
+# Video embeds are the only frames kept
+EMBED_PREFIXES = ('https://www.youtube.com/embed/', 'https://www.youtube-nocookie.com/embed/',
+                  'https://player.vimeo.com/video/')
+
+# Headings that make up the table of contents
+TOC_TAGS = ('h2', 'h3')
+# Closing these separates words in the plain text
+BLOCK_TAGS = frozenset({
+    'blockquote', 'br', 'caption', 'div', 'figcaption', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'li',
+    'p', 'pre', 'td', 'th', 'tr',
+})
+WORDS_PER_MINUTE = 200
+EXCERPT_LENGTH = 300
+
+
+def _allow_link(tag, name, value):
+    # data: is allowed for inline images only
+    return name in ('title', 'target') or (name == 'href' and not value.strip().lower().startswith('data:'))
+
+
+def _allow_image(tag, name, value):
+    if name == 'src':
+        value = value.strip().lower()
+        return not value.startswith('data:') or value.startswith('data:image/')
+    return name in ('alt', 'title', 'width', 'height')
+
+
+def _allow_embed(tag, name, value):
+    if name == 'src':
+        return value.startswith(EMBED_PREFIXES)
+    return name in ('width', 'height', 'allowfullscreen', 'title')
+
+
+ALLOWED_ATTRIBUTES = {
+    '*': ['class'],
+    'a': _allow_link,
+    'img': _allow_image,
+    'iframe': _allow_embed,
+    'td': ['colspan', 'rowspan'],
+    'th': ['colspan', 'rowspan', 'scope'],
+}
+
+
+# strip=True keeps the text of removed tags, which for these is code
+SCRIPT_BLOCKS = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+
+
+def sanitize_html(html):
+    """Strip scripts, handlers, styles and unknown tags from editor HTML"""
+    return bleach.clean(
+        SCRIPT_BLOCKS.sub('', html), tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES,
+        protocols=ALLOWED_PROTOCOLS, strip=True,
+    )
+
+
+class _Rewriter(HTMLParser):
+    """
+    One pass over sanitized HTML that collects its plain text, gives TOC headings
+    ids and marks images and frames for lazy loading. Entities are passed through
+    untouched, so the markup comes out as it went in apart from those attributes.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.out = []
+        self.text = []
+        self.toc = []
+        self.ids = set()
+        # (tag, attrs, position of its start tag in out, text) of the open TOC heading
+        self.heading = None
+
+    def _start_tag(self, tag, attrs):
+        rendered = ''.join(f' {name}' if value is None else f' {name}="{escape(value)}"' for name, value in attrs)
+        return f'<{tag}{rendered}>'
+
+    def _add_text(self, text):
+        self.text.append(text)
+        if self.heading:
+            self.heading[3].append(text)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('img', 'iframe'):
+            names = {name for name, _value in attrs}
+            attrs = list(attrs)
+            if 'loading' not in names:
+                attrs.append(('loading', 'lazy'))
+            if tag == 'img' and 'decoding' not in names:
+                attrs.append(('decoding', 'async'))
+        if tag in TOC_TAGS and self.heading is None:
+            self.heading = (tag, attrs, len(self.out), [])
+        if tag in BLOCK_TAGS:
+            self.text.append(' ')
+        self.out.append(self._start_tag(tag, attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self.out.append(f'</{tag}>')
+        if tag in BLOCK_TAGS:
+            self.text.append(' ')
+        if self.heading and tag == self.heading[0]:
+            _tag, attrs, position, text = self.heading
+            self.heading = None
+            title = ' '.join(''.join(text).split())
+            if not title:
+                return
+            anchor = base = slugify(title) or 'section'
+            n = 1
+            while anchor in self.ids:
+                n += 1
+                anchor = f'{base}-{n}'
+            self.ids.add(anchor)
+            self.out[position] = self._start_tag(tag, [*attrs, ('id', anchor)])
+            self.toc.append({'id': anchor, 'title': title, 'level': int(tag[1])})
+
+    def handle_data(self, data):
+        self.out.append(data)
+        self._add_text(data)
+
+    def handle_entityref(self, name):
+        self.out.append(f'&{name};')
+        self._add_text(unescape(f'&{name};'))
+
+    def handle_charref(self, name):
+        self.out.append(f'&#{name};')
+        self._add_text(unescape(f'&#{name};'))
+
+
+class RenderedText(NamedTuple):
+    html: str
+    text: str
+    read_time: int
+    toc: list
+
+
+def render_rich_text(html):
+    """
+    Render editor HTML once, at save time: sanitized HTML with heading ids and
+    lazy images, its plain text, minutes to read and a table of contents.
+    """
+    rewriter = _Rewriter()
+    rewriter.feed(sanitize_html(html or ''))
+    rewriter.close()
+    text = re.sub(r'\s+', ' ', ''.join(rewriter.text)).strip()
+    words = len(text.split())
+    return RenderedText(
+        html=''.join(rewriter.out),
+        text=text,
+        read_time=math.ceil(words / WORDS_PER_MINUTE) if words else 0,
+        toc=rewriter.toc,
+    )
+
+
+def excerpt_from_text(text, length=EXCERPT_LENGTH):
+    return Truncator(text).chars(length)
+
+
+# A price written with its currency: K1,200, ZMW 350.50, $40
+PRICE = re.compile(r'(?:\bK|\bZMW|\bZK|\bUSD|\$)\s?(\d[\d,]*(?:\.\d{1,2})?)', re.IGNORECASE)
+
+
+def split_lines(text):
+    """Non-empty, stripped lines of a one-item-per-line text field"""
+    return [line.strip() for line in (text or '').splitlines() if line.strip()]
+
+
+def parse_price(line):
+    """The first price written in a line as a number, or None"""
+    match = PRICE.search(line)
+    if not match:
+        return None
+    try:
+        price = Decimal(match.group(1).replace(',', ''))
+    except InvalidOperation:
+        return None
+    # JSON numbers, so database JSON lookups can compare them
+    return int(price) if price == price.to_integral_value() else float(price)
+
+
+def parse_priced_lines(text):
+    """[{'text': line, 'price': number or None}, ...] for a one-item-per-line text field"""
+    return [{'text': line, 'price': parse_price(line)} for line in split_lines(text)]
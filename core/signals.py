@@ -0,0 +1,81 @@
+# core/signals.py
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+
+from blog.models import Post
+from projects.models import Project, ProjectImage
+from .caching import (
+    HOME_SECTIONS, PAGE_CACHE_GROUPS, home_sections_for_model, invalidate_counts,
+    invalidate_home_sections, page_cache_groups_for_model, purge_page_cache,
+)
+from .images import process_upload
+from .models import ContactMessage, Service, SliderImage, TeamMember
+
+# Image fields that get WebP/AVIF derivatives when a new file is uploaded
+IMAGE_FIELDS = {
+    Project: ('featured_image',),
+    ProjectImage: ('image',),
+    Post: ('featured_image',),
+    SliderImage: ('image',),
+    TeamMember: ('image',),
+    Service: ('image',),
+}
+
+
+def invalidate_home_cache(sender, **kwargs):
+    """Drop the home page sections that depend on the saved/deleted model"""
+    invalidate_home_sections(*home_sections_for_model(sender))
+
+
+def connect_home_cache_signals():
+    models = {model for _loader, section_models in HOME_SECTIONS.values() for model in section_models}
+    for model in models:
+        uid = f'home_cache_{model._meta.label_lower}'
+        post_save.connect(invalidate_home_cache, sender=model, dispatch_uid=uid)
+        post_delete.connect(invalidate_home_cache, sender=model, dispatch_uid=uid)
+
+
+def purge_cached_pages(sender, **kwargs):
+    """Purge the cached public pages that render the saved/deleted model"""
+    purge_page_cache(*page_cache_groups_for_model(sender))
+
+
+def connect_page_cache_signals():
+    models = {model for group_models in PAGE_CACHE_GROUPS.values() for model in group_models}
+    for model in models:
+        uid = f'page_cache_{model._meta.label_lower}'
+        post_save.connect(purge_cached_pages, sender=model, dispatch_uid=uid)
+        post_delete.connect(purge_cached_pages, sender=model, dispatch_uid=uid)
+    # Project.categories.add()/remove() and post.tags.set() only send m2m_changed on the through model
+    m2m_changed.connect(purge_cached_pages, sender=Project.categories.through,
+                        dispatch_uid='page_cache_project_categories')
+    m2m_changed.connect(purge_cached_pages, sender=Post.tags.through, dispatch_uid='page_cache_post_tags')
+
+
+def invalidate_message_count(sender, **kwargs):
+    invalidate_counts('new_messages')
+
+
+def connect_count_signals():
+    post_save.connect(invalidate_message_count, sender=ContactMessage, dispatch_uid='count_contact_message')
+    post_delete.connect(invalidate_message_count, sender=ContactMessage, dispatch_uid='count_contact_message')
+
+
+def collect_new_uploads(sender, instance, **kwargs):
+    # Files are committed to storage after pre_save, so uncommitted ones are new uploads
+    instance._new_image_fields = [
+        field_name for field_name in IMAGE_FIELDS[sender]
+        if getattr(instance, field_name) and not getattr(instance, field_name)._committed
+    ]
+
+
+def process_new_uploads(sender, instance, **kwargs):
+    for field_name in getattr(instance, '_new_image_fields', []):
+        process_upload(getattr(instance, field_name).name)
+    instance._new_image_fields = []
+
+
+def connect_image_signals():
+    for model in IMAGE_FIELDS:
+        uid = f'image_derivatives_{model._meta.label_lower}'
+        pre_save.connect(collect_new_uploads, sender=model, dispatch_uid=uid)
+        post_save.connect(process_new_uploads, sender=model, dispatch_uid=uid)
@@ -0,0 +1,100 @@
+# core/sitemaps.py
+import functools
+import hashlib
+
+from django.conf import settings
+from django.contrib.sitemaps import Sitemap
+from django.db.models import Max
+from django.urls import reverse
+from django.views.decorators.cache import cache_page
+from django.views.decorators.gzip import gzip_page
+
+from blog.models import Post
+from projects.models import Project, ProjectCategory
+from .caching import get_page_cache_prefix
+from .models import Service
+
+# Page cache groups whose content is listed in the sitemaps
+SITEMAP_GROUPS = ('blog', 'projects', 'services')
+
+
+class StaticViewSitemap(Sitemap):
+    changefreq = 'weekly'
+    priority = 1.0
+
+    def items(self):
+        return ['core:home', 'core:about', 'core:service_list', 'projects:project_list', 'blog:blog_list', 'core:team']
+
+    def location(self, item):
+        return reverse(item)
+
+
+class PostSitemap(Sitemap):
+    changefreq = 'weekly'
+    priority = 0.8
+
+    def items(self):
+        return Post.objects.filter(status='published').only('slug', 'updated_date').order_by('id')
+
+    def lastmod(self, obj):
+        return obj.updated_date
+
+
+class ProjectSitemap(Sitemap):
+    changefreq = 'monthly'
+    priority = 0.7
+
+    def items(self):
+        return Project.objects.only('slug', 'updated_at').order_by('id')
+
+    def lastmod(self, obj):
+        return obj.updated_at
+
+
+class ServiceSitemap(Sitemap):
+    changefreq = 'monthly'
+    priority = 0.9
+
+    def items(self):
+        return Service.objects.filter(is_active=True).only('slug', 'updated_at').order_by('id')
+
+    def lastmod(self, obj):
+        return obj.updated_at
+
+
+class ProjectCategorySitemap(Sitemap):
+    changefreq = 'monthly'
+    priority = 0.6
+
+    def items(self):
+        # A category page changes whenever one of its projects does
+        return ProjectCategory.objects.annotate(last_project_update=Max('projects__updated_at')).order_by('id')
+
+    def location(self, obj):
+        return reverse('projects:category', kwargs={'slug': obj.slug})
+
+    def lastmod(self, obj):
+        return obj.last_project_update
+
+
+sitemaps = {
+    'pages': StaticViewSitemap,
+    'posts': PostSitemap,
+    'projects': ProjectSitemap,
+    'services': ServiceSitemap,
+    'project-categories': ProjectCategorySitemap,
+}
+
+
+def cached_sitemap(view):
+    """Gzip a sitemap view and cache it until posts, projects or services change"""
+    compressed = gzip_page(view)
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        versions = ':'.join(get_page_cache_prefix(group) for group in SITEMAP_GROUPS)
+        key_prefix = f'sitemap:{hashlib.md5(versions.encode()).hexdigest()}'
+        timeout = getattr(settings, 'SITEMAP_CACHE_TIMEOUT', 60 * 60 * 24)
+        return cache_page(timeout, key_prefix=key_prefix)(compressed)(request, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,30 @@
+# core/stats.py
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+STATS_KEY = 'stats:{}:{}'
+
+
+def get_stats(model, timeout=None, **counters):
+    """
+    Compute several counters for a model in a single aggregate query.
+
+    Each keyword is a counter name mapped to a Q filter, or None to count every row:
+
+        get_stats(ServiceRequest, total=None, new=Q(is_processed=False))
+
+    Results are cached for DASHBOARD_STATS_TIMEOUT seconds unless timeout is given;
+    a timeout of 0 always hits the database.
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'DASHBOARD_STATS_TIMEOUT', 0)
+    aggregates = {name: Count('pk', filter=condition) for name, condition in counters.items()}
+    if not timeout:
+        return model.objects.aggregate(**aggregates)
+
+    signature = repr(sorted((name, str(condition)) for name, condition in counters.items()))
+    key = STATS_KEY.format(model._meta.label_lower, hashlib.md5(signature.encode()).hexdigest())
+    return cache.get_or_set(key, lambda: model.objects.aggregate(**aggregates), timeout)
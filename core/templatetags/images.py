@@ -0,0 +1,28 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+
+from core.images import get_derivative_formats, get_srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def picture(image, sizes, **attrs):
+    """
+    Usage: {% picture obj.image sizes="(max-width: 768px) 100vw, 33vw" alt=obj.title class="..." %}
+
+    One <source> per derivative format (AVIF before WebP, as configured) and the
+    original file in <img>, for browsers that support neither or before the
+    derivatives exist. display: contents keeps the <picture> out of the layout.
+    """
+    name = getattr(image, 'name', image)
+    sources = [(f'image/{fmt}', srcset) for fmt in get_derivative_formats() if (srcset := get_srcset(name, fmt))]
+    return format_html(
+        '<picture style="display: contents">{}<img src="{}"{}></picture>',
+        format_html_join(
+            '', '<source type="{}" srcset="{}" sizes="{}">', ((mime, srcset, sizes) for mime, srcset in sources),
+        ),
+        image.url,
+        flatatt({'loading': 'lazy', **attrs}),
+    )
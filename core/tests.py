@@ -1,3 +1,1112 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import os
+import re
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Q
+from django.test import Client, LiveServerTestCase, RequestFactory, TestCase, override_settings
+from django.template import Context, Template
+from django.test.utils import CaptureQueriesContext
+from django.urls import ResolverMatch, reverse
+from django.utils import timezone
+from django.views.generic import RedirectView
+from django.views.static import serve
+from PIL import Image, features
+
+from accounts.models import User
+from blog.models import Category, Comment, NewsletterSubscriber, Post
+from blog.search import fts_available, search_post_ids
+from projects.models import Project, ProjectCategory, ProjectImage
+from . import benchmarks, loadtest, metrics, related
+from .rendering import render_rich_text
+from .context_processors import core_context
+from .emails import claim_due_emails
+from .images import derivative_name, get_srcset
+from .models import (
+    ContactMessage, QueuedEmail, Service, ServiceFeature, ServiceRequest, Subscriber, TeamMember,
+)
+from .pagination import CursorPaginator, approximate_count
+from .stats import get_stats
+from .views import ContactMessageListView
+
+
+class HomePageCacheTests(TestCase):
+    """Tests for the per-section home page cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.service = Service.objects.create(title='Plumbing', image='services/plumbing.jpg')
+        ServiceFeature.objects.create(service=self.service, title='Leak detection')
+        TeamMember.objects.create(
+            name='Jane Banda', position='Director', bio='Bio',
+            image='team/jane.jpg', is_leadership=True,
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_warm_home_page_runs_no_queries(self):
+        self.client.get(reverse('core:home'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('core:home'))
+        self.assertContains(response, 'Plumbing')
+        self.assertContains(response, 'Leak detection')
+
+    def test_saving_a_service_invalidates_the_services_section(self):
+        self.client.get(reverse('core:home'))
+        self.service.title = 'Electrical'
+        self.service.save()
+        response = self.client.get(reverse('core:home'))
+        self.assertContains(response, 'Electrical')
+
+    def test_deleting_a_feature_invalidates_the_services_section(self):
+        self.client.get(reverse('core:home'))
+        ServiceFeature.objects.filter(service=self.service).delete()
+        response = self.client.get(reverse('core:home'))
+        self.assertNotContains(response, 'Leak detection')
+
+    def test_deleting_a_team_member_invalidates_the_leadership_section(self):
+        self.client.get(reverse('core:home'))
+        TeamMember.objects.all().delete()
+        response = self.client.get(reverse('core:home'))
+        self.assertNotContains(response, 'JANE BANDA')
+
+
+class HomePageQueryCountTests(TestCase):
+    """Regression tests for the home page services grid"""
+
+    def setUp(self):
+        cache.clear()
+        for i in range(6):
+            service = Service.objects.create(title=f'Service {i}', image='services/service.jpg')
+            ServiceFeature.objects.bulk_create(
+                ServiceFeature(service=service, title=f'Feature {i}.{j}') for j in range(5)
+            )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_cold_home_page_query_count_is_fixed(self):
+        # One query per section plus one for the prefetched service features
+        with self.assertNumQueries(8):
+            response = self.client.get(reverse('core:home'))
+        self.assertContains(response, 'Feature 0.2')
+        self.assertNotContains(response, 'Feature 0.3')
+        self.assertContains(response, '+2 more')
+
+
+
+@override_settings(ADMIN_EMAIL='admin@example.com', DEFAULT_FROM_EMAIL='noreply@example.com')
+class EmailQueueTests(TestCase):
+    """Tests for the outbound email queue"""
+
+    def setUp(self):
+        self.service = Service.objects.create(
+            title='Plumbing', image='services/plumbing.jpg', starting_price=1500
+        )
+
+    def submit_request(self):
+        return self.client.post(reverse('core:submit_service_request'), {
+            'service': self.service.pk,
+            'name': 'Mwila',
+            'email': 'mwila@example.com',
+            'phone': '0977000000',
+            'message': 'Fix the kitchen sink',
+            'contact_method': 'phone',
+            'budget_range': 'under_10k',
+        })
+
+    def test_service_request_only_enqueues_emails(self):
+        response = self.submit_request()
+        self.assertRedirects(response, reverse('core:service_request_success'))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            sorted(QueuedEmail.objects.values_list('recipients', flat=True)),
+            ['admin@example.com', 'mwila@example.com'],
+        )
+
+    def test_direct_booking_only_enqueues_email(self):
+        self.client.post(reverse('core:book_service_directly', args=[self.service.pk]), {
+            'name': 'Mwila', 'email': 'mwila@example.com', 'phone': '0977000000',
+        })
+        self.assertEqual(ServiceRequest.objects.count(), 1)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(QueuedEmail.objects.get().subject, 'Direct Booking: Plumbing')
+
+    def test_command_sends_pending_emails(self):
+        self.submit_request()
+        call_command('send_queued_emails', stdout=mock.MagicMock())
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(QueuedEmail.objects.exclude(status='sent').exists())
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+
+    @override_settings(EMAIL_QUEUE_MAX_ATTEMPTS=2, EMAIL_QUEUE_RETRY_DELAY=60)
+    def test_failed_sends_back_off_then_give_up(self):
+        self.submit_request()
+        with mock.patch('core.emails.EmailMultiAlternatives.send', side_effect=OSError('timed out')), \
+                self.assertLogs('core.emails', level='ERROR'):
+            call_command('send_queued_emails', stdout=mock.MagicMock())
+            email = QueuedEmail.objects.first()
+            self.assertEqual(email.status, 'pending')
+            self.assertEqual(email.attempts, 1)
+            self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+            # Not due yet, so nothing is retried
+            call_command('send_queued_emails', stdout=mock.MagicMock())
+            self.assertEqual(QueuedEmail.objects.get(pk=email.pk).attempts, 1)
+
+            QueuedEmail.objects.update(next_attempt_at=timezone.now())
+            call_command('send_queued_emails', stdout=mock.MagicMock())
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'failed')
+        self.assertEqual(email.last_error, 'timed out')
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_connection_failure_backs_off_whole_batch(self):
+        self.submit_request()
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.open',
+                        side_effect=OSError('connection refused')), \
+                self.assertLogs('core.emails', level='ERROR'):
+            call_command('send_queued_emails', stdout=mock.MagicMock())
+        self.assertEqual(len(mail.outbox), 0)
+        for email in QueuedEmail.objects.all():
+            self.assertEqual(email.status, 'pending')
+            self.assertEqual(email.attempts, 1)
+            self.assertEqual(email.last_error, 'connection refused')
+            self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+    def test_loop_keeps_running_after_errors(self):
+        with mock.patch('core.management.commands.send_queued_emails.send_queued_emails',
+                        side_effect=[RuntimeError('database is locked'), (0, 0)]), \
+                mock.patch('core.management.commands.send_queued_emails.time.sleep',
+                           side_effect=[None, KeyboardInterrupt]), \
+                self.assertLogs('core.management.commands.send_queued_emails', level='ERROR'):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('send_queued_emails', loop=True, stdout=mock.MagicMock())
+
+    def test_claimed_emails_are_skipped_by_other_workers(self):
+        self.submit_request()
+        claimed = claim_due_emails(batch_size=1)
+        self.assertEqual(len(claimed), 1)
+        self.assertEqual(QueuedEmail.objects.get(pk=claimed[0].pk).status, 'sending')
+
+        call_command('send_queued_emails', stdout=mock.MagicMock())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(QueuedEmail.objects.get(pk=claimed[0].pk).status, 'sending')
+
+        # An abandoned claim is retried once its lease runs out
+        QueuedEmail.objects.filter(pk=claimed[0].pk).update(next_attempt_at=timezone.now())
+        call_command('send_queued_emails', stdout=mock.MagicMock())
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(QueuedEmail.objects.exclude(status='sent').exists())
+
+
+def make_jpeg(width, height, exif=True):
+    buffer = BytesIO()
+    image = Image.new('RGB', (width, height), 'orange')
+    kwargs = {}
+    if exif:
+        image_exif = Image.Exif()
+        image_exif[0x010F] = 'Camera maker'  # Make
+        kwargs['exif'] = image_exif
+    image.save(buffer, format='JPEG', **kwargs)
+    return buffer.getvalue()
+
+
+@override_settings(IMAGE_DERIVATIVE_WIDTHS=(320, 640, 1280), IMAGE_DERIVATIVE_FORMATS=('webp',))
+class ImageDerivativeTests(TestCase):
+    """Tests for the upload-time image derivative pipeline"""
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        override = self.settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root)
+
+    def tearDown(self):
+        cache.clear()
+
+    def create_service(self, content):
+        return Service.objects.create(
+            title='Roofing', image=SimpleUploadedFile('roof.jpg', content, content_type='image/jpeg')
+        )
+
+    def test_upload_generates_derivatives_without_upscaling(self):
+        service = self.create_service(make_jpeg(800, 400))
+        name = service.image.name
+        for width in (320, 640, 800):
+            with Image.open(os.path.join(self.media_root, derivative_name(name, width, 'webp'))) as image:
+                self.assertEqual(image.size, (width, width // 2))
+                self.assertFalse(image.getexif())
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, derivative_name(name, 1280, 'webp'))))
+        self.assertEqual(
+            get_srcset(name),
+            ', '.join(f'/media/{derivative_name(name, width, "webp")} {width}w' for width in (320, 640, 800)),
+        )
+
+    def test_upload_strips_exif_from_the_original(self):
+        service = self.create_service(make_jpeg(400, 300))
+        with Image.open(service.image.path) as image:
+            self.assertFalse(image.getexif())
+
+    @override_settings(IMAGE_DERIVATIVE_FORMATS=('avif', 'webp'))
+    def test_picture_lists_every_format_and_keeps_the_original(self):
+        service = self.create_service(make_jpeg(400, 300, exif=False))
+        html = Template('{% load images %}{% picture service.image sizes="33vw" alt=service.title %}').render(
+            Context({'service': service})
+        )
+        formats = [fmt for fmt in ('avif', 'webp') if features.check(fmt)]
+        self.assertEqual(re.findall(r'<source type="image/(\w+)"', html), formats)
+        for fmt in formats:
+            self.assertIn(derivative_name(service.image.name, 320, fmt), html)
+        self.assertIn(f'<img src="{service.image.url}" alt="Roofing" loading="lazy">', html)
+
+    def test_srcset_is_rebuilt_from_storage_on_a_cache_miss(self):
+        service = self.create_service(make_jpeg(400, 300, exif=False))
+        cache.clear()
+        self.assertIn('320w', get_srcset(service.image.name))
+        self.assertEqual(get_srcset('services/missing.jpg'), '')
+
+    def test_backfill_command_processes_existing_images(self):
+        os.makedirs(os.path.join(self.media_root, 'team'))
+        with open(os.path.join(self.media_root, 'team', 'jane.jpg'), 'wb') as f:
+            f.write(make_jpeg(700, 700))
+        TeamMember.objects.create(name='Jane', position='Director', bio='Bio', image='team/jane.jpg')
+        call_command('generate_image_derivatives', workers=2, stdout=mock.MagicMock())
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, 'team/derivatives/jane-640w.webp')))
+        with Image.open(os.path.join(self.media_root, 'team', 'jane.jpg')) as image:
+            self.assertFalse(image.getexif())
+
+
+class AnonymousPageCacheTests(TestCase):
+    """Tests for the anonymous full-page cache on public list pages"""
+
+    def setUp(self):
+        cache.clear()
+        Service.objects.create(title='Pipe fitting', image='services/plumbing.jpg')
+
+    def tearDown(self):
+        cache.clear()
+
+    def warm(self, url):
+        # The first response sets the CSRF cookie; the cookie-bearing request after it is cached
+        self.client.get(url)
+        self.client.get(url)
+
+    def test_repeat_visits_are_served_from_cache(self):
+        url = reverse('core:service_list')
+        self.warm(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertContains(response, 'Pipe fitting')
+
+    def test_query_string_is_part_of_the_key(self):
+        url = reverse('core:service_list')
+        self.warm(url)
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'category': 'electrical'})
+        self.assertNotContains(response, 'Pipe fitting')
+
+    def test_content_changes_purge_the_group(self):
+        url = reverse('core:service_list')
+        self.warm(url)
+        Service.objects.create(title='Electrical wiring', image='services/electrical.jpg')
+        self.assertContains(self.client.get(url), 'Electrical wiring')
+
+    def test_authenticated_users_bypass_the_cache(self):
+        url = reverse('core:team')
+        self.warm(url)
+        user = User.objects.create_user(username='staff', email='staff@example.com', password='x')
+        self.client.force_login(user)
+        TeamMember.objects.bulk_create([  # bulk_create sends no signals, so only a live render sees it
+            TeamMember(name='Mutale', position='Engineer', bio='Bio', image='team/m.jpg')
+        ])
+        self.assertContains(self.client.get(url), 'Mutale')
+
+    def test_cookieless_visitors_get_their_own_csrf_cookie(self):
+        url = reverse('core:service_list')
+        for _ in range(2):
+            client = Client(enforce_csrf_checks=True)
+            response = client.get(url)
+            self.assertIn('csrftoken', response.cookies)
+            token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', response.content.decode()).group(1)
+            response = client.post(reverse('core:subscribe'), {
+                'email': f'visitor{id(client)}@example.com', 'csrfmiddlewaretoken': token,
+            }, HTTP_REFERER=url)
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual(Subscriber.objects.count(), 2)
+
+
+class ContextProcessorCountTests(TestCase):
+    """Tests for the cached, lazily evaluated unread message counter"""
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get('/')
+        self.request.user = User.objects.create_user(username='staff', email='staff@example.com', password='x')
+        ContactMessage.objects.create(name='A', email='a@example.com', subject='Hi', message='Hello')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_unused_counter_runs_no_query(self):
+        with self.assertNumQueries(0):
+            core_context(self.request)
+
+    def test_counter_is_served_from_cache(self):
+        self.assertEqual(int(core_context(self.request)['new_messages_count']), 1)
+        with self.assertNumQueries(0):
+            self.assertTrue(core_context(self.request)['new_messages_count'] > 0)
+
+    def test_save_and_delete_refresh_the_counter(self):
+        self.assertEqual(int(core_context(self.request)['new_messages_count']), 1)
+        message = ContactMessage.objects.create(name='B', email='b@example.com', subject='Hi', message='Hello')
+        self.assertEqual(int(core_context(self.request)['new_messages_count']), 2)
+        message.is_read = True
+        message.save()
+        self.assertEqual(int(core_context(self.request)['new_messages_count']), 1)
+        ContactMessage.objects.all().delete()
+        self.assertEqual(int(core_context(self.request)['new_messages_count']), 0)
+
+
+class DashboardStatsTests(TestCase):
+    """Tests for the single-query dashboard stat counters"""
+
+    def setUp(self):
+        cache.clear()
+        for i, is_read in enumerate([False, False, True]):
+            ContactMessage.objects.create(
+                name=f'Client {i}', email='c@example.com', subject='Quote', message='Hello', is_read=is_read,
+            )
+
+    def tearDown(self):
+        cache.clear()
+
+    def count_messages(self, **kwargs):
+        return get_stats(ContactMessage, total=None, new=Q(is_read=False), read=Q(is_read=True), **kwargs)
+
+    def test_counters_are_computed_in_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.count_messages(), {'total': 3, 'new': 2, 'read': 1})
+
+    def test_timeout_caches_the_counters(self):
+        self.assertEqual(self.count_messages(timeout=60)['new'], 2)
+        ContactMessage.objects.update(is_read=True)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.count_messages(timeout=60)['new'], 2)
+        self.assertEqual(self.count_messages()['new'], 0)
+
+    def test_dashboard_stat_cards(self):
+        user = User.objects.create_user(username='staff', email='staff@example.com', password='x', is_active=True)
+        self.client.force_login(user)
+        response = self.client.get(reverse('core:contact_message_list'))
+        self.assertEqual(
+            [response.context[name] for name in ('total_messages', 'new_messages', 'read_messages')], [3, 2, 1]
+        )
+
+
+class CursorPaginationTests(TestCase):
+    """Tests for keyset pagination on (created_at, id)"""
+
+    def setUp(self):
+        cache.clear()
+        for i in range(7):
+            ContactMessage.objects.create(name=f'Client {i}', email='c@example.com', subject='Quote', message='Hi')
+        # Shared timestamps force the id tie-breaker to do the work
+        ContactMessage.objects.filter(pk__lte=ContactMessage.objects.order_by('pk')[3].pk).update(
+            created_at=timezone.now() - timedelta(days=1)
+        )
+        self.expected = list(ContactMessage.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_walks_forwards_and_backwards(self):
+        paginator = CursorPaginator(ContactMessage.objects.all(), 3)
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        self.assertEqual([[m.pk for m in page] for page in pages],
+                         [self.expected[:3], self.expected[3:6], self.expected[6:]])
+        self.assertFalse(pages[0].has_previous())
+
+        previous = paginator.page(pages[2].previous_cursor)
+        self.assertEqual([m.pk for m in previous], self.expected[3:6])
+        first = paginator.page(previous.previous_cursor)
+        self.assertEqual([m.pk for m in first], self.expected[:3])
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+    def test_pages_run_no_count(self):
+        paginator = CursorPaginator(ContactMessage.objects.all(), 3)
+        with self.assertNumQueries(1):
+            paginator.page()
+        self.assertIsNone(paginator.count)
+
+    def test_approximate_count_is_cached(self):
+        self.assertEqual(approximate_count(ContactMessage.objects.all()), 7)
+        with self.assertNumQueries(0):
+            self.assertEqual(CursorPaginator(ContactMessage.objects.all(), 3, count_mode='approximate').count, 7)
+
+    def test_dashboard_list_follows_cursors(self):
+        user = User.objects.create_user(username='staff', email='staff@example.com', password='x', is_active=True)
+        self.client.force_login(user)
+        url = reverse('core:contact_message_list')
+        with mock.patch.object(ContactMessageListView, 'paginate_by', 5):
+            first = self.client.get(url)
+            self.assertContains(first, f'?cursor={first.context["page_obj"].next_cursor}')
+            second = self.client.get(url, {'cursor': first.context['page_obj'].next_cursor})
+        self.assertEqual([m.pk for m in second.context['messages']], self.expected[5:])
+        self.assertEqual(self.client.get(url, {'cursor': 'not-a-cursor'}).status_code, 404)
+
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite specific")
+class QueryPlanTests(TestCase):
+    """Run EXPLAIN QUERY PLAN on every hot query the main views issue; none may scan a whole table"""
+
+    HOT_MODELS = (Post, Comment, ServiceRequest, ContactMessage, Project, Service, TeamMember,
+                  Subscriber, NewsletterSubscriber)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='staff', email='staff@example.com', password='x', is_active=True)
+        self.category = Category.objects.create(name='Roofing')
+        post = Post.objects.create(title='Roofs', author=self.user, content='Body', category=self.category,
+                                   featured_image='blog/post.jpg', status='published', is_featured=True)
+        Comment.objects.create(post=post, user=self.user, content='Nice')
+        Service.objects.create(title='Pipe fitting', image='services/plumbing.jpg', created_by=self.user)
+        TeamMember.objects.create(name='Mutale', position='Engineer', bio='Bio', image='team/m.jpg', is_leadership=True)
+        ContactMessage.objects.create(name='A', email='a@example.com', subject='Hi', message='Hello')
+        Subscriber.objects.create(email='s@example.com')
+
+    def tearDown(self):
+        cache.clear()
+
+    def full_scans(self, sql):
+        """Hot tables the query reads row by row without an index"""
+        # Aggregate FILTER clauses are not row filters; whole-table reads with no WHERE or
+        # ORDER BY (stat card aggregates, paginator COUNTs) have to touch every row anyway
+        body = re.sub(r'FILTER \(WHERE [^)]*\)', '', sql)
+        if not sql.startswith('SELECT') or (' WHERE ' not in body and ' ORDER BY ' not in body):
+            return []
+        hot_tables = {model._meta.db_table for model in self.HOT_MODELS}
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = [row[3] for row in cursor.fetchall()]
+        return [detail for detail in plan
+                if detail.startswith('SCAN ') and detail.split()[1] in hot_tables and 'INDEX' not in detail]
+
+    def assertNoFullScans(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        for query in queries.captured_queries:
+            scans = self.full_scans(query['sql'])
+            self.assertFalse(scans, f"{url} {params or ''}: {scans} in\n{query['sql']}")
+
+    def test_public_pages(self):
+        for url in (
+            reverse('core:home'),
+            reverse('blog:blog_list'),
+            reverse('blog:category', kwargs={'slug': self.category.slug}),
+            reverse('projects:project_list'),
+            reverse('core:service_list'),
+            reverse('core:team'),
+        ):
+            cache.clear()
+            self.assertNoFullScans(url)
+
+    def test_dashboard_pages(self):
+        self.client.force_login(self.user)
+        for url, params in (
+            (reverse('core:dashboard'), None),
+            (reverse('core:service_request_list'), None),
+            (reverse('core:service_request_list'), {'status': 'new'}),
+            (reverse('core:contact_message_list'), None),
+            (reverse('core:subscriber_list'), None),
+            (reverse('blog:comment_list'), None),
+            (reverse('blog:comment_list'), {'status': 'pending'}),
+        ):
+            cache.clear()
+            self.assertNoFullScans(url, params)
+
+
+class SitemapTests(TestCase):
+    """Tests for the cached, gzipped sitemaps"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='staff', email='staff@example.com', password='x', is_active=True)
+        category = Category.objects.create(name='Roofing')
+        self.post = Post.objects.create(title='Roofs', author=self.user, content='Body', category=category,
+                                        featured_image='blog/post.jpg', status='published')
+        Post.objects.create(title='Draft', author=self.user, content='Body', category=category,
+                            featured_image='blog/draft.jpg', status='draft')
+        Service.objects.create(title='Pipe fitting', image='services/plumbing.jpg')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_index_links_every_section(self):
+        response = self.client.get(reverse('sitemap'))
+        self.assertEqual(response.status_code, 200)
+        for section in ('pages', 'posts', 'projects', 'services', 'project-categories'):
+            self.assertContains(response, reverse('sitemap-section', kwargs={'section': section}))
+
+    def test_section_lists_published_content_with_lastmod(self):
+        response = self.client.get(reverse('sitemap-section', kwargs={'section': 'posts'}))
+        self.assertContains(response, self.post.get_absolute_url())
+        self.assertContains(response, f'<lastmod>{self.post.updated_date.date().isoformat()}')
+        self.assertNotContains(response, 'draft')
+
+    def test_gzip(self):
+        # Django skips compression when the (randomly padded) result isn't smaller, so use a real-sized sitemap
+        Service.objects.bulk_create(
+            Service(title=f'Service {i}', slug=f'service-{i}', image='services/plumbing.jpg') for i in range(20)
+        )
+        response = self.client.get(reverse('sitemap-section', kwargs={'section': 'services'}),
+                                   HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_cached_until_content_changes(self):
+        url = reverse('sitemap-section', kwargs={'section': 'posts'})
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        post = Post.objects.create(title='Gutters', author=self.user, content='Body', category=self.post.category,
+                                   featured_image='blog/gutters.jpg', status='published')
+        self.assertContains(self.client.get(url), post.get_absolute_url())
+
+
+class ContentImportExportTests(TestCase):
+    """Tests for the import_content / export_content commands"""
+
+    def setUp(self):
+        cache.clear()
+        self.tmpdir = tempfile.mkdtemp()
+        self.user = User.objects.create_user(username='staff', email='staff@example.com', password='x', is_active=True)
+        category = ProjectCategory.objects.create(name='Residential')
+        self.project = Project.objects.create(
+            title='Kabulonga House', description='Build', client='Client', location='Lusaka',
+            completion_date='2024-01-01', featured_image='projects/house.jpg', budget='1500.50',
+        )
+        self.project.categories.add(category)
+        ProjectImage.objects.create(project=self.project, image='projects/gallery/a.jpg', order=2)
+        service = Service.objects.create(title='Pipe fitting', image='services/plumbing.jpg', starting_price='99.00')
+        ServiceFeature.objects.create(service=service, title='Leak testing')
+
+    def tearDown(self):
+        cache.clear()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def path(self, name):
+        return os.path.join(self.tmpdir, name)
+
+    def round_trip(self, content, name):
+        call_command('export_content', content, '-o', self.path(name), stdout=StringIO())
+        call_command('import_content', content, self.path(name), stdout=StringIO())
+
+    def test_jsonl_export(self):
+        out = StringIO()
+        call_command('export_content', 'projects', stdout=out)
+        record = json.loads(out.getvalue().splitlines()[0])
+        self.assertEqual(record['slug'], 'kabulonga-house')
+        self.assertEqual(record['budget'], '1500.50')
+        self.assertEqual(record['categories'], ['residential'])
+        self.assertEqual(record['images'][0]['image'], 'projects/gallery/a.jpg')
+
+    def test_round_trip_updates_in_place(self):
+        for name in ('projects.jsonl', 'projects.csv'):
+            self.round_trip('projects', name)
+        self.assertEqual(Project.objects.count(), 1)
+        project = Project.objects.get()
+        self.assertEqual(project.pk, self.project.pk)
+        self.assertEqual(list(project.categories.values_list('slug', flat=True)), ['residential'])
+        self.assertEqual(list(project.images.values_list('image', 'order')), [('projects/gallery/a.jpg', 2)])
+
+        self.round_trip('services', 'services.csv')
+        service = Service.objects.get()
+        self.assertEqual(str(service.starting_price), '99.00')
+        self.assertEqual(list(service.features.values_list('title', flat=True)), ['Leak testing'])
+
+    def test_import_batches(self):
+        with open(self.path('posts.jsonl'), 'w') as stream:
+            for i in range(25):
+                stream.write(json.dumps({
+                    'title': f'Post {i}', 'content': 'Body', 'featured_image': 'blog/post.jpg',
+                    'status': 'published', 'category': 'roofing',
+                }) + '\n')
+        call_command('import_content', 'posts', self.path('posts.jsonl'), '--batch-size', '10',
+                     '--author', 'staff@example.com', stdout=StringIO())
+        posts = Post.objects.filter(title__startswith='Post ')
+        self.assertEqual(posts.count(), 25)
+        post = posts.get(slug='post-3')
+        self.assertEqual((post.author, post.category.slug, post.excerpt), (self.user, 'roofing', 'Body'))
+        if fts_available():
+            self.assertIn(post.pk, search_post_ids('Post 3'))
+
+    def test_errors_name_the_line(self):
+        with open(self.path('projects.jsonl'), 'w') as stream:
+            stream.write(json.dumps({'title': 'Good', 'completion_date': '2024-01-01'}) + '\n')
+            stream.write(json.dumps({'title': 'Bad', 'completion_date': 'soon'}) + '\n')
+        with self.assertRaisesMessage(CommandError, 'line 2'):
+            call_command('import_content', 'projects', self.path('projects.jsonl'), stdout=StringIO())
+
+    def test_failed_batch_still_refreshes_earlier_batches(self):
+        self.client.get(reverse('projects:project_list'))
+        with open(self.path('projects.jsonl'), 'w') as stream:
+            stream.write(json.dumps({
+                'title': 'Good', 'completion_date': '2024-01-01', 'featured_image': 'projects/good.jpg',
+                'categories': ['commercial'],
+            }) + '\n')
+            stream.write(json.dumps({'title': 'Bad', 'completion_date': 'soon'}) + '\n')
+        with self.assertRaisesMessage(CommandError, 'line 2'):
+            call_command('import_content', 'projects', self.path('projects.jsonl'), '--batch-size', '1',
+                         stdout=StringIO())
+        self.assertEqual(ProjectCategory.objects.get(slug='commercial').project_count, 1)
+        self.assertContains(self.client.get(reverse('projects:project_list')), 'Good')
+
+    def test_unknown_author(self):
+        with open(self.path('posts.jsonl'), 'w') as stream:
+            stream.write(json.dumps({'title': 'Orphan', 'content': 'Body', 'author': 'nobody@example.com'}) + '\n')
+        with self.assertRaisesMessage(CommandError, 'nobody@example.com'):
+            call_command('import_content', 'posts', self.path('posts.jsonl'), stdout=StringIO())
+        self.assertFalse(Post.objects.filter(title='Orphan').exists())
+
+
+class CsvExportTests(TestCase):
+    """Tests for the streaming CSV exports"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='staff', email='staff@example.com', password='x', is_active=True)
+        self.client.force_login(self.user)
+        self.old = ServiceRequest.objects.create(name='Old', email='old@example.com', phone='1', message='Hi')
+        ServiceRequest.objects.filter(pk=self.old.pk).update(created_at=timezone.now() - timedelta(days=30))
+        ServiceRequest.objects.create(name='=HYPERLINK("x")', email='new@example.com', phone='2', message='Hi')
+        ServiceRequest.objects.create(name='Done', email='done@example.com', phone='3', message='Hi',
+                                      is_processed=True)
+
+    def export(self, url_name, **params):
+        response = self.client.get(reverse(url_name), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+
+    def test_status_and_date_filters(self):
+        rows = self.export('core:service_request_export', status='new')
+        self.assertEqual(rows[0][:2], ['Date', 'Name'])
+        self.assertEqual([row[1] for row in rows[1:]], ['\'=HYPERLINK("x")', 'Old'])
+
+        since = (timezone.localdate() - timedelta(days=1)).isoformat()
+        rows = self.export('core:service_request_export', **{'from': since})
+        self.assertEqual([row[1] for row in rows[1:]], ['Done', '\'=HYPERLINK("x")'])
+
+        until = (timezone.localdate() - timedelta(days=30)).isoformat()
+        rows = self.export('core:service_request_export', to=until)
+        self.assertEqual([row[1] for row in rows[1:]], ['Old'])
+
+    def test_rows_are_read_lazily(self):
+        # Session and user only; no rows are fetched before the response is returned
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('core:service_request_export'))
+        self.assertIn('attachment; filename="service-requests-', response['Content-Disposition'])
+        # The query runs once the body is consumed
+        with self.assertNumQueries(1):
+            b''.join(response.streaming_content)
+
+    def test_subscribers(self):
+        Subscriber.objects.create(email='a@example.com')
+        Subscriber.objects.create(email='b@example.com', is_active=False)
+        rows = self.export('core:subscriber_export', status='active')
+        self.assertEqual([row[0] for row in rows[1:]], ['a@example.com'])
+
+    def test_invalid_filters(self):
+        url = reverse('core:service_request_export')
+        self.assertEqual(self.client.get(url, {'from': '2024-02-30'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'status': 'archived'}).status_code, 400)
+
+    def test_login_required(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('core:subscriber_export')).status_code, 302)
+
+
+class ServiceFeatureEditorTests(TestCase):
+    """Tests for saving the feature editor on the service form"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='staff', email='staff@example.com', password='x', is_active=True)
+        self.client.force_login(self.user)
+        self.service = Service.objects.create(title='Roofing', image='services/roof.jpg')
+        ServiceFeature.objects.bulk_create(
+            ServiceFeature(service=self.service, title=f'Feature {i}') for i in range(50)
+        )
+        self.features = list(self.service.features.order_by('id'))
+
+    def tearDown(self):
+        cache.clear()
+
+    def post_data(self, rows):
+        data = {
+            'title': 'Roofing', 'category': 'construction', 'display_order': 0,
+            'price_display_type': 'starting_from',
+            'feature_ids': [], 'feature_titles': [], 'feature_icons': [], 'feature_descriptions': [],
+        }
+        for feature_id, title in rows:
+            data['feature_ids'].append(feature_id)
+            data['feature_titles'].append(title)
+            data['feature_icons'].append('fas fa-check')
+            data['feature_descriptions'].append('')
+        return data
+
+    def test_update_with_fifty_features_is_batched(self):
+        rows = [(feature.pk, f'Renamed {i}' if i < 10 else feature.title) for i, feature in enumerate(self.features)]
+        rows = rows[:45] + [('', 'Brand new'), ('', 'Another')]
+        other = ServiceFeature.objects.create(service=Service.objects.create(title='Other', image='o.jpg'), title='Keep')
+        rows.append((other.pk, 'Hijacked'))
+        url = reverse('core:service_update', kwargs={'pk': self.service.pk})
+        # Session, user, service, savepoint pair, service UPDATE, feature fetch, bulk UPDATE,
+        # bulk INSERT, and the delete (collect + DELETE)
+        with self.assertNumQueries(11):
+            response = self.client.post(url, self.post_data(rows))
+        self.assertRedirects(response, reverse('core:dashboard'), fetch_redirect_response=False)
+
+        titles = list(self.service.features.order_by('id').values_list('title', flat=True))
+        self.assertEqual(len(titles), 48)
+        self.assertEqual(titles[0], 'Renamed 0')
+        self.assertEqual(titles[-3:], ['Brand new', 'Another', 'Hijacked'])
+        other.refresh_from_db()
+        self.assertEqual(other.title, 'Keep')
+
+    def test_replacing_every_existing_feature(self):
+        url = reverse('core:service_update', kwargs={'pk': self.service.pk})
+        self.client.post(url, self.post_data([('', 'Only new')]))
+        self.assertEqual(list(self.service.features.values_list('title', flat=True)), ['Only new'])
+
+        self.client.post(url, self.post_data([]))
+        self.assertFalse(self.service.features.exists())
+
+    def test_feature_changes_purge_cached_service_pages(self):
+        url = reverse('core:service_detail', kwargs={'slug': self.service.slug})
+        self.client.logout()
+        self.client.get(url)
+        self.client.get(url)
+        self.client.force_login(self.user)
+        rows = [(feature.pk, feature.title) for feature in self.features] + [('', 'Gutter guards')]
+        self.client.post(reverse('core:service_update', kwargs={'pk': self.service.pk}), self.post_data(rows))
+        self.client.logout()
+        self.assertContains(self.client.get(url), 'Gutter guards')
+
+    def test_create_saves_service_and_features_once(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        data = self.post_data([('', f'Feature {i}') for i in range(50)])
+        data['title'] = 'Plumbing'
+        data['image'] = SimpleUploadedFile('pipe.jpg', make_jpeg(100, 100), content_type='image/jpeg')
+        with self.settings(MEDIA_ROOT=media_root):
+            response = self.client.post(reverse('core:service_create'), data)
+        self.assertRedirects(response, reverse('core:dashboard'), fetch_redirect_response=False)
+        service = Service.objects.get(title='Plumbing')
+        self.assertEqual(service.created_by, self.user)
+        self.assertEqual(service.features.count(), 50)
+
+
+class RequestMetricsTests(TestCase):
+    """Tests for the per-view request metrics middleware and its endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        Service.objects.create(title='Pipe fitting', image='services/plumbing.jpg')
+        self.staff = User.objects.create_user(username='ops', email='ops@example.com', password='x',
+                                              is_active=True, is_staff=True)
+
+    def tearDown(self):
+        cache.clear()
+        metrics.reset()
+
+    def test_records_per_view_metrics(self):
+        self.client.get(reverse('core:service_list'))
+        self.client.get(reverse('core:service_list'))
+        self.client.get('/no-such-page/')
+        stats = dict(metrics.snapshot())
+        service_list = stats['core:service_list']
+        self.assertEqual(service_list['requests'], 2)
+        self.assertGreater(service_list['max_queries'], 0)
+        self.assertGreater(service_list['avg_template_ms'], 0)
+        self.assertGreater(service_list['avg_bytes'], 0)
+        self.assertIn(metrics.UNRESOLVED, stats)
+
+    def test_unnamed_routes_are_labelled_by_view_path(self):
+        self.assertEqual(metrics.view_label(ResolverMatch(serve, (), {})), 'django.views.static.serve')
+        self.assertEqual(
+            metrics.view_label(ResolverMatch(RedirectView.as_view(), (), {})),
+            'django.views.generic.base.RedirectView',
+        )
+
+    @override_settings(REQUEST_METRICS_QUERY_BUDGET=0)
+    def test_requests_over_budget_are_logged(self):
+        with self.assertLogs('core.metrics', 'WARNING') as logs:
+            self.client.get(reverse('core:service_list'))
+        self.assertIn('core:service_list', logs.output[0])
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_prometheus_endpoint(self):
+        self.client.get(reverse('core:service_list'))
+        url = reverse('core:prometheus_metrics')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('django_view_duration_seconds_count{view="core:service_list"} 1', body)
+        self.assertIn('django_view_duration_seconds_bucket{view="core:service_list",le="+Inf"} 1', body)
+
+    def test_dashboard_is_staff_only(self):
+        self.client.get(reverse('core:service_list'))
+        user = User.objects.create_user(username='editor', email='editor@example.com', password='x', is_active=True)
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(reverse('core:metrics_dashboard')).status_code, 403)
+        self.client.force_login(self.staff)
+        self.assertContains(self.client.get(reverse('core:metrics_dashboard')), 'core:service_list')
+
+
+class RouteRegressionTests(TestCase):
+    """Checks every named route against the stored query-count baseline"""
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_routes_within_baseline(self):
+        # Query counts do not depend on the dataset size, so the smallest dataset will do
+        results = benchmarks.measure_routes(benchmarks.seed_dataset(scale=0), repeat=1)
+        baseline = benchmarks.load_baseline()
+        self.assertEqual(benchmarks.find_regressions(results, baseline), [])
+        self.assertEqual(
+            set(results), set(baseline['routes']) | set(benchmarks.KNOWN_FAILURES),
+            "Update the baseline after adding or removing routes",
+        )
+        self.assertFalse(any(route['status'] >= 500 for route in baseline['routes'].values()))
+
+    def test_find_regressions(self):
+        baseline = {'routes': {
+            'core:home': {'status': 200, 'queries': 8, 'bytes': 1000, 'p50_ms': 10, 'p95_ms': 12},
+        }}
+        result = {'status': 200, 'queries': 8, 'bytes': 1000, 'p50_ms': 30, 'p95_ms': 40}
+        self.assertEqual(benchmarks.find_regressions({'core:home': result}, baseline), [])
+        self.assertEqual(len(benchmarks.find_regressions({'core:home': result}, baseline, latency_tolerance=0.5)), 1)
+        problems = benchmarks.find_regressions(
+            {'core:home': {**result, 'queries': 9, 'status': 500}, 'core:new': result}, baseline,
+        )
+        self.assertEqual(problems, [
+            'core:home: status 500',
+            'core:new: no baseline (run benchmark_routes --update-baseline)',
+        ])
+        self.assertEqual(benchmarks.find_regressions({'core:home': {**result, 'queries': 9}}, baseline), [
+            'core:home: 8 -> 9 queries',
+        ])
+        self.assertEqual(benchmarks.find_regressions({'core:home': {**result, 'queries': 9}}, baseline, 1), [])
+
+    def test_known_failures_stay_out_of_the_baseline(self):
+        name = 'blog:post_delete'
+        self.assertIn(name, benchmarks.KNOWN_FAILURES)
+        baseline = {'routes': {}}
+        failing = {'status': 500, 'queries': 3, 'bytes': 100, 'p50_ms': 1, 'p95_ms': 1}
+        self.assertEqual(benchmarks.find_regressions({name: failing}, baseline), [])
+        self.assertEqual(benchmarks.known_failures({name: failing}),
+                         [(name, 500, benchmarks.KNOWN_FAILURES[name])])
+        # A fixed route has to leave the list
+        self.assertEqual(len(benchmarks.find_regressions({name: {**failing, 'status': 200}}, baseline)), 1)
+
+        path = os.path.join(tempfile.mkdtemp(), 'baseline.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        benchmarks.save_baseline({name: failing, 'core:home': {**failing, 'status': 200}}, 1.0, path)
+        self.assertEqual(set(benchmarks.load_baseline(path)['routes']), {'core:home'})
+        with self.assertRaises(ValueError):
+            benchmarks.save_baseline({'core:home': failing}, 1.0, path)
+
+
+class LoadTestHarnessTests(LiveServerTestCase):
+    """Tests for the asyncio load generator against a live server"""
+
+    def setUp(self):
+        cache.clear()
+        Service.objects.create(title='Roofing', slug='roofing', image='services/roofing.jpg')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_service_profile_submits_requests(self):
+        results = asyncio.run(loadtest.run_load(self.live_server_url, 'service', users=2, duration=1))
+        self.assertGreater(results['service request']['requests'], 0)
+        self.assertEqual(results['*']['errors'], 0)
+        self.assertEqual(
+            ServiceRequest.objects.filter(name__startswith='Load test').count(),
+            results['service request']['requests'],
+        )
+        self.assertLessEqual(results['*']['p50_ms'], results['*']['p99_ms'])
+
+    def test_staff_profile_needs_credentials(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(loadtest.run_load(self.live_server_url, 'staff', duration=1))
+
+
+class RelatedContentTests(TestCase):
+    """Tests for the precomputed related posts and projects"""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='writer', email='writer@example.com', password='x')
+        self.roofs = Category.objects.create(name='Roofs')
+        self.walls = Category.objects.create(name='Walls')
+
+    def tearDown(self):
+        cache.clear()
+
+    def create_post(self, title, content, category, tags=''):
+        post = Post.objects.create(
+            author=self.author, title=title, content=content, category=category,
+            featured_image='blog/post.jpg', status='published',
+        )
+        post.set_tags(tags.split(','))
+        return post
+
+    def test_nearest_neighbours_combines_text_categories_and_tags(self):
+        documents = [
+            (1, 'Clay roof tiles keep houses cool', {1}, {'roofing'}),
+            (2, 'Choosing clay roof tiles for hot climates', {1}, {'roofing'}),
+            (3, 'Fixing leaking iron sheets', {1}, set()),
+            (4, 'Brick walls and mortar mixes', {2}, set()),
+        ]
+        neighbours = related.nearest_neighbours(documents, limit=2)
+        self.assertEqual([pk for pk, _score in neighbours[1]], [2, 3])
+        self.assertEqual(neighbours[4], [])
+        self.assertGreater(neighbours[1][0][1], neighbours[1][1][1])
+
+    def test_detail_pages_use_the_stored_neighbours(self):
+        tiles = self.create_post('Clay roof tiles', 'Clay tiles keep houses cool.', self.roofs, 'roofing, clay')
+        more_tiles = self.create_post('More on clay tiles', 'Glazed clay tiles last decades.', self.roofs, 'clay')
+        iron = self.create_post('Iron sheets', 'Iron sheets rust near the coast.', self.roofs)
+        self.create_post('Brick walls', 'Mortar mixes for brick walls.', self.walls)
+        # Before the first build the latest posts in the same category are used
+        self.assertEqual(tiles.get_related_posts(1), [iron])
+
+        call_command('build_related_content', 'posts', stdout=StringIO())
+        self.assertEqual(tiles.get_related_posts(1), [more_tiles])
+        with self.assertNumQueries(1):
+            tiles.get_related_posts()
+
+        more_tiles.status = 'draft'
+        more_tiles.save()
+        self.assertNotIn(more_tiles, tiles.get_related_posts())
+
+    def test_projects_are_related_through_categories_and_text(self):
+        residential = ProjectCategory.objects.create(name='Residential')
+        projects = [
+            Project.objects.create(title=title, description=description, client='Client', location='Lusaka',
+                                   completion_date=timezone.localdate(), featured_image='projects/p.jpg')
+            for title, description in (
+                ('Lake house', 'A timber lake house with a deck'),
+                ('Hill house', 'A timber house on the hill with a deck'),
+                ('Office tower', 'Twelve storeys of offices'),
+            )
+        ]
+        projects[0].categories.add(residential)
+        projects[1].categories.add(residential)
+        call_command('build_related_content', 'projects', stdout=StringIO())
+        self.assertEqual(projects[0].get_related_projects(1), [projects[1]])
+        response = self.client.get(projects[0].get_absolute_url())
+        self.assertEqual(response.context['related_projects'][0], projects[1])
+
+
+class RichTextRenderingTests(TestCase):
+    """Tests for the save-time rendering of post content and service descriptions"""
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='writer', email='writer@example.com', password='x')
+
+    def test_render_sanitizes_and_annotates(self):
+        rendered = render_rich_text(
+            '<h2 style="color: red">Costs &amp; budgets</h2><p onclick="steal()">Plan <b>early</b>.</p>'
+            '<script>steal()</script><a href="javascript:steal()">link</a><img src="/media/plan.jpg" alt="Plan">'
+            '<h3>Costs &amp; budgets</h3><iframe src="https://example.com/ad"></iframe>'
+        )
+        self.assertEqual(rendered.html, (
+            '<h2 id="costs-budgets">Costs &amp; budgets</h2><p>Plan <b>early</b>.</p><a>link</a>'
+            '<img src="/media/plan.jpg" alt="Plan" loading="lazy" decoding="async">'
+            '<h3 id="costs-budgets-2">Costs &amp; budgets</h3><iframe loading="lazy"></iframe>'
+        ))
+        self.assertEqual(rendered.text, 'Costs & budgets Plan early. link Costs & budgets')
+        self.assertEqual(rendered.toc, [
+            {'id': 'costs-budgets', 'title': 'Costs & budgets', 'level': 2},
+            {'id': 'costs-budgets-2', 'title': 'Costs & budgets', 'level': 3},
+        ])
+        self.assertEqual(rendered.read_time, 1)
+        self.assertEqual(render_rich_text('<p>word </p>' * 401).read_time, 3)
+
+    def test_post_save_fills_the_rendered_fields(self):
+        post = Post.objects.create(
+            author=self.author, title='Roofs', featured_image='blog/post.jpg',
+            content='<h2>Tiles</h2><p>' + 'Clay tiles last. ' * 40 + '</p><script>x()</script>',
+        )
+        self.assertEqual(post.toc, [{'id': 'tiles', 'title': 'Tiles', 'level': 2}])
+        self.assertNotIn('<script>', post.content_html)
+        self.assertTrue(post.excerpt.startswith('Tiles Clay tiles last.'))
+        self.assertLessEqual(len(post.excerpt), 300)
+
+        # Saves that leave content alone skip the rendering
+        post.content = '<p>Changed</p>'
+        post.save(update_fields=['title'])
+        post.refresh_from_db()
+        self.assertIn('Tiles', post.content_html)
+        post.content = '<p>Changed</p>'
+        post.save(update_fields=['content'])
+        post.refresh_from_db()
+        self.assertEqual((post.content_html, post.toc), ('<p>Changed</p>', []))
+
+    def test_service_description_is_rendered_on_save(self):
+        service = Service.objects.create(
+            title='Plumbing', image='services/plumbing.jpg', full_description='Leaks <fixed>\n\nFast',
+        )
+        service.refresh_from_db()
+        self.assertEqual(service.full_description_html, '<p>Leaks &lt;fixed&gt;</p>\n\n<p>Fast</p>')
+
+    def test_service_lists_are_parsed_on_save(self):
+        service = Service.objects.create(
+            title='Plumbing', image='services/plumbing.jpg', includes_services='Survey\r\n\r\n  Fittings ',
+            optional_addons='Water heater - K2,500\nPressure pump (ZMW 1200.50)\nAnnual check-up',
+            pricing_breakdown='Labour: $40 per hour',
+        )
+        service.refresh_from_db()
+        self.assertEqual(service.includes_items, ['Survey', 'Fittings'])
+        self.assertEqual(service.optional_addon_items, [
+            {'text': 'Water heater - K2,500', 'price': 2500},
+            {'text': 'Pressure pump (ZMW 1200.50)', 'price': 1200.5},
+            {'text': 'Annual check-up', 'price': None},
+        ])
+        self.assertEqual(service.get_pricing_breakdown_list(), ['Labour: $40 per hour'])
+        self.assertEqual(service.pricing_breakdown_items[0]['price'], 40)
+        # Prices are JSON numbers, so the database can compare them
+        self.assertQuerySetEqual(Service.objects.filter(optional_addon_items__0__price__lt=3000), [service])
+        self.assertFalse(Service.objects.filter(optional_addon_items__0__price__lt=2000).exists())
+
+        service.optional_addons = 'Descaling K300'
+        service.save(update_fields=['optional_addons'])
+        service.refresh_from_db()
+        self.assertEqual(service.get_optional_addons_list(), ['Descaling K300'])
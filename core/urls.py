@@ -7,6 +7,7 @@ from .views import (
     ContactMessageListView,
     ContactMessageUpdateView,
     DashboardView,
+    MetricsDashboardView,
     HomePageView,
     AboutView,
     ServiceCreateView,
@@ -22,6 +23,7 @@ from .views import (
     SliderListView,
     SliderUpdateView,
     SubscriberDeleteView,
+    SubscriberExportView,
     SubscriberListView,
     SubscriberUpdateView,
     TeamMemberCreateView,
@@ -41,12 +43,14 @@ from .views import (
     # New dashboard views
     ServiceListDashboardView,
     ServiceRequestListView,
+    ServiceRequestExportView,
     ServiceRequestDetailView,
     ServiceRequestUpdateView,
     ServiceRequestDeleteView,
     ServiceRequestMarkProcessedView,
     ServiceRequestMarkNewView,
     toggle_subscriber_status,
+    prometheus_metrics,
 )
 
 app_name = 'core'
@@ -67,6 +71,8 @@ urlpatterns = [
 
     # Dashboard URLs
     path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('dashboard/metrics/', MetricsDashboardView.as_view(), name='metrics_dashboard'),
+    path('metrics/', prometheus_metrics, name='prometheus_metrics'),
     path('dashboard/services/', ServiceListDashboardView.as_view(), name='service_list_dashboard'),
     path('dashboard/services/create/', ServiceCreateView.as_view(), name='service_create'),
     path('dashboard/services/<int:pk>/edit/', ServiceUpdateView.as_view(), name='service_update'),
@@ -80,6 +86,7 @@ urlpatterns = [
     
     # Service Request Management URLs
     path('dashboard/service-requests/', ServiceRequestListView.as_view(), name='service_request_list'),
+    path('dashboard/service-requests/export/', ServiceRequestExportView.as_view(), name='service_request_export'),
     path('dashboard/service-requests/<int:pk>/', ServiceRequestDetailView.as_view(), name='service_request_detail'),
     path('dashboard/service-requests/<int:pk>/update/', ServiceRequestUpdateView.as_view(), name='service_request_update'),
     path('dashboard/service-requests/<int:pk>/delete/', ServiceRequestDeleteView.as_view(), name='service_request_delete'),
@@ -115,6 +122,7 @@ urlpatterns = [
     
     # Subscriber Management URLs
     path('dashboard/subscribers/', SubscriberListView.as_view(), name='subscriber_list'),
+    path('dashboard/subscribers/export/', SubscriberExportView.as_view(), name='subscriber_export'),
     path('dashboard/subscribers/update/<int:pk>/', SubscriberUpdateView.as_view(), name='subscriber_update'),
     path('dashboard/subscribers/delete/<int:pk>/', SubscriberDeleteView.as_view(), name='subscriber_delete'),
     path('dashboard/subscribers/toggle-status/<int:pk>/', toggle_subscriber_status, name='toggle_subscriber_status'),
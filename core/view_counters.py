@@ -0,0 +1,65 @@
+# core/view_counters.py
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+# (model class, pk) -> hits not yet written to the database
+_pending = Counter()
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def record_view(obj):
+    """Buffer a page view for obj; the buffer is written out in batches"""
+    with _lock:
+        _pending[(type(obj), obj.pk)] += 1
+        interval = getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', 60)
+        threshold = getattr(settings, 'VIEW_COUNT_FLUSH_THRESHOLD', 100)
+        due = (time.monotonic() - _last_flush >= interval
+               or sum(_pending.values()) >= threshold)
+    if due:
+        flush_views()
+
+
+def pending_views(obj):
+    """Return the number of buffered views for obj that are not yet saved"""
+    with _lock:
+        return _pending.get((type(obj), obj.pk), 0)
+
+
+def flush_views():
+    """Write buffered views with one atomic F('views') + n update per model and hit count"""
+    global _last_flush
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not batch:
+        return 0
+
+    # Objects that received the same number of hits share a single UPDATE
+    groups = defaultdict(list)
+    for (model, pk), hits in batch.items():
+        groups[(model, hits)].append(pk)
+
+    try:
+        with transaction.atomic():
+            for (model, hits), pks in groups.items():
+                model.objects.filter(pk__in=pks).update(views=F('views') + hits)
+    except Exception as e:
+        logger.error(f"Failed to flush view counts: {str(e)}")
+        with _lock:
+            _pending.update(batch)
+        return 0
+    return sum(batch.values())
+
+
+atexit.register(flush_views)
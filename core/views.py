@@ -2,11 +2,19 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.views.generic import TemplateView, DetailView, CreateView, ListView
 from django.urls import reverse_lazy
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.db import transaction
+from django.db.models import Q
 from .models import ContactMessage, ServiceFeature, ServiceRequest, TeamMember, Service, SliderImage, Testimonial, Subscriber,About
-from blog.models import Post
-from projects.models import Project
 
+from .caching import (
+    AnonymousCachePageMixin, get_home_sections, home_sections_for_model, invalidate_home_sections,
+    page_cache_groups_for_model, purge_page_cache,
+)
+from . import metrics
+from .exports import CsvExportView
+from .pagination import CursorPaginationMixin
+from .stats import get_stats
 from .forms import AboutForm, ContactForm, ContactMessageForm, ServiceCreateForm, ServiceFeatureForm, ServiceRequestForm, ServiceUpdateForm, SliderImageForm, SubscriberForm, TeamMemberForm, TestimonialForm
 
 
@@ -18,11 +26,10 @@ import logging
 logger = logging.getLogger(__name__)
 
 # Email imports
-from django.core.mail import send_mail
 from django.conf import settings
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from .emails import queue_email
 
 
 
@@ -32,15 +39,9 @@ class HomePageView(TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Add required data for each section
-        context['slider_images'] = SliderImage.objects.filter(is_active=True)
-        context['about'] = About.objects.first()
-        context['services'] = Service.objects.all()[:6]  # Limit to 6 services
-        context['featured_projects'] = Project.objects.filter(is_featured=True)[:8]  # Limit to 8 projects
-        context['recent_posts'] = Post.objects.filter(status='published')[:5]
-        context['testimonials'] = Testimonial.objects.filter(is_featured=True)[:3]  # Limit to 3 testimonials
-        context['leadership_team'] = TeamMember.objects.filter(is_leadership=True)[:4]  # Limit to 4 team members
-        
+        # Add required data for each section (cached per section, see core/caching.py)
+        context.update(get_home_sections())
+
         # Add forms
         context['contact_form'] = ContactForm()
         context['subscriber_form'] = SubscriberForm()
@@ -48,8 +49,9 @@ class HomePageView(TemplateView):
         return context
 
 
-class AboutView(TemplateView):
+class AboutView(AnonymousCachePageMixin, TemplateView):
     """View for the about page"""
+    page_cache_group = 'about'
     template_name = 'about.html'
     
     def get_context_data(self, **kwargs):
@@ -59,8 +61,9 @@ class AboutView(TemplateView):
         return context
 
 
-class ServiceListView(ListView):
+class ServiceListView(AnonymousCachePageMixin, ListView):
     model = Service
+    page_cache_group = 'services'
     template_name = 'services/service_list.html'
     context_object_name = 'services'
     paginate_by = 6
@@ -102,37 +105,20 @@ def submit_service_request(request):
     if form.is_valid():
         service_request = form.save()
         
-        # Send email notification to admin
-        subject = f"New Service Request: {service_request.service.title if service_request.service else 'General Inquiry'}"
-        html_message = render_to_string('emails/service_request_admin.html', {
-            'service_request': service_request,
-        })
-        plain_message = strip_tags(html_message)
-        
-        send_mail(
-            subject,
-            plain_message,
-            settings.DEFAULT_FROM_EMAIL,
+        # Queue email notification to admin (sent by the send_queued_emails command)
+        queue_email(
+            f"New Service Request: {service_request.service.title if service_request.service else 'General Inquiry'}",
+            'emails/service_request_admin.html',
+            {'service_request': service_request},
             [settings.ADMIN_EMAIL],
-            html_message=html_message,
-            fail_silently=False,
         )
         
-        # Send confirmation email to user
-        user_subject = "Thank you for your service request"
-        user_html_message = render_to_string('emails/service_request_user.html', {
-            'service_request': service_request,
-            'site_name': settings.SITE_NAME,
-        })
-        user_plain_message = strip_tags(user_html_message)
-        
-        send_mail(
-            user_subject,
-            user_plain_message,
-            settings.DEFAULT_FROM_EMAIL,
+        # Queue confirmation email to user
+        queue_email(
+            "Thank you for your service request",
+            'emails/service_request_user.html',
+            {'service_request': service_request, 'site_name': settings.SITE_NAME},
             [service_request.email],
-            html_message=user_html_message,
-            fail_silently=False,
         )
         
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -185,8 +171,9 @@ def subscribe_newsletter(request):
     return redirect(request.META.get('HTTP_REFERER', 'home'))
 
 
-class TeamListView(ListView):
+class TeamListView(AnonymousCachePageMixin, ListView):
     """View for displaying all team members"""
+    page_cache_group = 'team'
     model = TeamMember
     template_name = 'team.html'
     context_object_name = 'team_members'
@@ -200,7 +187,7 @@ class TeamListView(ListView):
 
 
 
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import (
     ListView, CreateView, UpdateView, DeleteView, DetailView
 )
@@ -218,65 +205,110 @@ class DashboardView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['service_requests'] = ServiceRequest.objects.all().order_by('-created_at')[:5]
-        context['total_services'] = Service.objects.count()
-        context['active_services'] = Service.objects.filter(is_active=True).count()
-        context['total_requests'] = ServiceRequest.objects.count()
-        context['new_requests'] = ServiceRequest.objects.filter(is_processed=False).count()
+        context.update(get_stats(Service, total_services=None, active_services=Q(is_active=True)))
+        context.update(get_stats(ServiceRequest, total_requests=None, new_requests=Q(is_processed=False)))
         return context
 
-class ServiceCreateView(LoginRequiredMixin, CreateView):
+class MetricsDashboardView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
+    """Per-view timing and query metrics collected by RequestMetricsMiddleware (staff only)"""
+    template_name = 'dashboard/metrics.html'
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['view_metrics'] = metrics.snapshot()
+        context['samples'] = getattr(settings, 'REQUEST_METRICS_SAMPLES', 500)
+        context['query_budget'] = getattr(settings, 'REQUEST_METRICS_QUERY_BUDGET', None)
+        context['time_budget'] = getattr(settings, 'REQUEST_METRICS_TIME_BUDGET_MS', None)
+        return context
+
+def prometheus_metrics(request):
+    """Prometheus scrape endpoint; staff sessions or 'Authorization: Bearer <METRICS_TOKEN>'"""
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    authorized = request.user.is_staff or (
+        token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    )
+    if not authorized:
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.prometheus_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+class ServiceFeatureEditorMixin:
+    """Saves the rows posted by the feature editor on the service form in bulk"""
+
+    def save_features(self, service, created=False):
+        """Apply the posted feature rows to service: one fetch, then at most one update, insert and delete"""
+        post = self.request.POST
+        titles = post.getlist('feature_titles')
+        icons = post.getlist('feature_icons')
+        descriptions = post.getlist('feature_descriptions')
+        feature_ids = post.getlist('feature_ids')
+
+        # Only this service's features can be edited, whatever ids are posted; rows
+        # missing from the post are deleted, so an existing service is always loaded
+        existing = {}
+        if not created:
+            existing = {feature.pk: feature for feature in service.features.all()}
+
+        to_update, to_create, kept = [], [], set()
+        for i, title in enumerate(titles):
+            if not title:  # Only save if there's a title
+                continue
+            values = {
+                'title': title,
+                'icon': icons[i] if i < len(icons) else '',
+                'description': descriptions[i] if i < len(descriptions) else '',
+            }
+            feature_id = feature_ids[i] if i < len(feature_ids) else ''
+            feature = existing.get(int(feature_id)) if feature_id.isdigit() else None
+            if feature is None:
+                to_create.append(ServiceFeature(service=service, **values))
+                continue
+            kept.add(feature.pk)
+            if any(getattr(feature, name) != value for name, value in values.items()):
+                for name, value in values.items():
+                    setattr(feature, name, value)
+                to_update.append(feature)
+
+        removed = set(existing) - kept
+        if to_update:
+            ServiceFeature.objects.bulk_update(to_update, ['title', 'icon', 'description'])
+        if to_create:
+            ServiceFeature.objects.bulk_create(to_create)
+        if removed:
+            ServiceFeature.objects.filter(pk__in=removed).delete()
+        return bool(to_update or to_create or removed)
+
+    def form_valid(self, form):
+        # UpdateView loads the object before the form is validated; CreateView leaves it unset
+        created = self.object is None
+        with transaction.atomic():
+            response = super().form_valid(form)
+            features_changed = self.save_features(self.object, created=created)
+        if features_changed:
+            # Bulk writes send no signals, so drop the cached pages that list features here
+            purge_page_cache(*page_cache_groups_for_model(ServiceFeature))
+            invalidate_home_sections(*home_sections_for_model(ServiceFeature))
+        return response
+
+class ServiceCreateView(LoginRequiredMixin, ServiceFeatureEditorMixin, CreateView):
     model = Service
     form_class = ServiceCreateForm
     template_name = 'dashboard/service_form.html'
     success_url = reverse_lazy('core:dashboard')
     
-   
-    
     def form_valid(self, form):
-        # Save the service first
-        service = form.save(commit=False)
-        service.created_by = self.request.user
-        service.last_updated_by = self.request.user
-        service.save()
-        
-        # Process features
-        feature_titles = self.request.POST.getlist('feature_titles')
-        feature_icons = self.request.POST.getlist('feature_icons')
-        feature_descriptions = self.request.POST.getlist('feature_descriptions')
-        feature_ids = self.request.POST.getlist('feature_ids')
-        
-        # Update or create features
-        for i in range(len(feature_titles)):
-            if feature_titles[i]:  # Only save if there's a title
-                if i < len(feature_ids) and feature_ids[i]:
-                    # Update existing feature
-                    feature = ServiceFeature.objects.get(id=feature_ids[i])
-                    feature.title = feature_titles[i]
-                    feature.icon = feature_icons[i]
-                    feature.description = feature_descriptions[i]
-                    feature.save()
-                else:
-                    # Create new feature
-                    ServiceFeature.objects.create(
-                        service=service,
-                        title=feature_titles[i],
-                        icon=feature_icons[i],
-                        description=feature_descriptions[i]
-                    )
-        
-        # Delete features that were removed
-        if self.object:
-            current_feature_ids = [int(id) for id in feature_ids if id]
-            self.object.features.exclude(id__in=current_feature_ids).delete()
-        
+        form.instance.created_by = self.request.user
+        form.instance.last_updated_by = self.request.user
         messages.success(self.request, 'Service saved successfully!')
         return super().form_valid(form)
 
-class ServiceUpdateView(LoginRequiredMixin, UpdateView):
+class ServiceUpdateView(LoginRequiredMixin, ServiceFeatureEditorMixin, UpdateView):
     model = Service
     form_class = ServiceUpdateForm
     template_name = 'dashboard/service_form.html'
-    success_url = reverse_lazy('dashboard')
+    success_url = reverse_lazy('core:dashboard')
     
     def form_valid(self, form):
         form.instance.last_updated_by = self.request.user
@@ -355,25 +387,17 @@ def book_service_directly(request, service_id):
             project_timeline=request.POST.get('project_timeline', '')
         )
         
-        # Send booking confirmation (with error handling)
+        # Queue booking notification (with error handling)
         try:
-            subject = f"Direct Booking: {service.title}"
-            html_message = render_to_string('emails/direct_booking_admin.html', {
-                'service_request': service_request,
-                'service': service,
-            })
-            plain_message = strip_tags(html_message)
-            
-            send_mail(
-                subject,
-                plain_message,
-                getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@maiyembe.com'),
+            queue_email(
+                f"Direct Booking: {service.title}",
+                'emails/direct_booking_admin.html',
+                {'service_request': service_request, 'service': service},
                 [getattr(settings, 'ADMIN_EMAIL', 'admin@maiyembe.com')],
-                html_message=html_message,
-                fail_silently=True,
+                from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@maiyembe.com'),
             )
         except Exception as e:
-            logger.error(f"Failed to send booking email: {str(e)}")
+            logger.error(f"Failed to queue booking email: {str(e)}")
         
         messages.success(request, f'Your booking for {service.title} has been received! We will confirm shortly.')
         return redirect('core:service_request_success')
@@ -400,12 +424,11 @@ class ServiceListDashboardView(LoginRequiredMixin, ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['active_services'] = Service.objects.filter(is_active=True).count()
-        context['featured_services'] = Service.objects.filter(is_featured=True).count()
-        context['service_requests_count'] = ServiceRequest.objects.count()
+        context.update(get_stats(Service, active_services=Q(is_active=True), featured_services=Q(is_featured=True)))
+        context.update(get_stats(ServiceRequest, service_requests_count=None))
         return context
 
-class ServiceRequestListView(LoginRequiredMixin, ListView):
+class ServiceRequestListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     """Dashboard view for service requests"""
     model = ServiceRequest
     template_name = 'dashboard/service_request_list.html'
@@ -425,14 +448,36 @@ class ServiceRequestListView(LoginRequiredMixin, ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['total_requests'] = ServiceRequest.objects.count()
-        context['new_requests'] = ServiceRequest.objects.filter(is_processed=False).count()
-        context['processed_requests'] = ServiceRequest.objects.filter(is_processed=True).count()
-        context['this_month_requests'] = ServiceRequest.objects.filter(
-            created_at__month=timezone.now().month
-        ).count()
+        context.update(get_stats(
+            ServiceRequest,
+            total_requests=None,
+            new_requests=Q(is_processed=False),
+            processed_requests=Q(is_processed=True),
+            this_month_requests=Q(created_at__month=timezone.now().month),
+        ))
         return context
 
+class ServiceRequestExportView(LoginRequiredMixin, CsvExportView):
+    """CSV download of service requests, honouring the list's status filter"""
+    model = ServiceRequest
+    filename = 'service-requests'
+    status_filters = {'new': {'is_processed': False}, 'processed': {'is_processed': True}}
+    columns = (
+        ('Date', 'created_at'),
+        ('Name', 'name'),
+        ('Email', 'email'),
+        ('Phone', 'phone'),
+        ('Service', 'service__title'),
+        ('Service type', 'service_type'),
+        ('Contact method', 'contact_method'),
+        ('Budget range', 'budget_range'),
+        ('Custom budget', 'custom_budget'),
+        ('Location', 'project_location'),
+        ('Timeline', 'project_timeline'),
+        ('Message', 'message'),
+        ('Processed', 'is_processed'),
+    )
+
 class ServiceRequestDetailView(LoginRequiredMixin, DetailView):
     """Detail view for service requests"""
     model = ServiceRequest
@@ -535,9 +580,12 @@ class TestimonialListView(LoginRequiredMixin, ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['total_testimonials'] = Testimonial.objects.count()
-        context['published_testimonials'] = Testimonial.objects.filter(status='published').count()
-        context['featured_testimonials'] = Testimonial.objects.filter(is_featured=True).count()
+        context.update(get_stats(
+            Testimonial,
+            total_testimonials=None,
+            published_testimonials=Q(status='published'),
+            featured_testimonials=Q(is_featured=True),
+        ))
         return context
 
 class TestimonialCreateView(LoginRequiredMixin, CreateView):
@@ -584,9 +632,12 @@ class TeamMemberListView(LoginRequiredMixin, ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['total_members'] = TeamMember.objects.count()
-        context['active_members'] = TeamMember.objects.filter(status='active').count()
-        context['leadership_members'] = TeamMember.objects.filter(is_leadership=True).count()
+        context.update(get_stats(
+            TeamMember,
+            total_members=None,
+            active_members=Q(status='active'),
+            leadership_members=Q(is_leadership=True),
+        ))
         return context
 
 class TeamMemberCreateView(LoginRequiredMixin, CreateView):
@@ -647,8 +698,7 @@ class SliderListView(LoginRequiredMixin, ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['total_sliders'] = SliderImage.objects.count()
-        context['active_sliders'] = SliderImage.objects.filter(is_active='True').count()
+        context.update(get_stats(SliderImage, total_sliders=None, active_sliders=Q(is_active=True)))
         return context
 
 class SliderCreateView(LoginRequiredMixin, CreateView):
@@ -683,7 +733,7 @@ class SliderDeleteView(LoginRequiredMixin, DeleteView):
         messages.success(request, 'Slider image deleted successfully!')
         return super().delete(request, *args, **kwargs)
 
-class ContactMessageListView(LoginRequiredMixin, ListView):
+class ContactMessageListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     """Dashboard view for contact messages"""
     model = ContactMessage
     template_name = 'dashboard/contact_message_list.html'
@@ -701,9 +751,12 @@ class ContactMessageListView(LoginRequiredMixin, ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['total_messages'] = ContactMessage.objects.count()
-        context['new_messages'] = ContactMessage.objects.filter(is_read='False').count()
-        context['read_messages'] = ContactMessage.objects.filter(is_read='True').count()
+        context.update(get_stats(
+            ContactMessage,
+            total_messages=None,
+            new_messages=Q(is_read=False),
+            read_messages=Q(is_read=True),
+        ))
         return context
 
 class ContactMessageDetailView(LoginRequiredMixin, DetailView):
@@ -740,12 +793,13 @@ class ContactMessageDeleteView(LoginRequiredMixin, DeleteView):
         messages.success(request, 'Message deleted successfully!')
         return super().delete(request, *args, **kwargs)
 
-class SubscriberListView(LoginRequiredMixin, ListView):
+class SubscriberListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     """Dashboard view for subscribers"""
     model = Subscriber
     template_name = 'dashboard/subscriber_list.html'
     context_object_name = 'subscribers'
     paginate_by = 20
+    cursor_ordering = ('-subscribed_at', '-id')
     
     def get_queryset(self):
         status = self.request.GET.get('status', 'all')
@@ -758,11 +812,27 @@ class SubscriberListView(LoginRequiredMixin, ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['total_subscribers'] = Subscriber.objects.count()
-        context['active_subscribers'] = Subscriber.objects.filter(is_active='True').count()
-        context['inactive_subscribers'] = Subscriber.objects.filter(is_active='False').count()
+        context.update(get_stats(
+            Subscriber,
+            total_subscribers=None,
+            active_subscribers=Q(is_active=True),
+            inactive_subscribers=Q(is_active=False),
+        ))
         return context
 
+class SubscriberExportView(LoginRequiredMixin, CsvExportView):
+    """CSV download of newsletter subscribers"""
+    model = Subscriber
+    filename = 'subscribers'
+    ordering = ('-subscribed_at', '-id')
+    date_field = 'subscribed_at'
+    status_filters = {'active': {'is_active': True}, 'inactive': {'is_active': False}}
+    columns = (
+        ('Email', 'email'),
+        ('Subscribed', 'subscribed_at'),
+        ('Active', 'is_active'),
+    )
+
 class SubscriberUpdateView(LoginRequiredMixin, UpdateView):
     """Update subscriber"""
     model = Subscriber
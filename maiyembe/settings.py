@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.sitemaps',
     # Third-party apps
     'django_summernote',  # Rich text editor for admin
     'crispy_forms',       # Form styling
@@ -53,6 +54,7 @@ INSTALLED_APPS = [
     'core',
     'blog',
     'projects',
+    'api',
     #'index',
 ]
 
@@ -68,6 +70,7 @@ CRISPY_TEMPLATE_PACK = 'bootstrap4'  # For better form styling
 
 
 MIDDLEWARE = [
+    'core.metrics.RequestMetricsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -126,6 +129,41 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# DJANGO_CACHE_BACKEND selects the tier: 'locmem' (development and tests),
+# 'file' (single server) or 'redis' (any Redis-compatible server at REDIS_URL).
+
+CACHE_BACKEND = os.environ.get('DJANGO_CACHE_BACKEND', 'locmem')
+
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+            'KEY_PREFIX': 'maiyembe',
+        }
+    }
+elif CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('DJANGO_CACHE_DIR', os.path.join(BASE_DIR, 'cache')),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'maiyembe',
+        }
+    }
+
+# Full-page cache for anonymous visitors on public list pages (see core/caching.py)
+PAGE_CACHE_TIMEOUT = 60 * 5
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -194,4 +232,33 @@ SITE_NAME = 'Maiyembe Construction'
 # Login URL
 LOGIN_URL = 'accounts:login'
 LOGIN_REDIRECT_URL = 'home'
-LOGOUT_REDIRECT_URL = 'home'
\ No newline at end of file
+LOGOUT_REDIRECT_URL = 'home'
+
+# Buffered page view counters (see core/view_counters.py)
+VIEW_COUNT_FLUSH_INTERVAL = 60  # seconds between batched writes
+VIEW_COUNT_FLUSH_THRESHOLD = 100  # buffered hits that force an early write
+
+# Outbound email queue (see core/emails.py and the send_queued_emails command)
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+EMAIL_QUEUE_RETRY_DELAY = 60  # seconds before the first retry, doubled on each attempt
+EMAIL_QUEUE_CLAIM_TIMEOUT = 600  # seconds a worker holds claimed emails before others may retry them
+
+# Responsive image derivatives generated on upload (see core/images.py)
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 960, 1280, 1920)
+IMAGE_DERIVATIVE_FORMATS = ('avif', 'webp')  # formats Pillow cannot encode are skipped
+
+# Dashboard stat card counters (see core/stats.py)
+DASHBOARD_STATS_TIMEOUT = 0  # seconds to cache them; 0 always reads live counts
+
+# Cursor pagination (see core/pagination.py)
+APPROXIMATE_COUNT_TIMEOUT = 60  # seconds an approximate paginator count is reused
+
+# Sitemaps (see core/sitemaps.py); purged early whenever posts, projects or services change
+SITEMAP_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Per-view request metrics (see core/metrics.py), shown at /dashboard/metrics/ and scraped from /metrics/
+REQUEST_METRICS_ENABLED = True
+REQUEST_METRICS_SAMPLES = 500  # recent requests kept per view for percentiles
+REQUEST_METRICS_QUERY_BUDGET = None  # log requests that run more queries than this
+REQUEST_METRICS_TIME_BUDGET_MS = None  # log requests slower than this
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # bearer token for Prometheus; staff sessions work without it
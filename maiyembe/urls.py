@@ -15,16 +15,24 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
+from django.contrib.sitemaps import views as sitemap_views
 from django.urls import path, include
 from django.views.defaults import page_not_found
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.sitemaps import cached_sitemap, sitemaps
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('core.urls')),
     path('blog/', include('blog.urls')),
     path('projects/', include('projects.urls')),
+    path('api/', include('api.urls')),
+    path('sitemap.xml', cached_sitemap(sitemap_views.index),
+         {'sitemaps': sitemaps, 'sitemap_url_name': 'sitemap-section'}, name='sitemap'),
+    path('sitemap-<section>.xml', cached_sitemap(sitemap_views.sitemap),
+         {'sitemaps': sitemaps}, name='sitemap-section'),
     path('acounts', include('accounts.urls')), 
 ]
 
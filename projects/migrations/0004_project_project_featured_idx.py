@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_created_by_project_last_updated_by'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('is_featured', True)), fields=['-created_at'], name='project_featured_idx'),
+        ),
+    ]
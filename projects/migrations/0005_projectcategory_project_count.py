@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:12
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_projects(apps, schema_editor):
+    ProjectCategory = apps.get_model('projects', 'ProjectCategory')
+    Project = apps.get_model('projects', 'Project')
+    projects = Project.categories.through.objects.filter(projectcategory=OuterRef('pk')).order_by().values(
+        'projectcategory'
+    ).annotate(count=Count('pk')).values('count')
+    ProjectCategory.objects.update(project_count=Coalesce(Subquery(projects), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_project_project_featured_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectcategory',
+            name='project_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_projects, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_projectcategory_project_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedProject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='projects.project')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_to', to='projects.project')),
+            ],
+            options={
+                'ordering': ['project', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('project', 'rank'), name='relatedproject_project_rank_uniq')],
+            },
+        ),
+    ]
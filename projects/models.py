@@ -1,11 +1,14 @@
 # models.py (updated)
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils.text import slugify
 from django.urls import reverse
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 import os
 from accounts.models import User
+from core.view_counters import record_view
 
 class ProjectCategory(models.Model):
     """Model for project categories"""
@@ -14,6 +17,8 @@ class ProjectCategory(models.Model):
     description = models.TextField(blank=True)
     image = models.ImageField(upload_to='project_categories/', blank=True, null=True)
     order = models.IntegerField(default=0)
+    # Kept up to date by the Project signals in projects/signals.py
+    project_count = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         verbose_name_plural = 'Project Categories'
@@ -26,6 +31,16 @@ class ProjectCategory(models.Model):
     
     def __str__(self):
         return self.name
+    
+    @classmethod
+    def refresh_project_counts(cls, pks=None):
+        """Recount projects of the given categories (all when pks is None) in one UPDATE"""
+        through = Project.categories.through
+        projects = through.objects.filter(projectcategory=OuterRef('pk')).order_by().values(
+            'projectcategory'
+        ).annotate(count=Count('pk')).values('count')
+        categories = cls.objects.all() if pks is None else cls.objects.filter(pk__in=pks)
+        return categories.update(project_count=Coalesce(Subquery(projects), 0))
 
 
 class Project(models.Model):
@@ -58,6 +73,11 @@ class Project(models.Model):
     meta_title = models.CharField(max_length=200, blank=True)
     meta_description = models.TextField(blank=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at'], condition=models.Q(is_featured=True), name='project_featured_idx'),
+        ]
+    
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
@@ -70,12 +90,41 @@ class Project(models.Model):
         return reverse('projects:project_detail', kwargs={'slug': self.slug})
     
     def increment_views(self):
+        """Count a page view; hits are buffered and saved in batches"""
+        record_view(self)
         self.views += 1
-        self.save(update_fields=['views'])
+    
+    def get_related_projects(self, count=4):
+        """Precomputed neighbours (see core/related.py), else other projects sharing a category"""
+        related = list(Project.objects.filter(related_to__project=self).order_by('related_to__rank')[:count])
+        if related:
+            return related
+        # Iterating .all() reuses prefetched categories
+        category_ids = [category.pk for category in self.categories.all()]
+        return list(Project.objects.filter(categories__in=category_ids).exclude(pk=self.pk).distinct()[:count])
     
     def get_primary_category(self):
         """Return the first category for display purposes"""
-        return self.categories.first() if self.categories.exists() else None
+        # Iterating .all() reuses prefetched categories instead of querying again
+        categories = list(self.categories.all())
+        return categories[0] if categories else None
+
+
+class RelatedProject(models.Model):
+    """A precomputed neighbour of a project, written by the build_related_content command"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='+')
+    related = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='related_to')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    
+    class Meta:
+        ordering = ['project', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'rank'], name='relatedproject_project_rank_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.project_id} -> {self.related_id} ({self.score:.2f})"
 
 
 class ProjectImage(models.Model):
@@ -0,0 +1,36 @@
+# projects/signals.py
+from django.db.models.signals import m2m_changed, post_delete, pre_delete
+
+from .models import Project, ProjectCategory
+
+
+def update_counts_for_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    # reverse is True for category.projects.add(...), where instance is the category
+    if action == 'pre_clear' and not reverse:
+        # clear() does not say which categories lose the project
+        instance._cleared_category_ids = list(instance.categories.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if reverse:
+            ProjectCategory.refresh_project_counts([instance.pk])
+        elif action == 'post_clear':
+            ProjectCategory.refresh_project_counts(getattr(instance, '_cleared_category_ids', []))
+        elif pk_set:
+            ProjectCategory.refresh_project_counts(pk_set)
+
+
+def remember_project_categories(sender, instance, **kwargs):
+    # The through rows are gone by post_delete
+    instance._counted_category_ids = list(instance.categories.values_list('pk', flat=True))
+
+
+def update_counts_on_delete(sender, instance, **kwargs):
+    pks = getattr(instance, '_counted_category_ids', None)
+    if pks:
+        ProjectCategory.refresh_project_counts(pks)
+
+
+def connect_category_count_signals():
+    m2m_changed.connect(update_counts_for_membership, sender=Project.categories.through,
+                        dispatch_uid='category_count_project_categories')
+    pre_delete.connect(remember_project_categories, sender=Project, dispatch_uid='category_count_project')
+    post_delete.connect(update_counts_on_delete, sender=Project, dispatch_uid='category_count_project')
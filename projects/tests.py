@@ -1,3 +1,155 @@
+import datetime
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+
+from core.view_counters import flush_views, pending_views
+from .models import (
+    Project, ProjectCategory, ProjectFeature, ProjectImage, ProjectTestimonial, ProjectVideo
+)
+
+
+def create_project(title, **kwargs):
+    kwargs.setdefault('description', 'A project')
+    kwargs.setdefault('client', 'Client')
+    kwargs.setdefault('location', 'Lusaka')
+    kwargs.setdefault('completion_date', datetime.date(2024, 1, 1))
+    kwargs.setdefault('featured_image', 'projects/project.jpg')
+    return Project.objects.create(title=title, **kwargs)
+
+
+class ProjectDetailViewTests(TestCase):
+    """Tests for the public project detail page"""
+
+    def setUp(self):
+        cache.clear()
+        self.category = ProjectCategory.objects.create(name='Residential')
+        self.project = create_project('Lake House')
+        self.project.categories.add(self.category)
+        for i in range(3):
+            ProjectImage.objects.create(project=self.project, image=f'projects/gallery/{i}.jpg')
+            ProjectVideo.objects.create(project=self.project, video_url=f'https://youtu.be/abcdefghij{i}')
+            ProjectFeature.objects.create(project=self.project, title=f'Feature {i}')
+            ProjectTestimonial.objects.create(project=self.project, client_name=f'Client {i}', testimonial='Great')
+        related = create_project('City Villa')
+        related.categories.add(self.category)
+
+    def tearDown(self):
+        flush_views()
+
+    def test_detail_page_query_budget_is_constant(self):
+        call_command('build_related_content', 'projects', stdout=StringIO())
+        # Project, one query per prefetched relation and the precomputed related projects
+        with self.assertNumQueries(7):
+            response = self.client.get(reverse('projects:project_detail', args=[self.project.slug]))
+        self.assertContains(response, 'Feature 2')
+        self.assertContains(response, 'Client 2')
+        self.assertContains(response, 'City Villa')
+
+    def test_primary_category_uses_prefetched_categories(self):
+        project = Project.objects.prefetch_related('categories').get(pk=self.project.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(project.get_primary_category(), self.category)
+
+    def test_views_are_buffered_until_flushed(self):
+        url = reverse('projects:project_detail', args=[self.project.slug])
+        self.client.get(url)
+        response = self.client.post(reverse('projects:increment_views', args=[self.project.slug]))
+        # The JSON count includes the hits still in the buffer
+        self.assertEqual(response.json()['views'], 2)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.views, 0)
+        flush_views()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.views, 2)
+
+
+class ViewCounterTests(TestCase):
+    """Tests for the buffered view counters"""
+
+    def setUp(self):
+        self.projects = [create_project(f'Project {i}') for i in range(3)]
+
+    def tearDown(self):
+        flush_views()
+
+    def test_flush_writes_one_update_per_hit_count(self):
+        first, second, third = self.projects
+        for project, hits in ((first, 2), (second, 2), (third, 5)):
+            for _ in range(hits):
+                project.increment_views()
+        self.assertEqual(pending_views(third), 5)
+        # Savepoint pair plus one UPDATE for the 2-hit group and one for the 5-hit group
+        with self.assertNumQueries(4):
+            self.assertEqual(flush_views(), 9)
+        self.assertEqual(
+            list(Project.objects.order_by('title').values_list('views', flat=True)), [2, 2, 5]
+        )
+        self.assertEqual(pending_views(third), 0)
+
+    def test_threshold_triggers_a_flush(self):
+        with self.settings(VIEW_COUNT_FLUSH_THRESHOLD=3):
+            for _ in range(3):
+                self.projects[0].increment_views()
+        self.projects[0].refresh_from_db()
+        self.assertEqual(self.projects[0].views, 3)
+
+    def test_like_endpoint_counts_the_hit_that_flushed_the_buffer(self):
+        project = self.projects[0]
+        project.increment_views()
+        with self.settings(VIEW_COUNT_FLUSH_THRESHOLD=2):
+            response = self.client.post(reverse('projects:increment_views', args=[project.slug]))
+        self.assertEqual(response.json()['views'], 2)
+
+
+class ProjectListCacheTests(TestCase):
+    """Tests for the anonymous page cache on the project list"""
+
+    def setUp(self):
+        cache.clear()
+        self.project = create_project('Lake House')
+        self.category = ProjectCategory.objects.create(name='Commercial')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_category_changes_purge_cached_listing(self):
+        url = reverse('projects:category', args=[self.category.slug])
+        self.client.get(url)
+        self.assertNotContains(self.client.get(url), 'Lake House')
+        self.project.categories.add(self.category)
+        self.assertContains(self.client.get(url), 'Lake House')
+
+
+class CategoryProjectCountTests(TestCase):
+    """Tests for the denormalized project count on project categories"""
+
+    def setUp(self):
+        self.homes = ProjectCategory.objects.create(name='Homes')
+        self.offices = ProjectCategory.objects.create(name='Offices')
+        self.project = create_project('Lake House')
+
+    def assertCounts(self, homes, offices):
+        self.homes.refresh_from_db()
+        self.offices.refresh_from_db()
+        self.assertEqual((self.homes.project_count, self.offices.project_count), (homes, offices))
+
+    def test_counts_follow_membership(self):
+        self.project.categories.add(self.homes, self.offices)
+        self.assertCounts(1, 1)
+        self.project.categories.remove(self.offices)
+        self.assertCounts(1, 0)
+        self.offices.projects.add(create_project('Tower'), self.project)
+        self.assertCounts(1, 2)
+        self.project.categories.clear()
+        self.assertCounts(0, 1)
+        self.project.categories.set([self.homes])
+        self.assertCounts(1, 1)
 
-# Create your tests here.
+    def test_deleting_a_project_updates_its_categories(self):
+        self.project.categories.add(self.homes, self.offices)
+        self.project.delete()
+        self.assertCounts(0, 0)
@@ -6,7 +6,8 @@ from .views import (
     ProjectImageCreateView, ProjectImageDeleteView, ProjectVideoCreateView,
     ProjectVideoDeleteView, ProjectFeatureCreateView, ProjectFeatureDeleteView,
     ProjectTestimonialCreateView, ProjectTestimonialDeleteView,
-    ProjectCategoryCreateView, ProjectCategoryUpdateView, ProjectCategoryDeleteView
+    ProjectCategoryCreateView, ProjectCategoryUpdateView, ProjectCategoryDeleteView,
+    ProjectInquiryExportView,
 )
 
 app_name = 'projects'
@@ -24,6 +25,7 @@ urlpatterns = [
     path('dashboard/create/', ProjectCreateView.as_view(), name='project_create'),
     path('dashboard/update/<int:pk>/', ProjectUpdateView.as_view(), name='project_update'),
     path('dashboard/delete/<int:pk>/', ProjectDeleteView.as_view(), name='project_delete'),
+    path('dashboard/inquiries/export/', ProjectInquiryExportView.as_view(), name='inquiry_export'),
     
     # Project Images
     path('dashboard/image/add/<int:project_pk>/', ProjectImageCreateView.as_view(), name='project_image_create'),
@@ -4,10 +4,15 @@ from .models import Project, ProjectCategory
 from .forms import ProjectInquiryForm
 from django.http import JsonResponse
 from django.contrib import messages
+from django.db.models import Q
+from core.caching import AnonymousCachePageMixin
+from core.stats import get_stats
+from core.view_counters import pending_views
 
 
-class ProjectListView(ListView):
+class ProjectListView(AnonymousCachePageMixin, ListView):
     """View for project list/gallery"""
+    page_cache_group = 'projects'
     model = Project
     template_name = 'projects/project_list.html'
     context_object_name = 'projects'
@@ -41,21 +46,18 @@ class ProjectDetailView(DetailView):
     template_name = 'projects/project_detail.html'
     context_object_name = 'project'
     
-    def get_object(self, queryset=None):
-        # Try to get by slug first, then by pk
-        if 'slug' in self.kwargs:
-            return get_object_or_404(Project, slug=self.kwargs['slug'])
-        return super().get_object(queryset)
+    def get_queryset(self):
+        # Everything the detail template renders is fetched with the project
+        return Project.objects.prefetch_related(
+            'images', 'videos', 'features', 'testimonials', 'categories'
+        )
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        project = self.get_object()
+        project = self.object
         
         # Get related projects
-        related_categories = project.categories.all()
-        context['related_projects'] = Project.objects.filter(
-            categories__in=related_categories
-        ).exclude(id=project.id).distinct()[:4]
+        context['related_projects'] = project.get_related_projects(4)
         
         # Add inquiry form to context
         context['inquiry_form'] = ProjectInquiryForm()
@@ -65,8 +67,7 @@ class ProjectDetailView(DetailView):
     def get(self, request, *args, **kwargs):
         response = super().get(request, *args, **kwargs)
         # Increment views on GET request
-        project = self.get_object()
-        project.increment_views()
+        self.object.increment_views()
         return response
 
 class ProjectInquiryView(FormView):
@@ -90,9 +91,11 @@ class ProjectInquiryView(FormView):
 def increment_project_views(request, slug):
     """Increment project view count"""
     if request.method == 'POST':
-        project = get_object_or_404(Project, slug=slug)
+        project = get_object_or_404(Project.objects.only('id'), slug=slug)
         project.increment_views()
-        return JsonResponse({'status': 'success', 'views': project.views})
+        # Read after recording: the hit may have flushed the buffer into the row
+        saved = Project.objects.filter(pk=project.pk).values_list('views', flat=True).get()
+        return JsonResponse({'status': 'success', 'views': saved + pending_views(project)})
     return JsonResponse({'status': 'error'}, status=400)
 
 
@@ -114,7 +117,8 @@ from .forms import (
     ProjectForm, ProjectImageForm, ProjectVideoForm, 
     ProjectFeatureForm, ProjectTestimonialForm, ProjectCategoryForm
 )
-from .models import Project, ProjectCategory, ProjectImage, ProjectVideo, ProjectFeature, ProjectTestimonial
+from .models import Project, ProjectCategory, ProjectImage, ProjectVideo, ProjectFeature, ProjectTestimonial, ProjectInquiry
+from core.exports import CsvExportView
 
 
 class ProjectDashboardView(LoginRequiredMixin, ListView):
@@ -130,11 +134,31 @@ class ProjectDashboardView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['categories'] = ProjectCategory.objects.all()
-        context['total_projects'] = Project.objects.count()
-        context['featured_projects'] = Project.objects.filter(is_featured=True).count()
+        context.update(get_stats(Project, total_projects=None, featured_projects=Q(is_featured=True)))
         return context
 
 
+class ProjectInquiryExportView(LoginRequiredMixin, CsvExportView):
+    """CSV download of project inquiries, optionally filtered by status"""
+    model = ProjectInquiry
+    filename = 'project-inquiries'
+    status_filters = {status: {'status': status} for status, _label in ProjectInquiry.INQUIRY_STATUS}
+    columns = (
+        ('Date', 'created_at'),
+        ('Project', 'project__title'),
+        ('Name', 'name'),
+        ('Email', 'email'),
+        ('Phone', 'phone'),
+        ('Service type', 'service_type'),
+        ('Budget range', 'budget_range'),
+        ('Timeline', 'timeline'),
+        ('Description', 'project_description'),
+        ('Property address', 'property_address'),
+        ('Status', 'status'),
+        ('Notes', 'notes'),
+    )
+
+
 class ProjectCreateView(LoginRequiredMixin, CreateView):
     """View for creating new projects"""
     model = Project